@@ -12,6 +12,10 @@ _MESSAGE_X_SENSITIVE_ROWS = "X and the sensitive features must have same number
 
 _KW_SENSITIVE_FEATURES = "sensitive_features"
 
+# The number of values examined at once by passes over a whole vector,
+# so that memory-mapped inputs are not read into memory all at once
+_CHUNK_SIZE = 2 ** 20
+
 
 def _validate_and_reformat_reductions_input(X, y, sensitive_features, enforce_binary_sensitive_feature=False,
                                             **kwargs):
@@ -31,7 +35,7 @@ def _validate_and_reformat_reductions_input(X, y, sensitive_features, enforce_bi
                                              _KW_SENSITIVE_FEATURES)
 
     if enforce_binary_sensitive_feature:
-        unique_labels = np.unique(sensitive_features_vector)
+        unique_labels = _unique_values(sensitive_features_vector)
         if len(unique_labels) > 2:
             raise RuntimeError("Sensitive features contain more than two unique values")
 
@@ -60,10 +64,11 @@ def _make_vector(formless, formless_name):
     elif isinstance(formless, pd.Series):
         formed_vector = formless
     elif isinstance(formless, np.ndarray):
+        # Wrap the array without copying it, since it may be memory-mapped
         if len(formless.shape) == 1:
-            formed_vector = pd.Series(formless)
+            formed_vector = pd.Series(formless, copy=False)
         elif len(formless.shape) == 2 and formless.shape[1] == 1:
-            formed_vector = pd.Series(formless[:, 0])
+            formed_vector = pd.Series(formless[:, 0], copy=False)
         else:
             msgfmt = "{0} is an ndarray with more than one column"
             raise RuntimeError(msgfmt.format(formless_name))
@@ -74,6 +79,16 @@ def _make_vector(formless, formless_name):
     return formed_vector
 
 
+def _unique_values(vector):
+    """Finds the sorted unique values of a vector, one chunk at a time
+    """
+    values = np.asarray(vector)
+    unique_values = np.unique(values[:_CHUNK_SIZE])
+    for start in range(_CHUNK_SIZE, len(values), _CHUNK_SIZE):
+        unique_values = np.union1d(unique_values, values[start:start + _CHUNK_SIZE])
+    return unique_values
+
+
 def _get_matrix_shape(formless, formless_name):
     num_rows = -1
     num_cols = -1
@@ -25,7 +25,14 @@ from ._extra_metrics import balanced_root_mean_squared_error, fallout_rate  # no
 from ._extra_metrics import mean_overprediction, mean_prediction  # noqa: F401
 from ._extra_metrics import mean_underprediction, miss_rate  # noqa: F401
 from ._extra_metrics import selection_rate, specificity_score  # noqa: F401
-
+from ._extra_metrics import group_fallout_rate, group_miss_rate  # noqa: F401
+from ._extra_metrics import group_specificity_score  # noqa: F401
+
+from ._balanced_root_mean_squared_error import group_balanced_root_mean_squared_error  # noqa: F401,E501
+from ._mean_predictions import group_mean_prediction, group_mean_overprediction  # noqa: F401
+from ._mean_predictions import group_mean_underprediction  # noqa: F401
+from ._segmented_metrics import group_max_error, group_median_absolute_error  # noqa: F401
+from ._segmented_metrics import group_quantile_absolute_error  # noqa: F401
 from ._selection_rate import group_selection_rate  # noqa: F401
 
 from ._skm_wrappers import group_accuracy_score, group_confusion_matrix  # noqa: F401
@@ -33,29 +40,24 @@ from ._skm_wrappers import group_precision_score, group_recall_score  # noqa: F4
 from ._skm_wrappers import group_roc_auc_score, group_zero_one_loss  # noqa: F401
 from ._skm_wrappers import group_mean_squared_error  # noqa: F401
 
+from ._accumulators import GroupMetricAccumulator  # noqa: F401
+from ._bootstrap import GroupMetricBootstrapResult, bootstrap_metric_by_group  # noqa: F401
+from ._cache import GroupMetricCache  # noqa: F401
+from ._calibration import group_calibration_curve, group_calibration_error  # noqa: F401
 from ._group_metric_result import GroupMetricResult  # noqa: F401
 from ._metrics_engine import make_group_metric, metric_by_group  # noqa: F401
+from ._multiple_metrics import metrics_by_group  # noqa: F401
+from ._multiple_models import metric_by_group_for_models  # noqa: F401
+from ._parquet import metric_by_group_from_parquet  # noqa: F401
+from ._permutation_test import GroupMetricPermutationResult  # noqa: F401
+from ._permutation_test import permutation_test_metric_by_group  # noqa: F401
+from ._quantile_sketch import GroupQuantileSketch  # noqa: F401
+from ._threshold_curves import group_threshold_curves  # noqa: F401
+from ._window import GroupMetricWindow  # noqa: F401
 
 # -------------------------------------------
 
-# Classification metrics
-group_specificity_score = make_group_metric(specificity_score)
-"""A grouped metric for the :any:`specificity_score`
-"""
-
-group_miss_rate = make_group_metric(miss_rate)
-"""A grouped metric for the :any:`miss_rate`
-"""
-
-group_fallout_rate = make_group_metric(fallout_rate)
-"""A grouped metric for the :any:`fallout_rate`
-"""
-
 # Regression metrics
-group_max_error = make_group_metric(skm.max_error)
-"""A grouped wrapper around the :any:`sklearn.metrics.max_error` routine
-"""
-
 group_mean_absolute_error = make_group_metric(skm.mean_absolute_error)
 """A grouped wrapper around the :any:`sklearn.metrics.mean_absolute_error` routine
 """
@@ -64,27 +66,6 @@ group_mean_squared_log_error = make_group_metric(skm.mean_squared_log_error)
 """A grouped wrapper around the :any:`sklearn.metrics.mean_squared_log_error` routine
 """
 
-group_median_absolute_error = make_group_metric(skm.median_absolute_error)
-"""A grouped wrapper around the :any:`sklearn.metrics.median_absolute_error` routine
-"""
-
-group_balanced_root_mean_squared_error = make_group_metric(
-    balanced_root_mean_squared_error)
-"""A grouped wrapper around the :any:`balanced_root_mean_squared_error` routine
-"""
-
-group_mean_prediction = make_group_metric(mean_prediction)
-"""A grouped wrapper around the :any:`mean_prediction` routine
-"""
-
-group_mean_overprediction = make_group_metric(mean_overprediction)
-"""A grouped wrapper around the :any:`mean_overprediction` routine
-"""
-
-group_mean_underprediction = make_group_metric(mean_underprediction)
-"""A grouped wapper around the :any:`mean_underprediction` routine
-"""
-
 # -------------------------------------------
 
 _extra_metrics = [
@@ -101,6 +82,8 @@ _extra_metrics = [
 _group_metrics = [
     "group_accuracy_score",
     "group_balanced_root_mean_squared_error",
+    "group_calibration_curve",
+    "group_calibration_error",
     "group_confusion_matrix",
     "group_fallout_rate",
     "group_max_error",
@@ -113,6 +96,7 @@ _group_metrics = [
     "group_median_absolute_error",
     "group_miss_rate",
     "group_precision_score",
+    "group_quantile_absolute_error",
     "group_recall_score",
     "group_roc_auc_score",
     "group_selection_rate",
@@ -121,9 +105,21 @@ _group_metrics = [
 ]
 
 _engine = [
+    "GroupMetricAccumulator",
+    "GroupMetricBootstrapResult",
+    "GroupMetricCache",
+    "GroupMetricPermutationResult",
     "GroupMetricResult",
+    "GroupMetricWindow",
+    "GroupQuantileSketch",
+    "bootstrap_metric_by_group",
+    "group_threshold_curves",
     "make_group_metric",
-    "metric_by_group"
+    "metric_by_group",
+    "metric_by_group_for_models",
+    "metric_by_group_from_parquet",
+    "metrics_by_group",
+    "permutation_test_metric_by_group"
 ]
 
 
@@ -0,0 +1,197 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+from ._sufficient_statistics import _check_binary_labels, _get_metric_statistics
+from ._sufficient_statistics import _evaluate_sums, _statistic_sums
+
+_MESSAGE_MERGE_MISMATCH = "Cannot merge accumulators for different metrics"
+_MESSAGE_NO_DATA = "No data have been accumulated"
+
+
+class GroupMetricAccumulator:
+    """Class which computes a grouped metric over data which arrive in
+    batches, without holding the data in memory.
+
+    Each call to :meth:`update` adds the (weighted) sums of a few per-sample
+    statistics for each group to running totals. Since only these sums are
+    kept, accumulators which have seen different parts of the data (for
+    example, in different worker processes) can be combined with :meth:`merge`.
+    Accumulators can be pickled, in order to move them between processes.
+    When all the data have been seen, :meth:`result` gives the same
+    :class:`GroupMetricResult` as :func:`metric_by_group` would have
+    given for all of the data (up to floating point rounding).
+
+    The supported metrics are :any:`sklearn.metrics.accuracy_score`,
+    :any:`sklearn.metrics.zero_one_loss`, :any:`sklearn.metrics.precision_score`,
+    :any:`sklearn.metrics.recall_score`, :any:`specificity_score`,
+    :any:`miss_rate`, :any:`fallout_rate`, :any:`selection_rate`,
+    :any:`mean_prediction`, :any:`mean_overprediction`, :any:`mean_underprediction`,
+    :any:`sklearn.metrics.mean_squared_error`, :any:`sklearn.metrics.mean_absolute_error`
+    and :any:`balanced_root_mean_squared_error`. As for the functions themselves,
+    :any:`specificity_score`, :any:`miss_rate` and :any:`fallout_rate` are only
+    supported for labels taken from {0, 1}.
+
+    :param metric_function: The metric to be computed
+    :type metric_function: func
+
+    :param pos_label: The label of the positive class, for the
+        classification metrics
+    """
+
+    def __init__(self, metric_function, *, pos_label=1):
+        # Check that the metric is supported
+        _get_metric_statistics(metric_function)
+
+        self._metric_function = metric_function
+        self._pos_label = pos_label
+        self._group_sums = _GroupSums()
+        self._labels = set()
+
+    @property
+    def metric_function(self):
+        """Gets the metric being accumulated
+        """
+        return self._metric_function
+
+    @property
+    def groups(self):
+        """Gets the list of the groups seen so far
+        """
+        return list(self._group_sums.groups)
+
+    def update(self, y_true, y_pred, group_membership, sample_weight=None):
+        """Adds a batch of data to the accumulator
+
+        :param y_true: Array of ground-truth values
+
+        :param y_pred: Array of predicted values
+
+        :param group_membership: Array Indicating the group to which each input value belongs
+
+        :param sample_weight: Optional weights to apply to each input value
+
+        :return: This accumulator
+        :rtype: :class:`GroupMetricAccumulator`
+        """
+        y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                       sample_weight)
+        metric_statistics = _get_metric_statistics(self._metric_function)
+        if metric_statistics.binary:
+            self._labels.update(np.unique(y_a).tolist())
+            self._labels.update(np.unique(y_p).tolist())
+
+        partition = GroupPartition(g_d)
+        sums = _statistic_sums(metric_statistics, y_a, y_p,
+                               partition.codes, partition.n_groups,
+                               pos_label=self._pos_label, sample_weight=s_w)
+        self._group_sums.add(partition.groups, sums)
+        return self
+
+    def merge(self, other):
+        """Adds the data seen by another accumulator for the same metric
+        to this one
+
+        :param other: The accumulator to be merged into this one
+        :type other: :class:`GroupMetricAccumulator`
+
+        :return: This accumulator
+        :rtype: :class:`GroupMetricAccumulator`
+        """
+        if (other._metric_function is not self._metric_function or
+                other._pos_label != self._pos_label):
+            raise ValueError(_MESSAGE_MERGE_MISMATCH)
+
+        self._labels.update(other._labels)
+        if other._group_sums.sums is not None:
+            self._group_sums.add(other._group_sums.groups, other._group_sums.sums)
+        return self
+
+    def result(self):
+        """Computes the metric for all the data seen so far
+
+        :return: Object containing the result of applying the metric to all the
+            data seen so far, and to each group identified in the ``group_membership``
+            arrays
+        :rtype: :class:`GroupMetricResult`
+        """
+        if self._group_sums.sums is None:
+            raise ValueError(_MESSAGE_NO_DATA)
+
+        return _sums_result(self._metric_function, self._labels, self._pos_label,
+                            self._group_sums.groups, self._group_sums.sums)
+
+
+class _GroupIndex:
+    """Numbers the groups in the order in which they are first seen, so that
+    each has a row in the tables of sums
+    """
+
+    def __init__(self):
+        self.groups = []
+        self._rows = {}
+
+    def rows(self, groups):
+        """Returns the array of the rows of the given groups, adding any
+        which have not been seen before
+        """
+        rows = np.empty(len(groups), dtype=np.intp)
+        for i, group in enumerate(groups):
+            row = self._rows.get(group)
+            if row is None:
+                row = len(self.groups)
+                self._rows[group] = row
+                self.groups.append(group)
+            rows[i] = row
+        return rows
+
+
+class _GroupSums:
+    """Table of the sums of the statistics of a metric for each group, to
+    which rows are added as new groups are seen. The groups are kept in the
+    order in which they were first seen
+    """
+
+    def __init__(self):
+        self._index = _GroupIndex()
+        self.sums = None
+
+    @property
+    def groups(self):
+        return self._index.groups
+
+    def add(self, groups, sums):
+        """Adds the rows of ``sums`` to the rows of the given (distinct) groups
+        """
+        rows = self._index.rows(groups)
+        if self.sums is None:
+            self.sums = np.zeros((len(self.groups), sums.shape[1]))
+        elif len(self.groups) > len(self.sums):
+            new_sums = np.zeros((len(self.groups) - len(self.sums), sums.shape[1]))
+            self.sums = np.concatenate((self.sums, new_sums))
+        self.sums[rows] += sums
+
+
+def _sums_result(metric_function, labels, pos_label, groups, sums):
+    """Computes the :class:`GroupMetricResult` of a metric from the sums of its
+    statistics for each of the given groups, after checking the labels seen
+    """
+    metric_statistics = _get_metric_statistics(metric_function)
+    _check_binary_labels(metric_function, labels, pos_label)
+
+    order = _sorted_group_order(groups)
+    overall, by_group = _evaluate_sums(metric_statistics, sums[order])
+    return _make_group_metric_result(overall, [groups[i] for i in order], by_group)
+
+
+def _sorted_group_order(groups):
+    """Returns the positions of the groups in sorted order, as metric_by_group
+    reports them, or in the order they were seen if they cannot be sorted
+    """
+    try:
+        return sorted(range(len(groups)), key=lambda i: groups[i])
+    except TypeError:
+        return list(range(len(groups)))
@@ -0,0 +1,73 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Conversion of Apache Arrow data to numpy arrays, sharing their buffers
+where the types allow. The ``pyarrow`` package is optional, and is only
+imported once Arrow data are actually seen.
+"""
+
+import numpy as np
+import pandas as pd
+
+_MESSAGE_PYARROW_REQUIRED = "Reading Parquet files requires the pyarrow package, " \
+    "which can be installed with 'pip install pyarrow'"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(_MESSAGE_PYARROW_REQUIRED) from None
+    return pyarrow
+
+
+def _is_arrow(value):
+    """Checks whether a value is an Arrow array, chunked array, table or
+    record batch, without importing pyarrow
+    """
+    return type(value).__module__.split('.')[0] == 'pyarrow'
+
+
+def _arrow_to_numpy(value):
+    """Converts Arrow data to numpy, without copying when each column is a
+    single chunk of numbers with no missing values. Dictionary-encoded data
+    become :class:`pandas.Categorical`, so that the groups can be taken
+    from their codes. Tables with several columns become a
+    :class:`pandas.DataFrame` (as for intersectional groups)
+    """
+    import pyarrow as pa
+
+    if isinstance(value, (pa.Table, pa.RecordBatch)):
+        columns = [_arrow_to_numpy(column) for column in value.columns]
+        if len(columns) == 1:
+            return columns[0]
+        return pd.DataFrame(dict(zip(value.column_names, columns)), copy=False)
+
+    if isinstance(value, pa.ChunkedArray):
+        if value.num_chunks == 0:
+            value = pa.array([], type=value.type)
+        elif value.num_chunks == 1:
+            value = value.chunk(0)
+        else:
+            # The chunks have to be joined into a single buffer
+            value = pa.concat_arrays(value.chunks)
+
+    if pa.types.is_dictionary(value.type):
+        return pd.Categorical.from_codes(
+            _arrow_to_numpy(value.indices.fill_null(-1)),
+            categories=_arrow_to_numpy(value.dictionary))
+    try:
+        return value.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        # For example, the data have missing values or are booleans
+        # (which Arrow packs into bits)
+        return value.to_numpy(zero_copy_only=False)
+
+
+def _as_numpy(value):
+    """Converts an array-like value (including Arrow data) to a numpy array
+    """
+    if _is_arrow(value):
+        value = _arrow_to_numpy(value)
+    return np.asarray(value)
@@ -1,11 +1,14 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
-import math
 import numpy as np
-import sklearn.metrics as skm
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import metric_by_group, _convert_and_check_inputs
+from ._metrics_engine import _counts_as_weights, _make_group_metric_result
 
 _Y_TRUE_NOT_0_1 = "Only 0 and 1 are allowed in y_true and both must be present"
+_MESSAGE_ZERO_CLASS_WEIGHT = "The total weight of each class in y_true must be positive"
 
 
 def balanced_root_mean_squared_error(y_true, y_pred, sample_weight=None):
@@ -16,26 +19,57 @@ def balanced_root_mean_squared_error(y_true, y_pred, sample_weight=None):
     always be one of these, while `y_pred` can be a continuous probability
     (which could be thresholded to get a predicted class).
 
-    Internally, this builds on the
-    :any:`sklearn.metrics.mean_squared_error` routine.
+    The (weighted) squared errors for the two classes are summed with
+    :func:`numpy.bincount`.
     """
 
     y_ta = np.squeeze(np.asarray(y_true))
     y_pa = np.squeeze(np.asarray(y_pred))
-    s_w = np.ones(len(y_ta))
+    s_w = None
     if sample_weight is not None:
         s_w = np.squeeze(np.asarray(sample_weight))
 
-    y_ta_values = np.unique(y_ta)
-    if not np.array_equal(y_ta_values, [0, 1]):
-        raise ValueError(_Y_TRUE_NOT_0_1)
+    overall, _ = _balanced_root_mean_squared_errors(y_ta, y_pa, s_w,
+                                                    np.zeros(len(y_ta), dtype=np.intp), 1)
+    return overall
+
+
+def group_balanced_root_mean_squared_error(y_true, y_pred, group_membership,
+                                           sample_weight=None, *, n_jobs=None, counts=None):
+    """A grouped wrapper around the :any:`balanced_root_mean_squared_error` routine.
+
+    For one-dimensional data, the (weighted) squared errors for every
+    combination of group and class are summed with :func:`numpy.bincount`,
+    from which the balanced RMSE of every group is found. If ``counts`` is given,
+    each row is taken to occur that many times.
+    """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if y_a.ndim != 1 or y_p.ndim != 1:
+        return metric_by_group(balanced_root_mean_squared_error, y_true, y_pred,
+                               group_membership, sample_weight, n_jobs=n_jobs)
+
+    partition = GroupPartition(g_d)
+    overall, by_group = _balanced_root_mean_squared_errors(y_a, y_p, s_w, partition.codes,
+                                                           partition.n_groups)
+    return _make_group_metric_result(overall, partition.groups, by_group)
 
-    errs = np.zeros(2)
-    for i in range(0, 2):
-        indices = (y_ta == i)
-        y_ta_s = y_ta[indices]
-        y_pa_s = y_pa[indices]
-        s_w_s = s_w[indices]
-        errs[i] = math.sqrt(skm.mean_squared_error(y_ta_s, y_pa_s, s_w_s))
 
-    return errs.mean()
+def _balanced_root_mean_squared_errors(y_t, y_p, s_w, codes, n_groups):
+    """Computes the balanced RMSE for all the data and for each group, from
+    the sums of the statistics used by :class:`GroupMetricAccumulator`
+    """
+    # Imported here since the statistics are those of the metric in this module
+    from ._sufficient_statistics import _METRIC_STATISTICS, _evaluate_sums, _statistic_sums
+
+    metric_statistics = _METRIC_STATISTICS[balanced_root_mean_squared_error]
+    sums = _statistic_sums(metric_statistics, y_t, y_p, codes, n_groups, sample_weight=s_w)
+    if s_w is not None and (np.any(sums[:, 1] == 0) or np.any(sums[:, 3] == 0)):
+        # Tell a class with zero total weight apart from a missing one
+        class_counts = np.bincount(2 * codes + (y_t == 1), minlength=2 * n_groups)
+        if np.all(class_counts > 0):
+            raise ValueError(_MESSAGE_ZERO_CLASS_WEIGHT)
+    return _evaluate_sums(metric_statistics, sums)
@@ -0,0 +1,248 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import warnings
+
+import numpy as np
+from sklearn.utils import check_random_state
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _disparities, _make_group_metric_result
+from ._sufficient_statistics import _check_binary_labels, _get_metric_statistics
+from ._sufficient_statistics import _evaluate_sums, _statistic_sums
+
+_POISSON = "poisson"
+_MULTINOMIAL = "multinomial"
+_MESSAGE_BAD_METHOD = "Bootstrap method must be one of {0}".format([_POISSON, _MULTINOMIAL])
+
+# Upper bound on the number of elements in the matrix of bootstrap weights
+# (or of permuted group codes) which is held in memory at any one time
+_MAX_BLOCK_ELEMENTS = 2 ** 24
+
+
+class GroupMetricBootstrapResult:
+    """Class to hold the bootstrap confidence intervals of a grouped metric,
+    produced by calling the :func:`bootstrap_metric_by_group` function.
+
+    Each interval is a ``(lower, upper)`` tuple of percentiles of
+    the bootstrap replicates.
+    """
+
+    def __init__(self):
+        # The GroupMetricResult for the original data
+        self._result = None
+        # The intervals for the overall metric, and for each group
+        self._overall = None
+        self._by_group = {}
+        # The intervals for the disparities between the groups
+        self._range = None
+        self._range_ratio = None
+        self._confidence_level = None
+
+    @property
+    def result(self):
+        """Gets the :class:`GroupMetricResult` for the original data
+        """
+        return self._result
+
+    @result.setter
+    def result(self, value):
+        self._result = value
+
+    @property
+    def overall(self):
+        """Gets the interval for the value of the metric calculated
+        over the entire dataset
+        """
+        return self._overall
+
+    @overall.setter
+    def overall(self, value):
+        self._overall = value
+
+    @property
+    def by_group(self):
+        """Gets the dictionary of the intervals for the value of the
+        metric calculated for each sub-group in the dataset
+        """
+        return self._by_group
+
+    @by_group.setter
+    def by_group(self, value):
+        self._by_group = value
+
+    @property
+    def range(self):
+        """Gets the interval for the difference between the maximum
+        and minimum values of the metric across the groups
+        """
+        return self._range
+
+    @range.setter
+    def range(self, value):
+        self._range = value
+
+    @property
+    def range_ratio(self):
+        """Gets the interval for the ratio of the minimum to the maximum
+        value of the metric across the groups
+        """
+        return self._range_ratio
+
+    @range_ratio.setter
+    def range_ratio(self, value):
+        self._range_ratio = value
+
+    @property
+    def confidence_level(self):
+        """Gets the confidence level of the intervals
+        """
+        return self._confidence_level
+
+    @confidence_level.setter
+    def confidence_level(self, value):
+        self._confidence_level = value
+
+
+def bootstrap_metric_by_group(metric_function, y_true, y_pred, group_membership,
+                              sample_weight=None, *,
+                              n_bootstrap=1000, confidence_level=0.95,
+                              method=_POISSON, pos_label=1, random_state=None):
+    """Computes bootstrap confidence intervals for a metric evaluated on each
+    subgroup of a set of data, and for the disparities between the groups.
+
+    Rather than calling the metric on each resample, each bootstrap replicate
+    is represented by a vector of resampling weights. The (weighted) sums of
+    the statistics from which the metric is computed are then found for all
+    the replicates and groups with a few reductions over a matrix of
+    such weights. The supported metrics are those supported by
+    :class:`GroupMetricAccumulator`.
+
+    :param metric_function: The metric to be computed
+    :type metric_function: func
+
+    :param y_true: Array of ground-truth values
+
+    :param y_pred: Array of predicted values
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param n_bootstrap: The number of bootstrap replicates
+    :type n_bootstrap: int
+
+    :param confidence_level: The fraction of the bootstrap distribution lying
+        within each interval
+    :type confidence_level: float
+
+    :param method: Either ``"poisson"``, in which case each sample is given an
+        independent Poisson(1) resampling weight, or ``"multinomial"``, in which case
+        the data are resampled with replacement (giving multinomial weights).
+        The former is cheaper to generate, and very close to the latter for large
+        datasets
+    :type method: str
+
+    :param pos_label: The label of the positive class, for the classification metrics
+
+    :param random_state: Seed or random number generator for the resampling
+    :type random_state: int or :class:`numpy.random.RandomState`
+
+    :rtype: :class:`GroupMetricBootstrapResult`
+    """
+    if method not in [_POISSON, _MULTINOMIAL]:
+        raise ValueError(_MESSAGE_BAD_METHOD)
+    metric_statistics = _get_metric_statistics(metric_function)
+
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if metric_statistics.binary:
+        labels = set(np.unique(y_a).tolist()) | set(np.unique(y_p).tolist())
+        _check_binary_labels(metric_function, labels, pos_label)
+
+    partition = GroupPartition(g_d)
+    sums = _statistic_sums(metric_statistics, y_a, y_p, partition.codes, partition.n_groups,
+                           pos_label=pos_label, sample_weight=s_w)
+    overall, by_group = _evaluate_sums(metric_statistics, sums)
+    result = _make_group_metric_result(overall, partition.groups, by_group)
+
+    replicate_sums = _bootstrap_statistic_sums(metric_statistics, y_a, y_p, partition, s_w,
+                                               pos_label, n_bootstrap, method,
+                                               check_random_state(random_state))
+
+    # Groups may have no data in some replicates, giving NaN values
+    # which are ignored
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        overall = metric_statistics.evaluate(replicate_sums.sum(axis=1))
+        by_group = metric_statistics.evaluate(replicate_sums)
+        ranges, range_ratios = _replicate_disparities(by_group)
+
+        alpha = 100 * (1 - confidence_level) / 2
+        percentiles = [alpha, 100 - alpha]
+        overall_bounds = np.nanpercentile(overall, percentiles)
+        by_group_bounds = np.nanpercentile(by_group, percentiles, axis=0)
+        range_bounds = np.nanpercentile(ranges, percentiles)
+        range_ratio_bounds = np.nanpercentile(range_ratios, percentiles)
+
+    bootstrap_result = GroupMetricBootstrapResult()
+    bootstrap_result.result = result
+    bootstrap_result.overall = tuple(overall_bounds)
+    for group, lower, upper in zip(partition.groups, by_group_bounds[0], by_group_bounds[1]):
+        bootstrap_result.by_group[group] = (lower, upper)
+    bootstrap_result.range = tuple(range_bounds)
+    bootstrap_result.range_ratio = tuple(range_ratio_bounds)
+    bootstrap_result.confidence_level = confidence_level
+
+    return bootstrap_result
+
+
+def _replicate_disparities(by_group):
+    """Computes the range and range ratio of the groups' values in each row
+    of ``by_group``, following the same rules as :func:`metric_by_group`.
+    Groups with NaN values are ignored
+    """
+    with warnings.catch_warnings():
+        # A replicate may have no groups with values
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        minimum = np.nanmin(by_group, axis=1)
+        maximum = np.nanmax(by_group, axis=1)
+    return _disparities(minimum, maximum)
+
+
+def _bootstrap_statistic_sums(metric_statistics, y_a, y_p, partition, s_w, pos_label,
+                              n_bootstrap, method, random_state):
+    """Computes the ``(n_bootstrap, n_groups, n_statistics + 1)`` array of the sums
+    of the statistics for each bootstrap replicate and group.
+    The data are sorted by group, so that the sums for each block of replicates
+    are reductions over contiguous segments of the matrix of resampling weights
+    """
+    n_samples = len(partition)
+    order = partition.order
+    starts = partition.offsets[:-1]
+
+    statistics = [statistic[order]
+                  for statistic in metric_statistics.statistics(y_a, y_p, pos_label)]
+    w_s = None if s_w is None else s_w[order]
+
+    block_size = max(1, _MAX_BLOCK_ELEMENTS // max(n_samples, 1))
+    sums = np.empty((n_bootstrap, partition.n_groups, len(statistics) + 1))
+    for block_start in range(0, n_bootstrap, block_size):
+        block = slice(block_start, min(block_start + block_size, n_bootstrap))
+        n_block = block.stop - block.start
+
+        # The resampling weights are independent of the data, so can be
+        # generated directly in the sorted order
+        if method == _POISSON:
+            weights = random_state.poisson(1.0, size=(n_block, n_samples)).astype(float)
+        else:
+            weights = random_state.multinomial(n_samples, np.full(n_samples, 1.0 / n_samples),
+                                               size=n_block).astype(float)
+        if w_s is not None:
+            weights *= w_s
+
+        for i, statistic in enumerate(statistics):
+            sums[block, :, i] = np.add.reduceat(weights * statistic, starts, axis=1)
+        sums[block, :, -1] = np.add.reduceat(weights, starts, axis=1)
+
+    return sums
@@ -0,0 +1,189 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import functools
+import hashlib
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from ._group_partition import _is_categorical
+from ._metrics_engine import metric_by_group
+
+_MESSAGE_BAD_MAXSIZE = "maxsize must be a positive integer"
+
+
+class GroupMetricCache:
+    """Class which caches the results of grouped metrics, so that repeating
+    a computation on unchanged data does not evaluate the metric again.
+
+    Results are keyed by the metric, the values of any other arguments, and
+    a fingerprint of the contents of each input array (a hash of its buffer,
+    along with its dtype and shape). Modifying an array in place therefore
+    changes its fingerprint, and the result is recomputed. Computing the
+    fingerprints requires a pass over the data, but this is much cheaper than
+    evaluating most metrics.
+
+    When the cache holds ``maxsize`` results, the least recently used is
+    discarded to make room for a new one. The cached results are returned
+    as they are, so should not be modified.
+
+    Caching is opt-in: results are only cached when metrics are evaluated
+    through :meth:`evaluate`, :meth:`metric_by_group` or a function returned
+    by :meth:`wrap`.
+
+    :param maxsize: The maximum number of results to keep
+    :type maxsize: int
+    """
+
+    def __init__(self, maxsize=128):
+        if not isinstance(maxsize, (int, np.integer)) or maxsize < 1:
+            raise ValueError(_MESSAGE_BAD_MAXSIZE)
+
+        self._maxsize = int(maxsize)
+        self._results = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def maxsize(self):
+        """Gets the maximum number of results which are kept
+        """
+        return self._maxsize
+
+    @property
+    def hits(self):
+        """Gets the number of results which have been found in the cache
+        """
+        return self._hits
+
+    @property
+    def misses(self):
+        """Gets the number of results which have had to be computed
+        """
+        return self._misses
+
+    def evaluate(self, group_metric_function, y_true, y_pred, group_membership,
+                 *args, **kwargs):
+        """Evaluates a grouped metric (such as :func:`group_recall_score`, or
+        a function returned by :func:`make_group_metric`), unless its result
+        for the same arguments is already in the cache
+
+        :param group_metric_function: Function with signature
+            ``(y_true, y_pred, group_membership, ...)`` which returns
+            a :class:`GroupMetricResult`
+
+        :param y_true: Array of ground-truth values
+
+        :param y_pred: Array of predicted values
+
+        :param group_membership: Array Indicating the group to which each input value belongs
+
+        :return: The result of calling ``group_metric_function`` with the
+            given arguments
+        :rtype: :class:`GroupMetricResult`
+        """
+        def compute():
+            return group_metric_function(y_true, y_pred, group_membership, *args, **kwargs)
+
+        return self._cached(group_metric_function, (y_true, y_pred, group_membership) + args,
+                            kwargs, compute)
+
+    def metric_by_group(self, metric_function, y_true, y_pred, group_membership,
+                        sample_weight=None, **kwargs):
+        """Calls :func:`metric_by_group`, unless its result for the same
+        arguments is already in the cache. The arguments are the same
+        as for :func:`metric_by_group`
+
+        :rtype: :class:`GroupMetricResult`
+        """
+        def compute():
+            return metric_by_group(metric_function, y_true, y_pred, group_membership,
+                                   sample_weight, **kwargs)
+
+        return self._cached((metric_by_group, metric_function),
+                            (y_true, y_pred, group_membership, sample_weight),
+                            kwargs, compute)
+
+    def wrap(self, group_metric_function):
+        """Returns a version of a grouped metric whose results are cached
+        in this cache
+
+        :param group_metric_function: Function with signature
+            ``(y_true, y_pred, group_membership, ...)`` which returns
+            a :class:`GroupMetricResult`
+
+        :rtype: func
+        """
+        @functools.wraps(group_metric_function)
+        def wrapper(y_true, y_pred, group_membership, *args, **kwargs):
+            return self.evaluate(group_metric_function, y_true, y_pred, group_membership,
+                                 *args, **kwargs)
+
+        return wrapper
+
+    def clear(self):
+        """Discards all the cached results. The ``hits`` and ``misses``
+        are not reset
+        """
+        self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def _cached(self, function_key, args, kwargs, compute):
+        try:
+            key = (function_key,
+                   tuple(_fingerprint(arg) for arg in args),
+                   tuple(sorted((name, _fingerprint(value)) for name, value in kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Some argument cannot be fingerprinted, so the result is not cached
+            self._misses += 1
+            return compute()
+
+        if key in self._results:
+            self._hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        self._misses += 1
+        result = compute()
+        self._results[key] = result
+        if len(self._results) > self._maxsize:
+            self._results.popitem(last=False)
+        return result
+
+
+def _fingerprint(value):
+    """Returns a hashable value which identifies the contents of an argument.
+    Raises a TypeError if there is no such value
+    """
+    if value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        # Include the type, since (for example) 1 == 1.0 == True
+        return (type(value), value)
+
+    if hasattr(value, 'columns'):
+        return ('columns', tuple(value.columns),
+                tuple(_fingerprint(value.iloc[:, i]) for i in range(value.shape[1])))
+    if _is_categorical(value):
+        categorical = value.array if hasattr(value, 'array') else value
+        return ('categorical', _fingerprint(np.asarray(categorical.codes)),
+                _fingerprint(np.asarray(categorical.categories)))
+
+    if isinstance(value, (list, tuple, np.ndarray)) or hasattr(value, '__array__'):
+        array = np.asarray(value)
+        digest = hashlib.sha1()
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        if array.dtype.hasobject:
+            # The buffer only holds pointers, so hash the objects themselves
+            digest.update(pickle.dumps(array, protocol=4))
+        else:
+            digest.update(np.ascontiguousarray(array).reshape(-1).view(np.uint8).data)
+        return ('array', digest.digest())
+
+    # Other values (such as functions) are used as they are,
+    # and raise a TypeError if they cannot be hashed
+    hash(value)
+    return (type(value), value)
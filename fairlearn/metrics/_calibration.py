@@ -0,0 +1,179 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+
+_UNIFORM = "uniform"
+_QUANTILE = "quantile"
+_STRATEGIES = [_UNIFORM, _QUANTILE]
+
+_L1 = "l1"
+_L2 = "l2"
+_MAX = "max"
+_NORMS = [_L1, _L2, _MAX]
+
+_MESSAGE_BAD_PROBABILITIES = \
+    "y_prob must be a non-empty one-dimensional array of probabilities between 0 and 1"
+_MESSAGE_BAD_Y_TRUE = "y_true must be a one-dimensional array"
+_MESSAGE_BAD_N_BINS = "n_bins must be a positive integer"
+_MESSAGE_BAD_STRATEGY = "strategy must be one of {0}".format(_STRATEGIES)
+_MESSAGE_BAD_NORM = "norm must be one of {0}".format(_NORMS)
+
+
+def group_calibration_curve(y_true, y_prob, group_membership, sample_weight=None, *,
+                            n_bins=10, strategy=_UNIFORM, pos_label=1):
+    """Computes the calibration (or reliability) curve of each subgroup of a set
+    of data: the fraction of positive samples, and the mean predicted probability,
+    in each of a number of bins of the predicted probabilities.
+
+    The bins are the same for every group, and are found as by
+    :any:`sklearn.calibration.calibration_curve`. Each sample is then located in
+    its bin, and the (weighted) numbers of samples, of positive samples and the sums
+    of the probabilities in each (group, bin) cell are counted for all the groups
+    at once with :func:`numpy.bincount`, so the data are never split by group.
+
+    :param y_true: Array of ground-truth values
+
+    :param y_prob: Array of predicted probabilities of the positive class
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param n_bins: The number of bins
+    :type n_bins: int
+
+    :param strategy: How the bins are chosen. With ``'uniform'``, they are of equal
+        width over ``[0, 1]``. With ``'quantile'``, they hold equal numbers of
+        samples over all the data
+    :type strategy: str
+
+    :param pos_label: The label of the positive class in ``y_true``
+
+    :return: Dictionary with the keys ``"prob_true"``, ``"prob_pred"`` and
+        ``"bin_weight"``. Each value is a :class:`GroupMetricResult` whose ``overall``
+        value and ``by_group`` values are arrays of length ``n_bins``, holding the
+        fraction of positive samples, the mean predicted probability or the
+        (weighted) number of samples in each bin. The fractions and means are
+        NaN for empty bins, so dropping the NaNs gives the arrays which
+        :any:`sklearn.calibration.calibration_curve` returns
+    :rtype: dict of :class:`GroupMetricResult`
+    """
+    groups, bin_weights, bin_positives, bin_probabilities = _calibration_sums(
+        y_true, y_prob, group_membership, sample_weight, n_bins, strategy, pos_label)
+
+    overall_weights = bin_weights.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = {
+            "prob_true": _make_group_metric_result(bin_positives.sum(axis=0) / overall_weights,
+                                                   groups, bin_positives / bin_weights),
+            "prob_pred": _make_group_metric_result(
+                bin_probabilities.sum(axis=0) / overall_weights,
+                groups, bin_probabilities / bin_weights),
+        }
+    results["bin_weight"] = _make_group_metric_result(overall_weights, groups, bin_weights)
+    return results
+
+
+def group_calibration_error(y_true, y_prob, group_membership, sample_weight=None, *,
+                            n_bins=10, strategy=_UNIFORM, norm=_L1, pos_label=1):
+    """Computes the calibration error of the predicted probabilities for each
+    subgroup of a set of data, from the same binning as :func:`group_calibration_curve`.
+
+    With ``norm='l1'`` (the expected calibration error), this is the mean over the
+    bins of the absolute difference between the fraction of positive samples and
+    the mean predicted probability, weighted by the (weighted) number of samples
+    in each bin. With ``norm='l2'``, it is the square root of the weighted mean
+    of the squared differences, and with ``norm='max'`` (the maximum calibration
+    error), it is the largest difference in any non-empty bin.
+
+    :param y_true: Array of ground-truth values
+
+    :param y_prob: Array of predicted probabilities of the positive class
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param n_bins: The number of bins
+    :type n_bins: int
+
+    :param strategy: How the bins are chosen, as for :func:`group_calibration_curve`
+    :type strategy: str
+
+    :param norm: How the differences in the bins are combined: one of ``'l1'``,
+        ``'l2'`` or ``'max'``
+    :type norm: str
+
+    :param pos_label: The label of the positive class in ``y_true``
+
+    :return: Object containing the calibration error of all the data, and
+        of each group identified in ``group_membership``
+    :rtype: :class:`GroupMetricResult`
+    """
+    if norm not in _NORMS:
+        raise ValueError(_MESSAGE_BAD_NORM)
+
+    groups, bin_weights, bin_positives, bin_probabilities = _calibration_sums(
+        y_true, y_prob, group_membership, sample_weight, n_bins, strategy, pos_label)
+
+    def calibration_error(weights, positives, probabilities):
+        # The weighted differences, which are zero for empty bins
+        differences = np.abs(probabilities - positives)
+        total = weights.sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if norm == _L1:
+                return differences.sum(axis=-1) / total
+            mean_differences = np.where(weights > 0, differences / weights, 0)
+            if norm == _L2:
+                return np.sqrt((differences * mean_differences).sum(axis=-1) / total)
+            return mean_differences.max(axis=-1)
+
+    overall = calibration_error(bin_weights.sum(axis=0), bin_positives.sum(axis=0),
+                                bin_probabilities.sum(axis=0))
+    by_group = calibration_error(bin_weights, bin_positives, bin_probabilities)
+    return _make_group_metric_result(overall, groups, by_group)
+
+
+def _calibration_sums(y_true, y_prob, group_membership, sample_weight, n_bins, strategy,
+                      pos_label):
+    """Computes the ``(n_groups, n_bins)`` arrays of the (weighted) numbers of
+    samples, the numbers of positive samples and the sums of the probabilities
+    in each bin of each group, with one :func:`numpy.bincount` each.
+    Returns the groups and the three arrays
+    """
+    if not isinstance(n_bins, (int, np.integer)) or n_bins < 1:
+        raise ValueError(_MESSAGE_BAD_N_BINS)
+    if strategy not in _STRATEGIES:
+        raise ValueError(_MESSAGE_BAD_STRATEGY)
+
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_prob, group_membership,
+                                                   sample_weight)
+    if y_p.ndim != 1 or y_p.dtype.kind not in 'biuf' or len(y_p) == 0:
+        raise ValueError(_MESSAGE_BAD_PROBABILITIES)
+    if y_p.min() < 0 or y_p.max() > 1:
+        raise ValueError(_MESSAGE_BAD_PROBABILITIES)
+    if y_a.ndim != 1:
+        raise ValueError(_MESSAGE_BAD_Y_TRUE)
+
+    if strategy == _QUANTILE:
+        edges = np.percentile(y_p, np.linspace(0, 100, n_bins + 1))
+    else:
+        edges = np.linspace(0.0, 1.0, n_bins + 1)
+    # As for sklearn, a probability on an inner edge falls in the lower bin
+    bins = np.searchsorted(edges[1:-1], y_p)
+
+    partition = GroupPartition(g_d)
+    n_cells = partition.n_groups * n_bins
+    cells = partition.codes * n_bins + bins
+    weights = np.ones(len(y_p)) if s_w is None else s_w.astype(float)
+    positives = np.where(y_a == pos_label, weights, 0)
+
+    def cell_sums(values):
+        return np.bincount(cells, weights=values, minlength=n_cells).reshape(-1, n_bins)
+
+    return (partition.groups, cell_sums(weights), cell_sums(positives),
+            cell_sums(weights * y_p))
@@ -0,0 +1,196 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import _make_group_metric_result
+
+
+class BinaryConfusionCounts:
+    """Class holding the (weighted) confusion matrix of a binary
+    classifier for every group in the data, computed with a single
+    :func:`numpy.bincount` over the combined (group, y_true, y_pred) codes.
+
+    The counts are held in a tensor of shape ``(n_groups, 2, 2)``, indexed
+    as ``[group, y_true == pos_label, y_pred == pos_label]``. All of the
+    binary classification metrics can then be derived from this tensor
+    without looking at the data again.
+
+    :param y_true: Array of ground-truth values
+
+    :param y_pred: Array of predicted values
+
+    :param partition: The partition of the data into groups
+    :type partition: :class:`GroupPartition`
+
+    :param pos_label: The label of the positive class
+
+    :param sample_weight: Optional weights to apply to each input value
+    """
+
+    def __init__(self, y_true, y_pred, partition, pos_label=1, sample_weight=None):
+        self._groups = partition.groups
+
+        index = partition.codes * 4
+        index += 2 * (np.asarray(y_true) == pos_label)
+        index += (np.asarray(y_pred) == pos_label)
+
+        n_groups = partition.n_groups
+        self._counts = np.bincount(index,
+                                   weights=sample_weight,
+                                   minlength=4 * n_groups).reshape(n_groups, 2, 2)
+
+    @property
+    def groups(self):
+        """Gets the array of groups corresponding to the first axis of ``counts``
+        """
+        return self._groups
+
+    @property
+    def counts(self):
+        """Gets the ``(n_groups, 2, 2)`` tensor of confusion counts
+        """
+        return self._counts
+
+    def accuracy_score(self, normalize=True):
+        return self.evaluate(_accuracy_score, normalize)
+
+    def zero_one_loss(self, normalize=True):
+        return self.evaluate(_zero_one_loss, normalize)
+
+    def precision_score(self):
+        return self.evaluate(_precision_score)
+
+    def recall_score(self):
+        return self.evaluate(_recall_score)
+
+    def specificity_score(self):
+        return self.evaluate(_specificity_score)
+
+    def miss_rate(self):
+        return self.evaluate(_miss_rate)
+
+    def fallout_rate(self):
+        return self.evaluate(_fallout_rate)
+
+    def selection_rate(self):
+        return self.evaluate(_selection_rate)
+
+    def evaluate(self, count_metric, *args):
+        """Evaluates a metric for the entire dataset and for each group
+
+        :param count_metric: Function which computes the metric from a tensor of
+            confusion counts whose final two dimensions are ``(y_true, y_pred)``
+
+        :rtype: :class:`GroupMetricResult`
+        """
+        overall = count_metric(self._counts.sum(axis=0), *args)
+        by_group = count_metric(self._counts, *args)
+        return _make_group_metric_result(overall, self._groups, by_group)
+
+
+def _binary_confusion_counts(y_true, y_pred, group_membership, sample_weight, pos_label=None,
+                             allowed_labels=None):
+    """Computes the :class:`BinaryConfusionCounts` for the given data, if
+    they fully describe it.
+    Returns ``None`` if they do not (such as when there are more than two
+    labels, or one of them is not in ``allowed_labels``), in which
+    case the caller should evaluate the metric directly.
+
+    If ``pos_label`` is ``None`` then the greater of the labels is
+    taken to be the positive one.
+    """
+    pos_label = _counts_pos_label(_binary_labels(y_true, y_pred), pos_label, allowed_labels)
+    if pos_label is None:
+        return None
+
+    return BinaryConfusionCounts(y_true, y_pred, GroupPartition(group_membership),
+                                 pos_label=pos_label, sample_weight=sample_weight)
+
+
+def _counts_pos_label(labels, pos_label=None, allowed_labels=None):
+    """Returns the positive label for which :class:`BinaryConfusionCounts`
+    fully describe data containing the given set of labels, or ``None``
+    if there is no such label
+    """
+    if labels is None:
+        return None
+    if allowed_labels is not None and not labels.issubset(allowed_labels):
+        return None
+
+    if pos_label is None:
+        return max(labels)
+    elif len(labels - {pos_label}) > 1:
+        return None
+    return pos_label
+
+
+def _binary_labels(y_true, y_pred):
+    """Returns the set of labels appearing in ``y_true`` and ``y_pred``, or
+    ``None`` if the data are not from a binary classifier with labels
+    which can be compared to each other
+    """
+    if y_true.ndim != 1 or y_pred.ndim != 1 or len(y_true) == 0:
+        return None
+
+    labels = set(np.unique(y_true)) | set(np.unique(y_pred))
+    if len(labels) > 2:
+        return None
+    try:
+        sorted(labels)
+    except TypeError:
+        # Labels of mixed types
+        return None
+    return labels
+
+
+def _divide(numerator, denominator, zero_division):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.where(denominator == 0, zero_division, numerator / denominator)
+    # Do not return zero-dimensional arrays for the overall values
+    return result[()]
+
+
+def _accuracy_score(counts, normalize):
+    correct = counts[..., 0, 0] + counts[..., 1, 1]
+    if normalize:
+        return _divide(correct, counts.sum(axis=(-2, -1)), np.nan)
+    return correct
+
+
+def _zero_one_loss(counts, normalize):
+    # As for sklearn, this is the complement of the accuracy
+    if normalize:
+        return 1 - _accuracy_score(counts, normalize)
+    return counts.sum(axis=(-2, -1)) - _accuracy_score(counts, normalize)
+
+
+def _precision_score(counts):
+    # As for sklearn, the precision is zero if there are no positive predictions
+    tp = counts[..., 1, 1]
+    return _divide(tp, tp + counts[..., 0, 1], 0.0)
+
+
+def _recall_score(counts):
+    # As for sklearn, the recall is zero if there are no positive samples
+    tp = counts[..., 1, 1]
+    return _divide(tp, tp + counts[..., 1, 0], 0.0)
+
+
+def _specificity_score(counts):
+    tn = counts[..., 0, 0]
+    return _divide(tn, tn + counts[..., 0, 1], np.nan)
+
+
+def _miss_rate(counts):
+    return 1 - _recall_score(counts)
+
+
+def _fallout_rate(counts):
+    return 1 - _specificity_score(counts)
+
+
+def _selection_rate(counts):
+    selected = counts[..., 0, 1] + counts[..., 1, 1]
+    return _divide(selected, counts.sum(axis=(-2, -1)), np.nan)
@@ -0,0 +1,81 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._group_partition import GroupPartition, _factorize
+
+
+def _confusion_matrix_tensor(y_true, y_pred, group_membership, labels=None,
+                             sample_weight=None, require_all_labels=True):
+    """Computes the ``(n_groups, n_labels, n_labels)`` tensor of the (weighted)
+    confusion matrices of all the groups with a single :func:`numpy.bincount`
+    over the combined group, true label and predicted label codes. Each matrix
+    is laid out as for :any:`sklearn.metrics.confusion_matrix`, with the labels
+    given, or all those which occur in either array (sorted). Samples with
+    a label which is not in ``labels`` are ignored.
+
+    Returns the :class:`GroupPartition` and the tensor, or ``None`` if the data
+    are not one-dimensional. If ``require_all_labels`` is set, ``None`` is also
+    returned when the tensor would not match the matrices which sklearn computes
+    for each group on its own; that is, if some group does not contain every
+    label (when ``labels`` is not given), or none of the labels in its ``y_true``
+    (when they are)
+    """
+    if y_true.ndim != 1 or y_pred.ndim != 1:
+        return None
+
+    true_values, true_codes = _factorize(y_true)
+    pred_values, pred_codes = _factorize(y_pred)
+    labels_given = labels is not None
+    if labels_given:
+        labels = np.asarray(labels)
+    else:
+        labels = np.union1d(true_values, pred_values)
+    n_labels = len(labels)
+    true_index = _label_index(true_values, labels)[true_codes]
+    pred_index = _label_index(pred_values, labels)[pred_codes]
+
+    partition = GroupPartition(group_membership)
+    n_groups = partition.n_groups
+    codes = partition.codes
+    if require_all_labels:
+        if labels_given:
+            present = np.bincount(codes[true_index >= 0], minlength=n_groups) > 0
+        else:
+            present = (np.bincount(codes * n_labels + true_index,
+                                   minlength=n_groups * n_labels) > 0)
+            present[codes * n_labels + pred_index] = True
+        if not np.all(present):
+            return None
+
+    valid = (true_index >= 0) & (pred_index >= 0)
+    if not np.all(valid):
+        true_index = true_index[valid]
+        pred_index = pred_index[valid]
+        codes = codes[valid]
+        if sample_weight is not None:
+            sample_weight = sample_weight[valid]
+
+    n_cells = n_groups * n_labels * n_labels
+    cells = (codes * n_labels + true_index) * n_labels + pred_index
+    if sample_weight is None:
+        tensor = np.bincount(cells, minlength=n_cells)
+    else:
+        tensor = np.bincount(cells, weights=sample_weight, minlength=n_cells)
+        if sample_weight.dtype.kind in 'biu':
+            # As for sklearn, integer weights give integer counts
+            tensor = tensor.astype(np.int64)
+    return partition, tensor.reshape(n_groups, n_labels, n_labels)
+
+
+def _label_index(values, labels):
+    """Finds the position in ``labels`` of each of the (unique) values,
+    giving -1 for those which are not present
+    """
+    if len(labels) == 0:
+        return np.full(len(values), -1, dtype=np.intp)
+    sorter = np.argsort(labels, kind='stable')
+    positions = np.searchsorted(labels, values, sorter=sorter)
+    index = sorter[np.minimum(positions, len(labels) - 1)]
+    return np.where(labels[index] == values, index, -1)
@@ -0,0 +1,93 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import heapq
+
+import numpy as np
+
+_DIFFERENCE = 'difference'
+_RATIO = 'ratio'
+
+_MESSAGE_BAD_METHOD = "method must be 'difference' or 'ratio'"
+_MESSAGE_NOT_SCALAR = "Disparities require the metric to have a single number for each group"
+_MESSAGE_NEGATIVE_RATIO = "The largest ratio disparities require non-negative values"
+_MESSAGE_BAD_K = "k must be a positive integer"
+
+
+def _scalar_values(values):
+    values = np.asarray(values)
+    if values.ndim != 1 or values.dtype.kind not in 'biuf':
+        raise ValueError(_MESSAGE_NOT_SCALAR)
+    return values.astype(float, copy=False)
+
+
+def _disparity(first, second, method):
+    """Computes the disparity of ``first`` relative to ``second`` (broadcasting
+    them against each other), as their difference or their ratio
+    """
+    if method == _DIFFERENCE:
+        return np.subtract(first, second)
+    if method == _RATIO:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.true_divide(first, second)
+    raise ValueError(_MESSAGE_BAD_METHOD)
+
+
+def _pairwise_disparities(values, method):
+    """Computes the matrix of the disparities between every pair of groups,
+    by broadcasting the column of values against the row
+    """
+    values = _scalar_values(values)
+    return _disparity(values[:, np.newaxis], values[np.newaxis, :], method)
+
+
+def _largest_disparities(values, k, method):
+    """Finds the ``k`` pairs of groups with the largest disparities, without
+    computing the disparities of every pair.
+
+    Once the values are sorted, the largest disparity is between the first
+    and last values, and the disparity of a pair can only decrease when either
+    end moves inwards. The pairs are therefore visited in order of decreasing
+    disparity with a heap holding the frontier, which takes ``O(k log k)``
+    time after the sort. Undefined (NaN) values are ignored.
+
+    Returns a list of ``(higher, lower, disparity)`` tuples, in which
+    ``higher`` and ``lower`` are the positions of the groups with the higher
+    and lower values. The disparity is ``higher - lower`` or ``lower / higher``
+    (with ``0 / 0`` taken to be 1), so the largest disparities have the largest
+    differences, or the smallest ratios.
+    """
+    if not isinstance(k, (int, np.integer)) or isinstance(k, bool) or k < 1:
+        raise ValueError(_MESSAGE_BAD_K)
+    if method not in (_DIFFERENCE, _RATIO):
+        raise ValueError(_MESSAGE_BAD_METHOD)
+    values = _scalar_values(values)
+    positions = np.flatnonzero(~np.isnan(values))
+    positions = positions[np.argsort(values[positions], kind='stable')]
+    ordered = values[positions]
+    if method == _RATIO and len(ordered) > 0 and ordered[0] < 0:
+        raise ValueError(_MESSAGE_NEGATIVE_RATIO)
+
+    def priority(low, high):
+        # The heap pops its smallest entry first
+        if method == _DIFFERENCE:
+            return ordered[low] - ordered[high]
+        if ordered[high] == 0:
+            return 1.0
+        return ordered[low] / ordered[high]
+
+    result = []
+    n_values = len(ordered)
+    if n_values < 2:
+        return result
+    frontier = [(priority(0, n_values - 1), 0, n_values - 1)]
+    visited = {(0, n_values - 1)}
+    while frontier and len(result) < k:
+        key, low, high = heapq.heappop(frontier)
+        disparity = -key if method == _DIFFERENCE else key
+        result.append((positions[high], positions[low], disparity))
+        for pair in ((low + 1, high), (low, high - 1)):
+            if pair[0] < pair[1] and pair not in visited:
+                visited.add(pair)
+                heapq.heappush(frontier, (priority(*pair),) + pair)
+    return result
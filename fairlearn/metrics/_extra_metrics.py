@@ -7,6 +7,8 @@ which are not available as part of scikit-learn.
 
 import sklearn.metrics as skm
 
+from ._confusion_counts import BinaryConfusionCounts, _binary_confusion_counts
+from ._metrics_engine import metric_by_group, _convert_and_check_inputs, _counts_as_weights
 from ._balanced_root_mean_squared_error import balanced_root_mean_squared_error  # noqa: F401
 from ._mean_predictions import mean_prediction, mean_overprediction, mean_underprediction  # noqa: F401,E501
 from ._selection_rate import selection_rate  # noqa: F401,E501
@@ -55,3 +57,48 @@ def fallout_rate(y_true, y_pred, sample_weight=None):
     # aka False Positive Rate
     # Since we use specificity, also restricted to binary classification
     return 1 - specificity_score(y_true, y_pred, sample_weight)
+
+
+def group_specificity_score(y_true, y_pred, group_membership, sample_weight=None, *, counts=None):
+    """A grouped metric for the :any:`specificity_score`.
+    When the labels are taken from {0, 1}, the metric is computed
+    for every group from a single pass over the data.
+    If ``counts`` is given, each row is taken to occur that many times.
+    """
+    return _binary_group_metric(specificity_score, BinaryConfusionCounts.specificity_score,
+                                y_true, y_pred, group_membership, sample_weight, counts)
+
+
+def group_miss_rate(y_true, y_pred, group_membership, sample_weight=None, *, counts=None):
+    """A grouped metric for the :any:`miss_rate`.
+    When the labels are taken from {0, 1}, the metric is computed
+    for every group from a single pass over the data.
+    If ``counts`` is given, each row is taken to occur that many times.
+    """
+    return _binary_group_metric(miss_rate, BinaryConfusionCounts.miss_rate,
+                                y_true, y_pred, group_membership, sample_weight, counts)
+
+
+def group_fallout_rate(y_true, y_pred, group_membership, sample_weight=None, *, counts=None):
+    """A grouped metric for the :any:`fallout_rate`.
+    When the labels are taken from {0, 1}, the metric is computed
+    for every group from a single pass over the data.
+    If ``counts`` is given, each row is taken to occur that many times.
+    """
+    return _binary_group_metric(fallout_rate, BinaryConfusionCounts.fallout_rate,
+                                y_true, y_pred, group_membership, sample_weight, counts)
+
+
+def _binary_group_metric(metric_function, count_metric_function,
+                         y_true, y_pred, group_membership, sample_weight, counts=None):
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    confusion_counts = _binary_confusion_counts(y_a, y_p, g_d, s_w, pos_label=1,
+                                                allowed_labels={0, 1})
+    if confusion_counts is not None:
+        return count_metric_function(confusion_counts)
+
+    return metric_by_group(metric_function, y_true, y_pred, group_membership, sample_weight)
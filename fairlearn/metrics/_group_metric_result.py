@@ -1,18 +1,74 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
+import numpy as np
+import pandas as pd
+
+from ._disparities import _disparity, _largest_disparities, _pairwise_disparities
+from ._disparities import _scalar_values
+
+
+class _ByGroupDict(dict):
+    """Dictionary which records whether it has been modified, so that a
+    :class:`GroupMetricResult` knows when its arrays are out of date
+    """
+
+    __slots__ = ('modified',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    def __setitem__(self, key, value):
+        self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        self.modified = True
+        super().clear()
+
+    def pop(self, *args):
+        self.modified = True
+        return super().pop(*args)
+
+    def popitem(self):
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, *args):
+        self.modified = True
+        return super().setdefault(*args)
+
+    def update(self, *args, **kwargs):
+        self.modified = True
+        super().update(*args, **kwargs)
+
 
 class GroupMetricResult:
     """Class to hold the result of a grouped metric, produced by calling
     the :func:`metric_by_group` function.
+
+    The values of the metric for the groups are held in a pair of arrays,
+    available from :attr:`groups` and :meth:`to_numpy`. The ``by_group``
+    dictionary is only built from these arrays when it is first used.
     """
 
+    __slots__ = ('_overall', '_groups', '_values', '_by_group', '_minimum', '_maximum',
+                 '_argmin_set', '_argmax_set', '_range', '_range_ratio')
+
     def __init__(self):
         # The 'overall' property is the given metric evaluated without regard to group
         self._overall = None
+        # The arrays of the groups found in the input, and of the metric for each
+        self._groups = None
+        self._values = None
         # The 'by_group' dictionary contains the metric for each group found in the
-        # input
-        self._by_group = {}
+        # input. It is created from the arrays when first needed
+        self._by_group = None
         # The following two properties list the minimum and maximum metric values in
         # the by_group dictionary
         self._minimum = None
@@ -46,11 +102,138 @@ class GroupMetricResult:
         the result of applying the metric function to the set of
         ``y_true`` and ``y_pred`` entries for each key.
         """
+        if self._by_group is None:
+            if self._groups is None:
+                self._by_group = _ByGroupDict()
+            else:
+                self._by_group = _ByGroupDict(zip(self._groups, self._values))
         return self._by_group
 
     @by_group.setter
     def by_group(self, value):
         self._by_group = value
+        self._groups = None
+        self._values = None
+
+    @property
+    def groups(self):
+        """Gets the array of the groups found in the data, in the same order
+        as the values returned by :meth:`to_numpy`
+        """
+        self._update_arrays()
+        return self._groups
+
+    def to_numpy(self):
+        """Gets the array of the values of the metric for each group, in the
+        same order as ``groups``. This is not a copy, so should not be modified.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        self._update_arrays()
+        return self._values
+
+    def to_frame(self, name='value'):
+        """Gets the values of the metric for each group as a
+        :class:`pandas.DataFrame` indexed by group, without copying
+        them where possible. Intersectional groups (given as tuples)
+        give a :class:`pandas.MultiIndex`.
+
+        :param name: The name of the column holding the values
+        :type name: str
+
+        :rtype: :class:`pandas.DataFrame`
+        """
+        self._update_arrays()
+        values = self._values
+        if values.ndim > 1:
+            # Keep each group's (array) value in a single cell
+            values = _object_array(list(values))
+        if len(self._groups) > 0 and isinstance(self._groups[0], tuple):
+            index = pd.MultiIndex.from_tuples(list(self._groups))
+        else:
+            index = pd.Index(self._groups)
+        return pd.DataFrame({name: values}, index=index, copy=False)
+
+    def pairwise_disparities(self, method='difference'):
+        """Gets the matrix of the disparities between every pair of groups,
+        computed by broadcasting the array of values against itself. The rows
+        and columns are in the same order as ``groups``, and the entry ``[i, j]``
+        is the value for group ``i`` minus (or divided by) that for group ``j``.
+        This requires the metric to have a single number for each group.
+
+        For very many groups, :meth:`largest_disparities` finds the worst pairs
+        without building this matrix.
+
+        :param method: Either ``'difference'`` or ``'ratio'``
+        :type method: str
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return _pairwise_disparities(self.to_numpy(), method)
+
+    def disparities_to_overall(self, method='difference'):
+        """Gets the disparity between the value for each group and the
+        ``overall`` value, in the same order as ``groups``. That is, each value
+        minus (or divided by) the overall value.
+
+        :param method: Either ``'difference'`` or ``'ratio'``
+        :type method: str
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return _disparity(_scalar_values(self.to_numpy()), self.overall, method)
+
+    def largest_disparities(self, k=1, method='difference'):
+        """Gets the ``k`` pairs of groups with the largest disparities, from the
+        largest downwards. These are the pairs with the largest differences, or
+        the smallest ratios of the lower value to the higher. Only ``O(k)`` pairs
+        are examined once the values have been sorted, so this is fast even when
+        there are too many groups to build :meth:`pairwise_disparities`.
+        Undefined (NaN) values are ignored, so unless there are any, the first
+        pair gives ``range`` or ``range_ratio``.
+
+        :param k: The number of pairs wanted
+        :type k: int
+
+        :param method: Either ``'difference'`` or ``'ratio'``. Ratios require
+            the values to be non-negative
+        :type method: str
+
+        :return: List of ``(higher_group, lower_group, disparity)`` tuples
+        :rtype: list
+        """
+        groups = self.groups
+        return [(groups[higher], groups[lower], disparity)
+                for higher, lower, disparity
+                in _largest_disparities(self.to_numpy(), k, method)]
+
+    def _set_arrays(self, groups, values):
+        """Sets the groups and the values of the metric for each group
+        """
+        if isinstance(groups, np.ndarray):
+            self._groups = groups
+        else:
+            # Avoid converting mixed types, or making tuples into rows
+            self._groups = _object_array(list(groups))
+        self._values = _value_array(values)
+        self._by_group = None
+
+    def _update_arrays(self):
+        # The dictionary is the source of truth if it might have been changed
+        # since the arrays were built (or if it was supplied by the user)
+        by_group = self._by_group
+        if by_group is None:
+            if self._groups is None:
+                self._set_arrays([], [])
+            return
+        if isinstance(by_group, _ByGroupDict) and not by_group.modified and \
+                self._groups is not None:
+            return
+
+        self._groups = _object_array(list(by_group.keys()))
+        self._values = _value_array(list(by_group.values()))
+        if isinstance(by_group, _ByGroupDict):
+            by_group.modified = False
 
     @property
     def minimum(self):
@@ -123,3 +306,29 @@ class GroupMetricResult:
     @range_ratio.setter
     def range_ratio(self, value):
         self._range_ratio = value
+
+
+def _object_array(items):
+    """Builds a one-dimensional array of objects, even if the items
+    are themselves sequences
+    """
+    result = np.empty(len(items), dtype=object)
+    for i, item in enumerate(items):
+        result[i] = item
+    return result
+
+
+def _value_array(values):
+    """Converts the values of a metric for each group to an array with one
+    entry (which may itself be an array) for each group
+    """
+    if isinstance(values, np.ndarray):
+        return values
+    try:
+        result = np.asarray(values)
+        if result.dtype != object:
+            return result
+    except ValueError:
+        # The values are arrays of different shapes
+        pass
+    return _object_array(values)
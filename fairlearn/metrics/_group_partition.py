@@ -0,0 +1,282 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+
+from .._input_validation import _CHUNK_SIZE
+
+# Bound on the mixed-radix keys for combinations of sensitive features,
+# above which the combinations seen so far are renumbered
+_MAX_KEY = 2 ** 62
+
+
+class GroupPartition:
+    """Class which factorizes a ``group_membership`` array once, so that
+    every subgroup of the data can be reached without rescanning the
+    entire array.
+
+    The unique groups are found with a single sort, and each sample is
+    assigned an integer code giving the index of its group in
+    ``groups``. A stable argsort of the codes then places the members
+    of each group in a contiguous slice, whose bounds are given by
+    ``offsets``. The indices of group ``i`` are therefore
+    ``order[offsets[i]:offsets[i+1]]``, listed in their original order.
+
+    If ``group_membership`` has several columns (one for each sensitive
+    feature), then the groups are the combinations of values which occur
+    in the data, and are given as tuples. Each column is factorized
+    separately, and the codes of the columns are combined into a single
+    mixed-radix integer key for each sample, so no combined labels
+    (such as concatenated strings) are ever built.
+
+    Inputs which are already coded do not need to be sorted. The codes of a
+    :class:`pandas.Categorical` (or of a categorical :class:`pandas.Series`) are
+    used directly, after renumbering the categories so that the groups are
+    sorted, and dropping any categories which do not occur. Integer
+    (or boolean) inputs whose range is not much larger than the number of
+    samples are factorized by counting, rather than sorting.
+
+    Long inputs are factorized in chunks, so that only the codes are as long
+    as the data. A memory-mapped ``group_membership`` (such as an
+    :class:`numpy.memmap`) is therefore never read into memory all at once.
+
+    :param group_membership: Array indicating the group to which each input value belongs.
+        This may also be a two-dimensional array or :class:`pandas.DataFrame`
+        with one column for each sensitive feature
+    """
+
+    def __init__(self, group_membership):
+        columns = _group_columns(group_membership)
+        if len(columns) == 1:
+            self._groups, self._codes = _factorize(columns[0])
+        else:
+            self._groups, self._codes = _factorize_columns(columns)
+        self._counts = np.bincount(self._codes, minlength=len(self._groups))
+        # The order and offsets are only needed when slicing out groups
+        # so are computed on first use
+        self._order = None
+        self._offsets = None
+
+    @property
+    def groups(self):
+        """Gets the sorted array of unique groups (or of tuples of the
+        values of each sensitive feature, if there are several)
+        """
+        return self._groups
+
+    @property
+    def n_groups(self):
+        """Gets the number of unique groups
+        """
+        return len(self._groups)
+
+    @property
+    def codes(self):
+        """Gets the array giving the index in ``groups`` of the group
+        to which each sample belongs
+        """
+        return self._codes
+
+    @property
+    def counts(self):
+        """Gets the number of samples in each group
+        """
+        return self._counts
+
+    @property
+    def order(self):
+        """Gets the permutation of the samples which sorts them by group,
+        preserving their original order within each group
+        """
+        if self._order is None:
+            self._order = np.argsort(self._codes, kind='stable')
+        return self._order
+
+    @property
+    def offsets(self):
+        """Gets the ``n_groups + 1`` boundaries of the groups within ``order``
+        """
+        if self._offsets is None:
+            self._offsets = np.zeros(self.n_groups + 1, dtype=np.intp)
+            np.cumsum(self._counts, out=self._offsets[1:])
+        return self._offsets
+
+    def indices(self, group_index):
+        """Gets the indices of the samples in the group at position
+        ``group_index`` of ``groups``
+        """
+        offsets = self.offsets
+        return self.order[offsets[group_index]:offsets[group_index + 1]]
+
+    def __len__(self):
+        return len(self._codes)
+
+
+def _is_categorical(group_membership):
+    return isinstance(getattr(group_membership, 'dtype', None), pd.CategoricalDtype)
+
+
+def _group_columns(group_membership):
+    """Splits ``group_membership`` into a list of one-dimensional arrays,
+    one for each sensitive feature. Categorical data are left as they are,
+    to keep their codes
+    """
+    if hasattr(group_membership, 'columns'):
+        # Convert each column of a DataFrame separately, to keep its dtype
+        columns = [group_membership.iloc[:, i] for i in range(group_membership.shape[1])]
+        return [c if _is_categorical(c) else np.asarray(c) for c in columns]
+    if _is_categorical(group_membership):
+        return [group_membership]
+
+    g_d = np.asarray(group_membership)
+    if g_d.ndim == 2 and g_d.shape[1] > 1:
+        return [g_d[:, i] for i in range(g_d.shape[1])]
+    return [g_d.reshape(-1)]
+
+
+def _factorize_columns(columns):
+    """Finds the combinations of values of several sensitive features which
+    occur in the data, sorted lexicographically, and the index of the
+    combination to which each sample belongs
+    """
+    n_samples = len(columns[0])
+    keys = np.zeros(n_samples, dtype=np.int64)
+    n_keys = 1
+    column_values = []
+    column_codes = []
+    for column in columns:
+        values, codes = _factorize(column)
+        radix = max(len(values), 1)
+        if n_keys * radix > _MAX_KEY:
+            # Renumber the combinations seen so far. This preserves
+            # their order, so the final order is still lexicographic
+            _, keys = np.unique(keys, return_inverse=True)
+            keys = keys.reshape(-1).astype(np.int64)
+            n_keys = int(keys.max()) + 1 if n_samples > 0 else 1
+        keys = keys * radix + codes
+        n_keys *= radix
+        column_values.append(values)
+        column_codes.append(codes)
+
+    # Only the observed combinations become groups
+    if n_keys <= 2 * n_samples + 1024:
+        observed = np.bincount(keys, minlength=n_keys) > 0
+        key_codes = np.cumsum(observed) - 1
+        codes = key_codes[keys]
+        n_groups = int(np.count_nonzero(observed))
+    else:
+        unique_keys, codes = np.unique(keys, return_inverse=True)
+        codes = codes.reshape(-1)
+        n_groups = len(unique_keys)
+
+    # Recover the values of each group from any one of its members
+    representatives = np.empty(n_groups, dtype=np.intp)
+    representatives[codes] = np.arange(n_samples)
+    group_values = [values[c[representatives]].tolist()
+                    for values, c in zip(column_values, column_codes)]
+
+    groups = np.empty(n_groups, dtype=object)
+    for i, group in enumerate(zip(*group_values)):
+        groups[i] = group
+    return groups, codes.astype(np.intp)
+
+
+def _factorize(column):
+    """Finds the sorted unique values in a column, and the index of the value
+    of each sample within them
+    """
+    if _is_categorical(column):
+        result = _factorize_categorical(column)
+        if result is not None:
+            return result
+
+    column = np.asarray(column).reshape(-1)
+    if column.dtype.kind in 'biu':
+        result = _factorize_integers(column)
+        if result is not None:
+            return result
+
+    if len(column) <= _CHUNK_SIZE:
+        values, codes = np.unique(column, return_inverse=True)
+        return values, codes.reshape(-1)
+    return _factorize_chunks(column)
+
+
+def _chunks(column):
+    for start in range(0, len(column), _CHUNK_SIZE):
+        yield start, column[start:start + _CHUNK_SIZE]
+
+
+def _factorize_chunks(column):
+    """Factorizes a long column one chunk at a time. The unique values of
+    the chunks are merged, and then each chunk is located among them.
+    Only the codes are as long as the column, so a memory-mapped column
+    is never read into memory all at once
+    """
+    values = None
+    for _, chunk in _chunks(column):
+        chunk_values = np.unique(chunk)
+        values = chunk_values if values is None else np.union1d(values, chunk_values)
+
+    codes = np.empty(len(column), dtype=np.intp)
+    for start, chunk in _chunks(column):
+        codes[start:start + len(chunk)] = np.searchsorted(values, chunk)
+    return values, codes
+
+
+def _factorize_categorical(column):
+    """Factorizes categorical data using their codes.
+    Returns ``None`` if there are missing values, or the categories
+    cannot be sorted
+    """
+    categorical = column.array if isinstance(column, pd.Series) else column
+    codes = np.asarray(categorical.codes)
+    categories = np.asarray(categorical.categories)
+    if len(codes) > 0 and codes.min() < 0:
+        return None
+    try:
+        category_order = np.argsort(categories, kind='stable')
+    except TypeError:
+        return None
+
+    # Renumber the categories in sorted order, leaving out those not used
+    used = np.bincount(codes, minlength=len(categories))[category_order] > 0
+    new_codes = np.empty(len(categories), dtype=np.intp)
+    new_codes[category_order] = np.cumsum(used) - 1
+    return categories[category_order][used], new_codes[codes]
+
+
+def _factorize_integers(column):
+    """Factorizes integer data by counting the occurrences of each value
+    in their range. Returns ``None`` if the range is too large for this
+    to be cheaper than sorting
+    """
+    if len(column) == 0:
+        return None
+    if column.dtype.kind == 'b':
+        low = 0
+        all_values = np.array([False, True])
+    else:
+        low = column.min()
+        span = int(column.max()) - int(low) + 1
+        if span > 2 * len(column) + 1024:
+            return None
+        all_values = np.arange(span).astype(column.dtype) + low
+
+    def offsets(chunk):
+        if chunk.dtype.kind == 'b':
+            return chunk.view(np.uint8).astype(np.intp)
+        if chunk.dtype.kind == 'u':
+            return (chunk - low).astype(np.intp)
+        return (chunk.astype(np.int64) - int(low)).astype(np.intp)
+
+    used = np.zeros(len(all_values), dtype=bool)
+    for _, chunk in _chunks(column):
+        used |= np.bincount(offsets(chunk), minlength=len(all_values)) > 0
+    new_codes = np.cumsum(used) - 1
+
+    codes = np.empty(len(column), dtype=np.intp)
+    for start, chunk in _chunks(column):
+        codes[start:start + len(chunk)] = new_codes[offsets(chunk)]
+    return all_values[used], codes
@@ -3,6 +3,10 @@
 
 import numpy as np
 
+from ._group_partition import GroupPartition
+from ._metrics_engine import metric_by_group, _convert_and_check_inputs
+from ._metrics_engine import _counts_as_weights, _make_group_metric_result
+
 
 def mean_prediction(y_true, y_pred, sample_weight=None):
     """Returns the (weighted) mean prediction. The true
@@ -16,7 +20,7 @@ def mean_prediction(y_true, y_pred, sample_weight=None):
     .. literalinclude:: /../test/unit/metrics/test_mean_predictions.py
         :linenos:
         :language: python
-        :lines: 8-13
+        :lines: 11-16
         :dedent: 4
 
     With weights
@@ -24,17 +28,14 @@ def mean_prediction(y_true, y_pred, sample_weight=None):
     .. literalinclude:: /../test/unit/metrics/test_mean_predictions.py
         :linenos:
         :language: python
-        :lines: 17-23
+        :lines: 20-26
         :dedent: 4
 
     """
 
     y_p = np.squeeze(np.asarray(y_pred))
-    s_w = np.ones(len(y_p))
-    if sample_weight is not None:
-        s_w = np.squeeze(np.asarray(sample_weight))
 
-    return np.dot(y_p, s_w) / s_w.sum()
+    return _mean(y_p, sample_weight)
 
 
 def mean_overprediction(y_true, y_pred, sample_weight=None):
@@ -45,14 +46,8 @@ def mean_overprediction(y_true, y_pred, sample_weight=None):
 
     y_t = np.squeeze(np.asarray(y_true))
     y_p = np.squeeze(np.asarray(y_pred))
-    s_w = np.ones(len(y_p))
-    if sample_weight is not None:
-        s_w = np.squeeze(np.asarray(sample_weight))
-
-    err = y_p - y_t
-    err[err < 0] = 0
 
-    return np.dot(err, s_w) / s_w.sum()
+    return _mean(_overprediction(y_t, y_p), sample_weight)
 
 
 def mean_underprediction(y_true, y_pred, sample_weight=None):
@@ -62,12 +57,104 @@ def mean_underprediction(y_true, y_pred, sample_weight=None):
     """
     y_t = np.squeeze(np.asarray(y_true))
     y_p = np.squeeze(np.asarray(y_pred))
-    s_w = np.ones(len(y_p))
-    if sample_weight is not None:
-        s_w = np.squeeze(np.asarray(sample_weight))
 
-    err = y_p - y_t
-    err[err > 0] = 0
+    return _mean(_underprediction(y_t, y_p), sample_weight)
+
+
+def group_mean_prediction(y_true, y_pred, group_membership, sample_weight=None, *,
+                          n_jobs=None, counts=None):
+    """A grouped wrapper around the :any:`mean_prediction` routine.
+
+    For one-dimensional numeric data, the mean prediction of every
+    group is computed with a single :func:`numpy.bincount`. If ``counts``
+    is given, each row is taken to occur that many times.
+    """
+    return _group_mean(mean_prediction, _prediction,
+                       y_true, y_pred, group_membership, sample_weight, n_jobs, counts)
+
 
-    # Error metrics should decrease to 0 so have to flip sign
-    return -np.dot(err, s_w) / s_w.sum()
+def group_mean_overprediction(y_true, y_pred, group_membership, sample_weight=None, *,
+                              n_jobs=None, counts=None):
+    """A grouped wrapper around the :any:`mean_overprediction` routine.
+
+    For one-dimensional numeric data, the mean overprediction of every
+    group is computed with a single :func:`numpy.bincount`. If ``counts``
+    is given, each row is taken to occur that many times.
+    """
+    return _group_mean(mean_overprediction, _overprediction,
+                       y_true, y_pred, group_membership, sample_weight, n_jobs, counts)
+
+
+def group_mean_underprediction(y_true, y_pred, group_membership, sample_weight=None, *,
+                               n_jobs=None, counts=None):
+    """A grouped wrapper around the :any:`mean_underprediction` routine.
+
+    For one-dimensional numeric data, the mean underprediction of every
+    group is computed with a single :func:`numpy.bincount`. If ``counts``
+    is given, each row is taken to occur that many times.
+    """
+    return _group_mean(mean_underprediction, _underprediction,
+                       y_true, y_pred, group_membership, sample_weight, n_jobs, counts)
+
+
+def _mean(values, sample_weight):
+    if sample_weight is None:
+        return values.sum() / values.size
+
+    s_w = np.squeeze(np.asarray(sample_weight))
+    return np.dot(values, s_w) / s_w.sum()
+
+
+def _prediction(y_t, y_p):
+    return y_p
+
+
+def _overprediction(y_t, y_p):
+    # Clip the errors in place, rather than with a mask
+    err = np.subtract(y_p, y_t, dtype=float)
+    return np.maximum(err, 0, out=err)
+
+
+def _underprediction(y_t, y_p):
+    # Error metrics should decrease to 0 so the sign is flipped
+    err = np.subtract(y_t, y_p, dtype=float)
+    return np.maximum(err, 0, out=err)
+
+
+def _group_mean(metric_function, statistic, y_true, y_pred, group_membership,
+                sample_weight, n_jobs, counts=None):
+    """Computes the (weighted) mean of a per-sample statistic for every group
+    with :func:`numpy.bincount`, falling back to :func:`metric_by_group`
+    for data which are not one-dimensional and numeric
+    """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if y_p.ndim != 1 or y_p.dtype.kind not in 'biuf' or \
+            (statistic is not _prediction and
+             (y_a.ndim != 1 or y_a.dtype.kind not in 'biuf')):
+        return metric_by_group(metric_function, y_true, y_pred, group_membership,
+                               sample_weight, n_jobs=n_jobs)
+
+    partition = GroupPartition(g_d)
+    values = statistic(y_a, y_p)
+    if s_w is None:
+        weight_sums = partition.counts
+    else:
+        if values is y_p:
+            values = values * s_w
+        else:
+            values *= s_w
+        weight_sums = np.bincount(partition.codes, weights=s_w, minlength=partition.n_groups)
+    sums = np.bincount(partition.codes, weights=values, minlength=partition.n_groups)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        by_group = sums / weight_sums
+    # The overall value is computed as by metric_by_group
+    if s_w is None:
+        overall = metric_function(y_a, y_p)
+    else:
+        overall = metric_function(y_a, y_p, sample_weight=s_w)
+    return _make_group_metric_result(overall, partition.groups, by_group)
@@ -2,13 +2,39 @@
 # Licensed under the MIT License.
 
 import numpy as np
+import sklearn.metrics as skm
+from joblib import Parallel, delayed, effective_n_jobs
 
+from ._arrow import _arrow_to_numpy, _as_numpy, _is_arrow
 from ._group_metric_result import GroupMetricResult
+from ._group_partition import GroupPartition, _is_categorical
 
 _MESSAGE_SIZE_MISMATCH = "Array {0} is not the same size as {1}"
+_MESSAGE_BAD_COUNTS = "counts must be non-negative integers"
 
+# The metrics for which weighting a sample by an integer gives the same result
+# as repeating it that many times, so that the counts of aggregated rows can be
+# used as sample weights. The metrics which can be computed from sums of per-sample
+# statistics are also frequency weighted (see :func:`_is_frequency_weighted`)
+_FREQUENCY_WEIGHTED_METRICS = {
+    skm.accuracy_score,
+    skm.balanced_accuracy_score,
+    skm.confusion_matrix,
+    skm.f1_score,
+    skm.log_loss,
+    skm.mean_absolute_error,
+    skm.mean_squared_error,
+    skm.mean_squared_log_error,
+    skm.precision_score,
+    skm.r2_score,
+    skm.recall_score,
+    skm.roc_auc_score,
+    skm.zero_one_loss
+}
 
-def metric_by_group(metric_function, y_true, y_pred, group_membership, sample_weight=None):
+
+def metric_by_group(metric_function, y_true, y_pred, group_membership, sample_weight=None, *,
+                    n_jobs=None, counts=None):
     """ Applies a metric to each subgroup of a set of data
 
     :param metric_function: Function with signature ``(y_true, y_pred, sample_weight=None)``
@@ -18,74 +44,69 @@ def metric_by_group(metric_function, y_true, y_pred, group_membership, sample_we
 
     :param y_pred: Array of predicted values
 
-    :param group_membership: Array Indicating the group to which each input value belongs
+    :param group_membership: Array Indicating the group to which each input value belongs.
+        For intersectional groups, this may be a two-dimensional array or
+        :class:`pandas.DataFrame` with one column for each sensitive feature, in which
+        case the groups are the combinations of values which occur in the data,
+        and the results are keyed by tuples
+    :type group_membership: array of shape ``(n_samples,)`` or ``(n_samples, n_features)``
 
     :param sample_weight: Optional weights to apply to each input value
 
+    :param n_jobs: The number of jobs used to evaluate the metric for the
+        groups in parallel, as for :class:`joblib.Parallel`. By default, the
+        groups are evaluated one after another (unless a :func:`joblib.parallel_backend`
+        context says otherwise). This is worthwhile for
+        expensive metrics on data with many groups. The ``metric_function``
+        must be picklable (by :mod:`cloudpickle`) if processes are used
+    :type n_jobs: int
+
+    :param counts: Optional number of times each row occurs, for data which
+        have been aggregated into their unique rows. The results are the same
+        as for the data with each row repeated ``counts`` times. For metrics
+        (such as :any:`sklearn.metrics.accuracy_score`) in which an integer
+        sample weight is the same as repeating the sample, the counts are
+        used as weights, so that the time and memory needed scale with the
+        number of unique rows. Other metrics (such as
+        :any:`sklearn.metrics.median_absolute_error`) are evaluated on the
+        repeated rows, one group at a time
+    :type counts: array of non-negative integers
+
     :return: Object containing the result of applying ``metric_function`` to the entire dataset
         and to each group identified in ``group_membership``.
         If the ``metric_function`` returns a scalar, then additional fields are populated
     :rtype: :class:`GroupMetricResult`
     """
-    _check_array_sizes(y_true, y_pred, 'y_true', 'y_pred')
-    _check_array_sizes(y_true, group_membership, 'y_true', 'group_membership')
-    if sample_weight is not None:
-        _check_array_sizes(y_true, sample_weight, 'y_true', 'sample_weight')
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if counts is not None:
+        y_a, y_p, g_d, s_w, counts = _drop_zero_counts(y_a, y_p, g_d, s_w, counts)
+        if _is_frequency_weighted(metric_function):
+            s_w = _frequency_weights(s_w, counts)
+            counts = None
 
-    result = GroupMetricResult()
+    # Factorize the groups once, rather than comparing every
+    # element of g_d against each group in turn
+    partition = GroupPartition(g_d)
 
-    # Make everything a numpy array
-    # This allows for fast slicing of the groups
-    y_a = np.squeeze(np.asarray(y_true))
-    y_p = np.squeeze(np.asarray(y_pred))
-    g_d = np.squeeze(np.asarray(group_membership))
-    s_w = None
-    if sample_weight is not None:
-        s_w = np.squeeze(np.asarray(sample_weight))
+    return _metrics_by_partition([metric_function], y_a, y_p, partition, s_w,
+                                 n_jobs=n_jobs, counts=counts)[0]
 
-    # Evaluate the overall metric with the numpy arrays
-    # This ensures consistency in how metric_function is called
-    if s_w is not None:
-        result.overall = metric_function(y_a, y_p, sample_weight=s_w)
-    else:
-        result.overall = metric_function(y_a, y_p)
 
-    groups = np.unique(group_membership)
-    for group in groups:
-        group_indices = (group == g_d)
-        group_actual = y_a[group_indices]
-        group_predict = y_p[group_indices]
-        group_weight = None
-        if s_w is not None:
-            group_weight = s_w[group_indices]
-            result.by_group[group] = metric_function(group_actual,
-                                                     group_predict,
-                                                     sample_weight=group_weight)
-        else:
-            result.by_group[group] = metric_function(group_actual, group_predict)
+def _is_frequency_weighted(metric_function):
+    """Returns whether weighting a sample by an integer is the same as
+    repeating it, for the given metric
+    """
+    # Imported here since the metrics in it are built on this module
+    from ._sufficient_statistics import _METRIC_STATISTICS
 
     try:
-        result.minimum = min(result.by_group.values())
-        result.maximum = max(result.by_group.values())
-
-        result.argmin_set = set([k for k, v in result.by_group.items() if v == result.minimum])  # noqa:E501
-        result.argmax_set = set([k for k, v in result.by_group.items() if v == result.maximum])  # noqa:E501
-
-        result.range = result.maximum - result.minimum
-        if result.minimum < 0:
-            result.range_ratio = np.nan
-        elif result.maximum == 0:
-            # We have min=max=0
-            result.range_ratio = 1
-        else:
-            result.range_ratio = result.minimum / result.maximum
-    except ValueError:
-        # Nothing to do
-        # Failed to compute an extra result, most likely because operation (such as min)
-        # was not defined for the return type (e.g. doing confusion matrices)
-        pass
-
-    return result
+        # Weighting a sample by an integer is the same as repeating it in a sum
+        return metric_function in _FREQUENCY_WEIGHTED_METRICS or \
+            metric_function in _METRIC_STATISTICS
+    except TypeError:
+        # Not hashable
+        return False
 
 
 def make_group_metric(metric_function):
@@ -96,15 +117,18 @@ def make_group_metric(metric_function):
     :type metric_function: func
 
     :return: A wrapped version of the supplied metric_function. It will have
-        signature ``(y_true, y_pred, group_membership, sample_weight)``
+        signature ``(y_true, y_pred, group_membership, sample_weight, *, n_jobs, counts)``
     :rtype: func
     """
-    def wrapper(y_true, y_pred, group_membership, sample_weight=None):
+    def wrapper(y_true, y_pred, group_membership, sample_weight=None, *, n_jobs=None,
+                counts=None):
         return metric_by_group(metric_function,
                                y_true,
                                y_pred,
                                group_membership,
-                               sample_weight)
+                               sample_weight,
+                               n_jobs=n_jobs,
+                               counts=counts)
 
     # Improve the name of the returned function
     wrapper.__name__ = "group_{0}".format(metric_function.__name__)
@@ -115,3 +139,228 @@ def make_group_metric(metric_function):
 def _check_array_sizes(a, b, a_name, b_name):
     if len(a) != len(b):
         raise ValueError(_MESSAGE_SIZE_MISMATCH.format(b_name, a_name))
+
+
+def _metrics_by_partition(metric_functions, y_a, y_p, partition, s_w, n_jobs=None,
+                          counts=None):
+    """Applies each of a list of metrics to the entire dataset, and to each
+    group in the given :class:`GroupPartition`.
+    The data for each group are only sliced out once, no matter how many
+    metrics there are.
+    If ``n_jobs`` is given, the groups are split into chunks which are
+    evaluated in parallel by :class:`joblib.Parallel`.
+    If ``counts`` is given, each row is repeated that many times.
+    Returns a list of :class:`GroupMetricResult` objects, in the same order as
+    ``metric_functions``
+    """
+    results = [GroupMetricResult() for _ in metric_functions]
+
+    # Evaluate the overall metric with the numpy arrays
+    # This ensures consistency in how metric_function is called
+    if counts is None:
+        overall = (y_a, y_p, s_w)
+    else:
+        rows = np.repeat(np.arange(len(counts)), counts)
+        overall = (y_a[rows], y_p[rows], None if s_w is None else s_w[rows])
+    for metric_function, result in zip(metric_functions, results):
+        result.overall = _call_metric(metric_function, *overall)
+
+    order = partition.order
+    offsets = partition.offsets
+    if effective_n_jobs(n_jobs) == 1 or partition.n_groups < 2:
+        group_values = _metrics_for_segments(metric_functions, y_a, y_p, s_w, order, offsets,
+                                             counts)
+    else:
+        # Use several chunks per worker, to even out groups of different sizes.
+        # The input arrays are the same for every chunk, so joblib only needs
+        # to share them with the worker processes once
+        n_chunks = min(partition.n_groups, 4 * effective_n_jobs(n_jobs))
+        boundaries = np.linspace(0, partition.n_groups, n_chunks + 1).astype(int)
+        chunk_values = Parallel(n_jobs=n_jobs)(
+            delayed(_metrics_for_segments)(metric_functions, y_a, y_p, s_w, order,
+                                           offsets[start:stop + 1], counts)
+            for start, stop in zip(boundaries[:-1], boundaries[1:]))
+        group_values = [values for chunk in chunk_values for values in chunk]
+
+    for i, result in enumerate(results):
+        result._set_arrays(partition.groups, [values[i] for values in group_values])
+        _compute_summaries(result)
+
+    return results
+
+
+def _metrics_for_segments(metric_functions, y_a, y_p, s_w, order, offsets, counts=None):
+    """Applies each of a list of metrics to the groups whose indices are
+    found in the consecutive segments of ``order`` bounded by ``offsets``,
+    with each row repeated ``counts`` times (if given).
+    Returns a list containing the list of metric values for each group
+    """
+    group_values = []
+    for start, stop in zip(offsets[:-1], offsets[1:]):
+        group_indices = order[start:stop]
+        if counts is not None:
+            group_indices = np.repeat(group_indices, counts[group_indices])
+        group_actual = y_a[group_indices]
+        group_predict = y_p[group_indices]
+        group_weight = None
+        if s_w is not None:
+            group_weight = s_w[group_indices]
+        group_values.append([_call_metric(metric_function,
+                                          group_actual,
+                                          group_predict,
+                                          group_weight)
+                             for metric_function in metric_functions])
+    return group_values
+
+
+def _call_metric(metric_function, y_true, y_pred, sample_weight):
+    if sample_weight is not None:
+        return metric_function(y_true, y_pred, sample_weight=sample_weight)
+    else:
+        return metric_function(y_true, y_pred)
+
+
+def _convert_and_check_inputs(y_true, y_pred, group_membership, sample_weight):
+    """Checks that the inputs to a grouped metric are all the same size,
+    and converts them to numpy arrays.
+    This allows for fast slicing of the groups
+    """
+    _check_array_sizes(y_true, y_pred, 'y_true', 'y_pred')
+    _check_array_sizes(y_true, group_membership, 'y_true', 'group_membership')
+    if sample_weight is not None:
+        _check_array_sizes(y_true, sample_weight, 'y_true', 'sample_weight')
+
+    y_a = _squeeze(_as_numpy(y_true))
+    y_p = _squeeze(_as_numpy(y_pred))
+    g_d = _convert_group_membership(group_membership)
+    s_w = None
+    if sample_weight is not None:
+        s_w = _squeeze(_as_numpy(sample_weight))
+
+    return y_a, y_p, g_d, s_w
+
+
+def _squeeze(values):
+    """Removes the axes of length one from an array, except that an array
+    holding a single sample stays one-dimensional (so that a batch of one
+    row is not turned into a scalar)
+    """
+    squeezed = np.squeeze(values)
+    if squeezed.ndim == 0 and np.ndim(values) > 0:
+        return squeezed.reshape(1)
+    return squeezed
+
+
+def _counts_as_weights(y_true, y_pred, group_membership, sample_weight, counts):
+    """Converts the inputs to a grouped metric for data aggregated into rows which
+    occur ``counts`` times, for metrics in which weighting a sample by an integer
+    is the same as repeating it. The rows with zero counts are dropped (since
+    they would not be in the repeated data), and the counts are combined with
+    the sample weights. Returns the converted inputs
+    """
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    y_a, y_p, g_d, s_w, counts = _drop_zero_counts(y_a, y_p, g_d, s_w, counts)
+    return y_a, y_p, g_d, _frequency_weights(s_w, counts)
+
+
+def _drop_zero_counts(y_a, y_p, g_d, s_w, counts):
+    """Checks the counts of the aggregated rows, and removes the rows which
+    occur zero times from the (converted) inputs
+    """
+    _check_array_sizes(y_a, counts, 'y_true', 'counts')
+    counts = np.squeeze(_as_numpy(counts))
+    if counts.dtype.kind not in 'biuf':
+        raise ValueError(_MESSAGE_BAD_COUNTS)
+    if counts.dtype.kind == 'f':
+        if not np.all(np.isfinite(counts)) or np.any(counts != np.floor(counts)):
+            raise ValueError(_MESSAGE_BAD_COUNTS)
+    if np.any(counts < 0):
+        raise ValueError(_MESSAGE_BAD_COUNTS)
+    counts = counts.astype(np.int64, copy=False)
+
+    if np.all(counts > 0):
+        return y_a, y_p, g_d, s_w, counts
+    keep = counts > 0
+    return (y_a[keep], y_p[keep], g_d[keep], None if s_w is None else s_w[keep], counts[keep])
+
+
+def _frequency_weights(s_w, counts):
+    if s_w is None:
+        return counts
+    return s_w * counts
+
+
+def _convert_group_membership(group_membership):
+    """Converts ``group_membership`` to a numpy array, unless it has several
+    columns (one for each sensitive feature) or is categorical. In those cases,
+    it is left as it is so that :class:`GroupPartition` can factorize each
+    column separately, and use the codes of categorical data
+    """
+    if _is_arrow(group_membership):
+        group_membership = _arrow_to_numpy(group_membership)
+    if hasattr(group_membership, 'columns'):
+        if group_membership.shape[1] > 1:
+            return group_membership
+        if group_membership.shape[1] == 1:
+            group_membership = group_membership.iloc[:, 0]
+    if _is_categorical(group_membership):
+        return group_membership
+
+    g_d = np.asarray(group_membership)
+    if g_d.ndim == 2 and g_d.shape[1] > 1:
+        return g_d
+    return _squeeze(g_d)
+
+
+def _make_group_metric_result(overall, groups, values):
+    """Builds a :class:`GroupMetricResult` from the overall value of a metric,
+    and the array of its values for each of the given groups
+    """
+    result = GroupMetricResult()
+    result.overall = overall
+    result._set_arrays(groups, values)
+    _compute_summaries(result)
+    return result
+
+
+def _compute_summaries(result):
+    values = result.to_numpy()
+    if values.ndim == 1 and values.dtype.kind in 'iuf' and len(values) > 0 and \
+            not np.isnan(values).any():
+        groups = result.groups
+        result.minimum = values.min()
+        result.maximum = values.max()
+
+        result.argmin_set = set(groups[values == result.minimum])
+        result.argmax_set = set(groups[values == result.maximum])
+
+        result.range, result.range_ratio = _disparities(result.minimum, result.maximum)
+        return
+
+    # NaN values are compared as by min and max, as they always have been
+    try:
+        result.minimum = min(result.by_group.values())
+        result.maximum = max(result.by_group.values())
+
+        result.argmin_set = set([k for k, v in result.by_group.items() if v == result.minimum])  # noqa:E501
+        result.argmax_set = set([k for k, v in result.by_group.items() if v == result.maximum])  # noqa:E501
+
+        result.range, result.range_ratio = _disparities(result.minimum, result.maximum)
+    except ValueError:
+        # Nothing to do
+        # Failed to compute an extra result, most likely because operation (such as min)
+        # was not defined for the return type (e.g. doing confusion matrices)
+        pass
+
+
+def _disparities(minimum, maximum):
+    """Returns the range and range ratio of values with the given minimum and
+    maximum. These may be arrays, such as the minima and maxima of bootstrap replicates
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        range_ratio = np.where(np.less(minimum, 0), np.nan,
+                               np.where(np.equal(maximum, 0), 1,
+                                        np.divide(minimum, maximum)))
+    # Do not return zero-dimensional arrays for scalars
+    return maximum - minimum, range_ratio[()]
@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+from ._confusion_counts import _binary_labels
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+from ._metrics_engine import _metrics_by_partition
+from ._sufficient_statistics import _evaluate_sums, _statistic_sums, _vectorizable_statistics
+
+
+def metrics_by_group(metric_functions, y_true, y_pred, group_membership, sample_weight=None, *,
+                     n_jobs=None):
+    """Applies several metrics to each subgroup of a set of data.
+
+    This gives the same results as calling :func:`metric_by_group` for each
+    metric in turn, but the inputs are only validated, converted and split
+    into groups once.
+    The metrics which can be computed from sums of per-sample statistics
+    (those supported by :class:`GroupMetricAccumulator`) are computed from
+    those sums, and the metrics which share their statistics (such as the binary
+    classification metrics computed from the confusion matrix, like
+    :any:`sklearn.metrics.precision_score` and :any:`sklearn.metrics.recall_score`)
+    all share a single pass over the data.
+
+    :param metric_functions: Dictionary of functions with signature
+        ``(y_true, y_pred, sample_weight=None)`` which each return a scalar
+    :type metric_functions: dict
+
+    :param y_true: Array of ground-truth values
+
+    :param y_pred: Array of predicted values
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param n_jobs: The number of jobs used to evaluate the metrics which cannot be
+        computed from sums of statistics, as for :func:`metric_by_group`
+    :type n_jobs: int
+
+    :return: Dictionary with the same keys as ``metric_functions``, containing
+        the result of applying each metric to the entire dataset and to each group
+        identified in ``group_membership``
+    :rtype: dict of :class:`GroupMetricResult`
+    """
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    partition = GroupPartition(g_d)
+
+    results = {}
+    other_metrics = {}
+    sums_cache = _SumsCache(y_a, y_p, partition, s_w)
+    for name, metric_function in metric_functions.items():
+        sums_result = sums_cache.evaluate(metric_function)
+        if sums_result is not None:
+            results[name] = sums_result
+        else:
+            other_metrics[name] = metric_function
+
+    other_results = _metrics_by_partition(list(other_metrics.values()),
+                                          y_a, y_p, partition, s_w, n_jobs=n_jobs)
+    results.update(zip(other_metrics.keys(), other_results))
+
+    return {name: results[name] for name in metric_functions}
+
+
+class _SumsCache:
+    """Lazily computes the sums of the per-sample statistics of the metrics
+    being evaluated, so that the metrics with the same statistics (such as
+    those computed from the confusion counts) share the same sums
+    """
+
+    def __init__(self, y_a, y_p, partition, s_w):
+        self._y_a = y_a
+        self._y_p = y_p
+        self._partition = partition
+        self._s_w = s_w
+        self._labels = None
+        self._labels_found = False
+        self._sums = {}
+
+    def evaluate(self, metric_function):
+        """Returns the :class:`GroupMetricResult` for the metric, or ``None`` if it
+        cannot be computed from sums of statistics
+        """
+        metric_statistics = _vectorizable_statistics(metric_function, self._y_a, self._y_p,
+                                                     self._get_labels)
+        if metric_statistics is None:
+            return None
+
+        overall, by_group = _evaluate_sums(metric_statistics,
+                                           self._get_sums(metric_statistics))
+        return _make_group_metric_result(overall, self._partition.groups, by_group)
+
+    def _get_labels(self):
+        if not self._labels_found:
+            self._labels = _binary_labels(self._y_a, self._y_p)
+            self._labels_found = True
+        return self._labels
+
+    def _get_sums(self, metric_statistics):
+        statistics = metric_statistics.statistics
+        if statistics not in self._sums:
+            self._sums[statistics] = _statistic_sums(metric_statistics, self._y_a, self._y_p,
+                                                     self._partition.codes,
+                                                     self._partition.n_groups,
+                                                     sample_weight=self._s_w)
+        return self._sums[statistics]
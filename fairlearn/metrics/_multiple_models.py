@@ -0,0 +1,123 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._confusion_counts import _binary_labels
+from ._group_partition import GroupPartition
+from ._metrics_engine import _check_array_sizes, _convert_group_membership
+from ._metrics_engine import _make_group_metric_result
+from ._metrics_engine import _metrics_by_partition, _MESSAGE_SIZE_MISMATCH
+from ._sufficient_statistics import _evaluate_sums, _vectorizable_statistics
+
+
+def metric_by_group_for_models(metric_function, y_true, y_preds, group_membership,
+                               sample_weight=None, *, n_jobs=None):
+    """Applies a metric to each subgroup of a set of data, for the predictions
+    of several models at once.
+
+    This gives the same results as calling :func:`metric_by_group` for each
+    row of ``y_preds`` in turn, but the groups are only found once.
+    Furthermore, the metrics which can be computed from sums of per-sample
+    statistics (those supported by :class:`GroupMetricAccumulator`, such as
+    :any:`sklearn.metrics.accuracy_score` or :any:`sklearn.metrics.mean_squared_error`)
+    are computed for all the models with vectorized reductions over
+    ``y_preds``, rather than one model at a time.
+
+    :param metric_function: Function with signature ``(y_true, y_pred, sample_weight=None)``
+     which returns a scalar
+
+    :param y_true: Array of ground-truth values
+
+    :param y_preds: Matrix of predicted values, with one row for each model
+        and one column for each sample
+    :type y_preds: array of shape ``(n_models, n_samples)``
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param n_jobs: The number of jobs used to evaluate metrics which cannot be
+        vectorized, as for :func:`metric_by_group`
+    :type n_jobs: int
+
+    :return: List containing, for each model, the result of applying ``metric_function``
+        to the entire dataset and to each group identified in ``group_membership``
+    :rtype: list of :class:`GroupMetricResult`
+    """
+    y_a = np.squeeze(np.asarray(y_true))
+    y_ps = np.asarray(y_preds)
+    if y_ps.ndim == 1:
+        y_ps = y_ps.reshape(1, -1)
+    if y_ps.ndim != 2 or y_ps.shape[1] != len(y_true):
+        raise ValueError(_MESSAGE_SIZE_MISMATCH.format('y_preds', 'y_true'))
+    _check_array_sizes(y_true, group_membership, 'y_true', 'group_membership')
+    g_d = _convert_group_membership(group_membership)
+    s_w = None
+    if sample_weight is not None:
+        _check_array_sizes(y_true, sample_weight, 'y_true', 'sample_weight')
+        s_w = np.squeeze(np.asarray(sample_weight))
+
+    partition = GroupPartition(g_d)
+
+    kernel = _find_kernel(metric_function, y_a, y_ps)
+    if kernel is not None:
+        return kernel(y_a, y_ps, partition, s_w)
+
+    return [_metrics_by_partition([metric_function], y_a, y_p, partition, s_w,
+                                  n_jobs=n_jobs)[0]
+            for y_p in y_ps]
+
+
+def _find_kernel(metric_function, y_a, y_ps):
+    """Returns the function which computes the given metric for all models
+    at once, or ``None`` if there is no such function for these data
+    """
+    y_p = y_ps.reshape(-1)
+    metric_statistics = _vectorizable_statistics(metric_function, y_a, y_p,
+                                                 lambda: _binary_labels(y_a, y_p))
+    if metric_statistics is None:
+        return None
+    return _StatisticsKernel(metric_statistics)
+
+
+class _StatisticsKernel:
+    """Computes a metric from the (weighted) sums of its per-sample statistics
+    for every model and group, by summing each group's contiguous segment
+    of the data sorted by group
+    """
+
+    def __init__(self, metric_statistics):
+        self._metric_statistics = metric_statistics
+
+    def __call__(self, y_a, y_ps, partition, s_w):
+        order = partition.order
+        starts = partition.offsets[:-1]
+        w_s = None if s_w is None else s_w[order]
+
+        # The statistics broadcast over the models, apart from those
+        # which only depend on y_true
+        statistics = self._metric_statistics.statistics(y_a[order], y_ps[:, order], 1)
+        sums = np.empty((len(y_ps), partition.n_groups, len(statistics) + 1))
+        for i, statistic in enumerate(statistics):
+            sums[..., i] = _segment_sums(statistic, starts, w_s)
+        sums[..., -1] = partition.counts if w_s is None else _segment_sums(w_s, starts)
+
+        overall, by_group = _evaluate_sums(self._metric_statistics, sums)
+        return _make_model_results(overall, partition.groups, by_group)
+
+
+def _segment_sums(values, starts, weights=None):
+    """Sums the (weighted) values in each segment of the final axis
+    beginning at ``starts``
+    """
+    if weights is not None:
+        return np.add.reduceat(values * weights, starts, axis=-1)
+    if values.dtype == bool:
+        return np.add.reduceat(values, starts, axis=-1, dtype=np.intp)
+    return np.add.reduceat(values, starts, axis=-1)
+
+
+def _make_model_results(overall, groups, by_group):
+    return [_make_group_metric_result(model_overall, groups, model_by_group)
+            for model_overall, model_by_group in zip(overall, by_group)]
@@ -0,0 +1,85 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+from ._accumulators import GroupMetricAccumulator
+from ._arrow import _import_pyarrow
+from ._metrics_engine import metric_by_group
+from ._sufficient_statistics import _METRIC_STATISTICS
+
+
+def metric_by_group_from_parquet(metric_function, source, y_true, y_pred, group_membership,
+                                 sample_weight=None, *, n_jobs=None):
+    """Applies a metric to each subgroup of the data in a Parquet file,
+    reading only the columns which are needed. This requires the optional
+    ``pyarrow`` package.
+
+    Metrics which :class:`GroupMetricAccumulator` supports are computed from
+    one row group of the file at a time, so that only a single row group is
+    ever held in memory. Other metrics need all the data at once, so the
+    columns are read together and passed to :func:`metric_by_group`. In both
+    cases, columns of numbers without missing values are used as numpy arrays
+    without copying the buffers which Arrow read them into, and the groups
+    are taken from the codes of dictionary-encoded columns.
+
+    :param metric_function: Function with signature ``(y_true, y_pred, sample_weight=None)``
+        which returns a scalar
+
+    :param source: The path of the Parquet file, or any other source which
+        :class:`pyarrow.parquet.ParquetFile` accepts
+
+    :param y_true: The name of the column of ground-truth values
+    :type y_true: str
+
+    :param y_pred: The name of the column of predicted values
+    :type y_pred: str
+
+    :param group_membership: The name of the column indicating the group to which
+        each row belongs, or a list of names for intersectional groups
+    :type group_membership: str or list of str
+
+    :param sample_weight: The name of an optional column of weights
+    :type sample_weight: str
+
+    :param n_jobs: The number of jobs used by :func:`metric_by_group`, for
+        metrics which are not computed one row group at a time
+    :type n_jobs: int
+
+    :return: Object containing the result of applying ``metric_function`` to all the
+        data in the file, and to each group identified in ``group_membership``
+    :rtype: :class:`GroupMetricResult`
+    """
+    pyarrow = _import_pyarrow()
+    parquet_file = pyarrow.parquet.ParquetFile(source)
+
+    if isinstance(group_membership, str):
+        group_columns = [group_membership]
+    else:
+        group_columns = list(group_membership)
+    columns = [y_true, y_pred] + group_columns
+    if sample_weight is not None:
+        columns.append(sample_weight)
+    # Read each column once, even if it is used more than once
+    columns = list(dict.fromkeys(columns))
+
+    def select(table):
+        if len(group_columns) == 1:
+            groups = table.column(group_columns[0])
+        else:
+            groups = pyarrow.Table.from_arrays([table.column(name) for name in group_columns],
+                                               names=group_columns)
+        weights = None if sample_weight is None else table.column(sample_weight)
+        return table.column(y_true), table.column(y_pred), groups, weights
+
+    try:
+        _METRIC_STATISTICS[metric_function]
+    except (KeyError, TypeError):
+        # Not a metric we know about (or not hashable)
+        pass
+    else:
+        accumulator = GroupMetricAccumulator(metric_function)
+        for i in range(parquet_file.num_row_groups):
+            accumulator.update(*select(parquet_file.read_row_group(i, columns=columns)))
+        return accumulator.result()
+
+    table = parquet_file.read(columns=columns)
+    return metric_by_group(metric_function, *select(table), n_jobs=n_jobs)
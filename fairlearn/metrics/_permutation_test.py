@@ -0,0 +1,203 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import warnings
+
+import numpy as np
+from sklearn.utils import check_random_state
+
+from ._bootstrap import _MAX_BLOCK_ELEMENTS, _replicate_disparities
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+from ._sufficient_statistics import _check_binary_labels, _get_metric_statistics
+from ._sufficient_statistics import _evaluate_sums, _statistic_sums
+
+_MESSAGE_BAD_N_PERMUTATIONS = "n_permutations must be a positive integer"
+
+
+class GroupMetricPermutationResult:
+    """Class to hold the results of a permutation test of the disparities
+    between the groups, produced by calling the
+    :func:`permutation_test_metric_by_group` function.
+
+    Each p-value is the fraction of the permutations (counting the original
+    data as one of them) whose disparity is at least as large as that of
+    the original data.
+    """
+
+    def __init__(self):
+        # The GroupMetricResult for the original data
+        self._result = None
+        self._range_p_value = None
+        self._range_ratio_p_value = None
+        self._n_permutations = None
+
+    @property
+    def result(self):
+        """Gets the :class:`GroupMetricResult` for the original data
+        """
+        return self._result
+
+    @result.setter
+    def result(self, value):
+        self._result = value
+
+    @property
+    def range_p_value(self):
+        """Gets the p-value of the difference between the maximum and minimum
+        values of the metric across the groups, where larger differences are
+        more extreme
+        """
+        return self._range_p_value
+
+    @range_p_value.setter
+    def range_p_value(self, value):
+        self._range_p_value = value
+
+    @property
+    def range_ratio_p_value(self):
+        """Gets the p-value of the ratio of the minimum to the maximum value
+        of the metric across the groups, where smaller ratios are more extreme
+        """
+        return self._range_ratio_p_value
+
+    @range_ratio_p_value.setter
+    def range_ratio_p_value(self, value):
+        self._range_ratio_p_value = value
+
+    @property
+    def n_permutations(self):
+        """Gets the number of permutations of the group labels
+        """
+        return self._n_permutations
+
+    @n_permutations.setter
+    def n_permutations(self, value):
+        self._n_permutations = value
+
+
+def permutation_test_metric_by_group(metric_function, y_true, y_pred, group_membership,
+                                     sample_weight=None, *,
+                                     n_permutations=1000, pos_label=1, random_state=None):
+    """Tests whether the disparities between the groups in a metric could have
+    arisen by chance, by comparing the range and range ratio of the metric
+    with those obtained when the group labels are randomly permuted.
+
+    Rather than calling :func:`metric_by_group` for each permutation, the
+    permutations are generated in blocks, as a matrix of permuted group codes.
+    The (weighted) sums of the statistics from which the metric is computed are
+    then found for every permutation and group of a block with one
+    :func:`numpy.bincount` per statistic. The supported metrics are those
+    supported by :class:`GroupMetricAccumulator`.
+
+    :param metric_function: The metric to be computed
+    :type metric_function: func
+
+    :param y_true: Array of ground-truth values
+
+    :param y_pred: Array of predicted values
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value. The weights
+        stay with their samples when the group labels are permuted
+
+    :param n_permutations: The number of random permutations of the group labels
+    :type n_permutations: int
+
+    :param pos_label: The label of the positive class, for the classification metrics
+
+    :param random_state: Seed or random number generator for the permutations
+    :type random_state: int or :class:`numpy.random.RandomState`
+
+    :rtype: :class:`GroupMetricPermutationResult`
+    """
+    if not isinstance(n_permutations, (int, np.integer)) or n_permutations < 1:
+        raise ValueError(_MESSAGE_BAD_N_PERMUTATIONS)
+    metric_statistics = _get_metric_statistics(metric_function)
+
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if metric_statistics.binary:
+        labels = set(np.unique(y_a).tolist()) | set(np.unique(y_p).tolist())
+        _check_binary_labels(metric_function, labels, pos_label)
+
+    partition = GroupPartition(g_d)
+    sums = _statistic_sums(metric_statistics, y_a, y_p, partition.codes, partition.n_groups,
+                           pos_label=pos_label, sample_weight=s_w)
+    overall, by_group = _evaluate_sums(metric_statistics, sums)
+    result = _make_group_metric_result(overall, partition.groups, by_group)
+
+    permuted_sums = _permutation_statistic_sums(metric_statistics, y_a, y_p, partition, s_w,
+                                                pos_label, n_permutations,
+                                                check_random_state(random_state))
+
+    # Groups may have no data for which the metric is defined in some
+    # permutations, giving NaN values which are ignored
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        ranges, range_ratios = _replicate_disparities(metric_statistics.evaluate(permuted_sums))
+
+    permutation_result = GroupMetricPermutationResult()
+    permutation_result.result = result
+    permutation_result.range_p_value = _p_value(ranges, result.range, larger=True)
+    permutation_result.range_ratio_p_value = _p_value(range_ratios, result.range_ratio,
+                                                      larger=False)
+    permutation_result.n_permutations = n_permutations
+    return permutation_result
+
+
+def _permutation_statistic_sums(metric_statistics, y_a, y_p, partition, s_w, pos_label,
+                                n_permutations, random_state):
+    """Computes the ``(n_permutations, n_groups, n_statistics + 1)`` array of the
+    sums of the statistics for each permutation of the group codes and group
+    """
+    n_samples = len(partition)
+    statistics = list(metric_statistics.statistics(y_a, y_p, pos_label))
+    if s_w is not None:
+        statistics = [statistic * s_w for statistic in statistics]
+    # The final column of the sums is the sum of the weights
+    statistics.append(np.ones(n_samples) if s_w is None else s_w)
+
+    block_size = max(1, _MAX_BLOCK_ELEMENTS // max(n_samples, 1))
+    sums = np.empty((n_permutations, partition.n_groups, len(statistics)))
+    for block_start in range(0, n_permutations, block_size):
+        block = slice(block_start, min(block_start + block_size, n_permutations))
+        # Sorting a block of random keys gives a block of independent permutations
+        permutations = np.argsort(random_state.rand(block.stop - block.start, n_samples),
+                                  axis=1)
+        sums[block] = _permuted_sums(statistics, partition.codes, partition.n_groups,
+                                     permutations)
+    return sums
+
+
+def _permuted_sums(statistics, codes, n_groups, permutations):
+    """Computes the ``(n_block, n_groups, n_statistics)`` array of the sums of
+    the statistics for each group when the group codes are rearranged by each
+    row of ``permutations``. Each permuted code is offset by ``n_groups`` times
+    its row, so that every (permutation, group) cell is summed by the same
+    :func:`numpy.bincount`
+    """
+    n_block = len(permutations)
+    n_cells = n_block * n_groups
+    cells = codes[permutations]
+    cells += (np.arange(n_block) * n_groups)[:, np.newaxis]
+    cells = cells.reshape(-1)
+
+    sums = np.empty((n_cells, len(statistics)))
+    for i, statistic in enumerate(statistics):
+        sums[:, i] = np.bincount(cells, weights=np.tile(statistic, n_block),
+                                 minlength=n_cells)
+    return sums.reshape(n_block, n_groups, len(statistics))
+
+
+def _p_value(permuted, observed, larger):
+    """Computes the fraction of the permutations, including the original data,
+    whose disparity is at least as extreme as the observed one. Disparities which
+    differ from the observed one only by rounding are counted as being as extreme
+    """
+    if observed is None or np.isnan(observed):
+        return np.nan
+    extreme = np.isclose(permuted, observed)
+    extreme |= (permuted > observed) if larger else (permuted < observed)
+    return (1 + np.count_nonzero(extreme)) / (1 + len(permuted))
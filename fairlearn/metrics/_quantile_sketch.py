@@ -0,0 +1,223 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+from sklearn.utils import check_random_state
+
+from ._accumulators import _sorted_group_order
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+
+_DEFAULT_SKETCH_SIZE = 200
+
+_MESSAGE_BAD_SKETCH_SIZE = "sketch_size must be an integer of at least 2"
+_MESSAGE_BAD_QUANTILE = "quantile must be between 0 and 1"
+_MESSAGE_NOT_NUMERIC = "y_true and y_pred must be one-dimensional arrays of finite numbers"
+_MESSAGE_MERGE_MISMATCH = "Cannot merge sketches of different sizes"
+_MESSAGE_NO_DATA = "No data have been sketched"
+
+
+class GroupQuantileSketch:
+    """Class which estimates quantiles (such as the median) of the absolute
+    errors ``|y_true - y_pred|`` in each group, for data which arrive in
+    batches, using a bounded amount of memory for each group.
+
+    The errors of each group are summarized by a KLL-style sketch: a stack of
+    buffers, in which an item at level ``h`` stands for ``2**h`` errors. When a
+    buffer holds ``sketch_size`` or more items, it is sorted, and either its even
+    or its odd items (chosen at random) are moved up to the next level. Sketches
+    which have seen different parts of the data (for example, in different worker
+    processes) are combined with :meth:`merge`, which adds the buffers level
+    by level and compacts them in the same way. Sketches can be pickled, in order
+    to move them between processes.
+
+    A group with ``n`` errors keeps fewer than ``k * (log2(n / k) + 2)`` items,
+    where ``k`` is ``sketch_size``. Until a group has ``k`` errors, its sketch holds
+    all of them, and its quantiles are exact. After that, each compaction at
+    level ``h`` moves the rank of any value by ``2**h`` or less, up or down with
+    equal probability, and there are at most ``n / (k * 2**h)`` of them. So the
+    rank (among the ``n`` errors) of the value given for a quantile is off by at
+    most ``4 * n / k`` with a probability of over 96%, and by at most ``6 * n / k``
+    with a probability of over 99.9%, whatever the data and however they are
+    split and merged. With the default ``sketch_size`` of 200, the value given for
+    the median therefore lies between the 48th and 52nd percentiles of the errors
+    with a probability of over 96%.
+
+    :param sketch_size: The number of items held at each level of each sketch
+    :type sketch_size: int
+
+    :param random_state: Seed or random number generator for the compactions
+    :type random_state: int or :class:`numpy.random.RandomState`
+    """
+
+    def __init__(self, sketch_size=_DEFAULT_SKETCH_SIZE, *, random_state=None):
+        if not isinstance(sketch_size, (int, np.integer)) or sketch_size < 2:
+            raise ValueError(_MESSAGE_BAD_SKETCH_SIZE)
+
+        self._sketch_size = int(sketch_size)
+        self._random_state = check_random_state(random_state)
+        self._groups = []
+        self._group_index = {}
+        self._sketches = []
+        self._overall = _QuantileSketch(self._sketch_size)
+
+    @property
+    def sketch_size(self):
+        """Gets the number of items held at each level of each sketch
+        """
+        return self._sketch_size
+
+    @property
+    def groups(self):
+        """Gets the list of the groups seen so far
+        """
+        return list(self._groups)
+
+    def update(self, y_true, y_pred, group_membership):
+        """Adds the absolute errors of a batch of data to the sketches
+
+        :param y_true: Array of ground-truth values
+
+        :param y_pred: Array of predicted values
+
+        :param group_membership: Array Indicating the group to which each input value belongs
+
+        :return: This sketch
+        :rtype: :class:`GroupQuantileSketch`
+        """
+        y_a, y_p, g_d, _ = _convert_and_check_inputs(y_true, y_pred, group_membership, None)
+        errors = _absolute_errors(y_a, y_p)
+        if errors is None:
+            raise ValueError(_MESSAGE_NOT_NUMERIC)
+
+        partition = GroupPartition(g_d)
+        sorted_errors = errors[partition.order]
+        offsets = partition.offsets
+        for i, group in enumerate(partition.groups):
+            self._sketch(group).update(sorted_errors[offsets[i]:offsets[i + 1]],
+                                       self._random_state)
+        self._overall.update(errors, self._random_state)
+        return self
+
+    def merge(self, other):
+        """Adds the data seen by another sketch of the same size to this one
+
+        :param other: The sketch to be merged into this one
+        :type other: :class:`GroupQuantileSketch`
+
+        :return: This sketch
+        :rtype: :class:`GroupQuantileSketch`
+        """
+        if other._sketch_size != self._sketch_size:
+            raise ValueError(_MESSAGE_MERGE_MISMATCH)
+
+        for group, sketch in zip(other._groups, other._sketches):
+            self._sketch(group).merge(sketch, self._random_state)
+        self._overall.merge(other._overall, self._random_state)
+        return self
+
+    def result(self, quantile=0.5):
+        """Estimates a quantile of the absolute errors for all the data seen
+        so far, and for each group. As for :func:`numpy.quantile`, quantiles
+        which fall between two errors are interpolated linearly
+
+        :param quantile: The quantile to be estimated, so that 0.5 gives the median
+        :type quantile: float
+
+        :return: Object containing the estimated quantile of the absolute errors of
+            all the data seen so far, and of each group identified in the
+            ``group_membership`` arrays
+        :rtype: :class:`GroupMetricResult`
+        """
+        _check_quantile(quantile)
+        if not self._groups:
+            raise ValueError(_MESSAGE_NO_DATA)
+
+        order = _sorted_group_order(self._groups)
+        groups = [self._groups[i] for i in order]
+        by_group = np.array([self._sketches[i].quantile(quantile) for i in order])
+        return _make_group_metric_result(self._overall.quantile(quantile), groups, by_group)
+
+    def _sketch(self, group):
+        index = self._group_index.get(group)
+        if index is None:
+            index = len(self._groups)
+            self._group_index[group] = index
+            self._groups.append(group)
+            self._sketches.append(_QuantileSketch(self._sketch_size))
+        return self._sketches[index]
+
+
+class _QuantileSketch:
+    """The sketch of the values of a single group, whose items at position
+    ``h`` of ``levels`` each stand for ``2**h`` values
+    """
+
+    def __init__(self, sketch_size):
+        self._sketch_size = sketch_size
+        self._levels = []
+
+    def update(self, values, random_state):
+        self._insert(0, values, random_state)
+
+    def merge(self, other, random_state):
+        for level, items in enumerate(other._levels):
+            self._insert(level, items, random_state)
+
+    def quantile(self, quantile):
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        return _weighted_quantile(values[order], np.cumsum(weights[order]), quantile)
+
+    def _insert(self, level, items, random_state):
+        while len(self._levels) <= level:
+            self._levels.append(np.zeros(0))
+        self._levels[level] = np.concatenate((self._levels[level], items))
+
+        # Compacting one level may overfill the next
+        while level < len(self._levels) and len(self._levels[level]) >= self._sketch_size:
+            items = np.sort(self._levels[level])
+            # An odd item out stays behind
+            n_kept = len(items) % 2
+            promoted = items[n_kept + random_state.randint(2)::2]
+            self._levels[level] = items[:n_kept]
+            if level + 1 == len(self._levels):
+                self._levels.append(np.zeros(0))
+            self._levels[level + 1] = np.concatenate((self._levels[level + 1], promoted))
+            level += 1
+
+
+def _weighted_quantile(sorted_values, cumulative_weights, quantile):
+    """Computes a quantile of the values repeated as often as their integer
+    weights, given the sorted values and the cumulative sums of their weights.
+    As for :func:`numpy.quantile`, this interpolates between the values at the
+    ranks on either side of ``quantile * (n - 1)``
+    """
+    position = quantile * (cumulative_weights[-1] - 1)
+    lower_rank = np.floor(position)
+    upper_rank = np.ceil(position)
+    lower = sorted_values[np.searchsorted(cumulative_weights, lower_rank, side='right')]
+    upper = sorted_values[np.searchsorted(cumulative_weights, upper_rank, side='right')]
+    return lower + (position - lower_rank) * (upper - lower)
+
+
+def _check_quantile(quantile):
+    if not 0 <= quantile <= 1:
+        raise ValueError(_MESSAGE_BAD_QUANTILE)
+
+
+def _absolute_errors(y_a, y_p):
+    """Returns the absolute errors, or ``None`` if the data are not
+    one-dimensional, finite and numeric
+    """
+    if y_a.ndim != 1 or y_p.ndim != 1:
+        return None
+    if y_a.dtype.kind not in 'biuf' or y_p.dtype.kind not in 'biuf':
+        return None
+
+    errors = np.abs(y_a.astype(float) - y_p.astype(float))
+    if not np.all(np.isfinite(errors)):
+        return None
+    return errors
@@ -0,0 +1,110 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Computes the ROC AUC of every group from a single sort of the scores.
+
+The area under the ROC curve is the (weighted) probability that a
+positive sample is scored above a negative one, counting ties as one
+half. Once the samples are sorted by group and by score, this is found
+for every group by summing, over the blocks of tied scores, the positive
+weight in the block times the negative weight in the earlier blocks of
+the same group (plus half of the negative weight in the block itself).
+"""
+
+import numpy as np
+import sklearn.metrics as skm
+from sklearn.utils.multiclass import type_of_target
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import _make_group_metric_result
+
+_AVERAGE_OPTIONS = (None, 'micro', 'macro', 'weighted', 'samples')
+
+
+def _roc_auc_by_group(y_true, y_score, group_membership, sample_weight, average='macro',
+                      max_fpr=None):
+    """Computes the :class:`GroupMetricResult` for
+    :any:`sklearn.metrics.roc_auc_score` with the given arguments.
+    Returns ``None`` if this is not possible, because the data are not
+    binary, the partial AUC is requested, or the AUC of some group is
+    undefined. In those cases the caller should evaluate the metric
+    directly, so that it behaves exactly as sklearn does.
+    """
+    if max_fpr not in (None, 1) or average not in _AVERAGE_OPTIONS:
+        return None
+    if y_true.ndim != 1 or y_score.ndim != 1 or len(y_true) == 0:
+        return None
+    if y_score.dtype.kind not in 'biuf' or not np.all(np.isfinite(y_score)):
+        return None
+    if type_of_target(y_true) != 'binary':
+        return None
+
+    labels = np.unique(y_true)
+    if len(labels) != 2:
+        return None
+    # As for sklearn, the greater label is the positive one
+    positive = (y_true == labels[1])
+
+    partition = GroupPartition(group_membership)
+    if sample_weight is None:
+        # Integer weights keep the sums exact
+        weights = np.ones(len(y_true), dtype=np.intp)
+    else:
+        weights = np.asarray(sample_weight, dtype=float)
+
+    # A single sort by group, and then by score within each group
+    order = np.lexsort((y_score, partition.codes))
+    by_group = _sorted_roc_auc(y_score[order], positive[order], weights[order],
+                               partition.codes[order], partition.n_groups)
+    if by_group is None:
+        return None
+
+    # The overall value is computed by sklearn itself (which sorts the scores
+    # once more), so that it matches roc_auc_score exactly rather than to
+    # within rounding
+    overall = skm.roc_auc_score(y_true, y_score, sample_weight=sample_weight)
+
+    return _make_group_metric_result(overall, partition.groups, by_group)
+
+
+def _tied_score_blocks(scores, codes):
+    """Finds the blocks of tied scores within each segment, for data sorted
+    by segment code and then by score. Returns the index at which each
+    block starts
+    """
+    block_start = np.empty(len(scores), dtype=bool)
+    block_start[:1] = True
+    np.not_equal(scores[1:], scores[:-1], out=block_start[1:])
+    block_start[1:] |= (codes[1:] != codes[:-1])
+    return np.flatnonzero(block_start)
+
+
+def _sorted_roc_auc(scores, positive, weights, codes, n_segments):
+    """Computes the ROC AUC of each segment of data sorted by segment code,
+    and then by score. Returns ``None`` if any segment lacks either positive
+    or negative samples (or their total weight is zero)
+    """
+    pos_weights = np.where(positive, weights, 0)
+    neg_weights = weights - pos_weights
+
+    starts = _tied_score_blocks(scores, codes)
+
+    block_pos = np.add.reduceat(pos_weights, starts)
+    block_neg = np.add.reduceat(neg_weights, starts)
+    block_codes = codes[starts]
+
+    segment_pos = np.bincount(block_codes, weights=block_pos, minlength=n_segments)
+    segment_neg = np.bincount(block_codes, weights=block_neg, minlength=n_segments)
+    has_both_classes = (np.bincount(codes[positive], minlength=n_segments) > 0) & \
+        (np.bincount(codes[~positive], minlength=n_segments) > 0)
+    if not np.all(has_both_classes) or np.any(segment_pos <= 0) or np.any(segment_neg <= 0):
+        return None
+
+    # The negative weight in the earlier blocks of the same segment
+    neg_before = np.cumsum(block_neg) - block_neg
+    segment_neg_before = np.cumsum(segment_neg) - segment_neg
+    neg_below = neg_before - segment_neg_before[block_codes]
+
+    area = np.bincount(block_codes, weights=block_pos * (neg_below + 0.5 * block_neg),
+                       minlength=n_segments)
+    return area / (segment_pos * segment_neg)
@@ -0,0 +1,186 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Grouped regression metrics which are computed for every group with
+segmented reductions over the data sorted by group, rather than by
+slicing out each group and calling sklearn on it.
+"""
+
+import numpy as np
+import sklearn.metrics as skm
+
+from ._group_partition import GroupPartition
+from ._metrics_engine import metric_by_group, _convert_and_check_inputs
+from ._metrics_engine import _drop_zero_counts, _make_group_metric_result
+from ._quantile_sketch import GroupQuantileSketch, _MESSAGE_NOT_NUMERIC
+from ._quantile_sketch import _absolute_errors, _check_quantile
+
+_MESSAGE_SKETCH_WEIGHTS = "Sample weights and counts cannot be used with sketch_size"
+
+
+def group_max_error(y_true, y_pred, group_membership, sample_weight=None, *, n_jobs=None,
+                    counts=None):
+    """A grouped wrapper around the :any:`sklearn.metrics.max_error` routine.
+
+    For one-dimensional numeric data, the maximum error of every group
+    is found with a single :any:`numpy.ufunc.reduceat`. If ``counts`` is
+    given, each row is taken to occur that many times (which only matters
+    for the rows which occur zero times).
+    """
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if counts is not None:
+        y_a, y_p, g_d, s_w, _ = _drop_zero_counts(y_a, y_p, g_d, s_w, counts)
+        y_true, y_pred, group_membership, sample_weight = y_a, y_p, g_d, s_w
+    errors = _absolute_errors(y_a, y_p)
+    if errors is None or len(errors) == 0 or s_w is not None:
+        return metric_by_group(skm.max_error, y_true, y_pred, group_membership, sample_weight,
+                               n_jobs=n_jobs)
+
+    partition = GroupPartition(g_d)
+    by_group = np.maximum.reduceat(errors[partition.order], partition.offsets[:-1])
+    return _make_group_metric_result(skm.max_error(y_a, y_p), partition.groups, by_group)
+
+
+def group_median_absolute_error(y_true, y_pred, group_membership, sample_weight=None, *,
+                                n_jobs=None, counts=None, sketch_size=None, random_state=None):
+    """A grouped wrapper around the :any:`sklearn.metrics.median_absolute_error` routine.
+
+    For one-dimensional numeric data without sample weights, the
+    absolute errors are sorted once by group and by value, after
+    which the median of every group is read off at the middle of
+    its segment.
+
+    If ``counts`` is given, each row is taken to occur that many times.
+    Since sample weights are not the same as repeating samples for this
+    metric, the middle of each segment is found from the cumulative counts
+    instead, which gives exactly the median of the repeated data.
+
+    If ``sketch_size`` is given, then the medians are estimated with a
+    :class:`GroupQuantileSketch` of that size (seeded by ``random_state``),
+    whose memory for each group grows only logarithmically with its size.
+    The sketch documents the accuracy of the estimates.
+    """
+    if sketch_size is not None:
+        return _sketched_quantiles(y_true, y_pred, group_membership, 0.5, sample_weight,
+                                   counts, sketch_size, random_state)
+
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    errors = _absolute_errors(y_a, y_p)
+    if errors is None or len(errors) == 0 or s_w is not None:
+        return metric_by_group(skm.median_absolute_error, y_true, y_pred, group_membership,
+                               sample_weight, n_jobs=n_jobs, counts=counts)
+
+    if counts is None:
+        partition = GroupPartition(g_d)
+        sorted_errors = errors[np.lexsort((errors, partition.codes))]
+        by_group = _segment_medians(sorted_errors, partition.offsets)
+        return _make_group_metric_result(skm.median_absolute_error(y_a, y_p),
+                                         partition.groups, by_group)
+
+    errors, _, g_d, _, counts = _drop_zero_counts(errors, y_p, g_d, None, counts)
+    partition = GroupPartition(g_d)
+    order = np.argsort(errors, kind='stable')
+    overall = _frequency_medians(errors[order], counts[order], np.zeros(len(errors), np.intp), 1)
+    order = np.lexsort((errors, partition.codes))
+    by_group = _frequency_medians(errors[order], counts[order], partition.codes[order],
+                                  partition.n_groups)
+    return _make_group_metric_result(overall[0], partition.groups, by_group)
+
+
+def group_quantile_absolute_error(y_true, y_pred, group_membership, quantile=0.5, *,
+                                  sketch_size=None, random_state=None):
+    """Computes a quantile of the absolute errors ``|y_true - y_pred|``,
+    for all the data and for each group. As for :func:`numpy.quantile`,
+    quantiles which fall between two errors are interpolated linearly.
+
+    The absolute errors are sorted once by group and by value, after which
+    the quantile of every group is read off at the same fraction of its segment.
+    If ``sketch_size`` is given, then the quantiles are estimated with a
+    :class:`GroupQuantileSketch` of that size (seeded by ``random_state``)
+    instead, whose memory for each group grows only logarithmically with its size.
+    The sketch documents the accuracy of the estimates.
+
+    :param y_true: Array of ground-truth values
+
+    :param y_pred: Array of predicted values
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param quantile: The quantile to be computed, so that 0.5 gives the median
+    :type quantile: float
+
+    :param sketch_size: The number of items held at each level of each sketch,
+        if the quantiles are to be estimated
+    :type sketch_size: int
+
+    :param random_state: Seed or random number generator for the sketches
+    :type random_state: int or :class:`numpy.random.RandomState`
+
+    :return: Object containing the quantile of the absolute errors of all the
+        data, and of each group identified in ``group_membership``
+    :rtype: :class:`GroupMetricResult`
+    """
+    _check_quantile(quantile)
+    if sketch_size is not None:
+        return _sketched_quantiles(y_true, y_pred, group_membership, quantile, None, None,
+                                   sketch_size, random_state)
+
+    y_a, y_p, g_d, _ = _convert_and_check_inputs(y_true, y_pred, group_membership, None)
+    errors = _absolute_errors(y_a, y_p)
+    if errors is None:
+        raise ValueError(_MESSAGE_NOT_NUMERIC)
+    partition = GroupPartition(g_d)
+    sorted_errors = errors[np.lexsort((errors, partition.codes))]
+    by_group = _segment_quantiles(sorted_errors, partition.offsets, quantile)
+    return _make_group_metric_result(np.quantile(errors, quantile), partition.groups, by_group)
+
+
+def _sketched_quantiles(y_true, y_pred, group_membership, quantile, sample_weight, counts,
+                        sketch_size, random_state):
+    if sample_weight is not None or counts is not None:
+        raise ValueError(_MESSAGE_SKETCH_WEIGHTS)
+    sketch = GroupQuantileSketch(sketch_size, random_state=random_state)
+    return sketch.update(y_true, y_pred, group_membership).result(quantile)
+
+
+def _segment_medians(sorted_values, offsets):
+    """Computes the median of each segment of ``sorted_values`` bounded by
+    ``offsets``, where the values are sorted within each segment.
+    As for :func:`numpy.median`, segments of even length give the mean
+    of their two middle values
+    """
+    starts = offsets[:-1]
+    lengths = offsets[1:] - starts
+    lower = sorted_values[starts + (lengths - 1) // 2]
+    upper = sorted_values[starts + lengths // 2]
+    return (lower + upper) / 2
+
+
+def _segment_quantiles(sorted_values, offsets, quantile):
+    """Computes a quantile of each segment of ``sorted_values`` bounded by
+    ``offsets``, where the values are sorted within each segment,
+    interpolating between values as :func:`numpy.quantile` does
+    """
+    starts = offsets[:-1]
+    positions = quantile * (offsets[1:] - starts - 1)
+    lower_ranks = np.floor(positions)
+    lower = sorted_values[starts + lower_ranks.astype(np.intp)]
+    upper = sorted_values[starts + np.ceil(positions).astype(np.intp)]
+    return lower + (positions - lower_ranks) * (upper - lower)
+
+
+def _frequency_medians(sorted_values, counts, codes, n_groups):
+    """Computes the median of each group of ``sorted_values`` with each value
+    repeated ``counts`` times, where the values are sorted by group (given by
+    ``codes``) and then by value, and each group occurs at least once
+    """
+    cumulative = np.cumsum(counts)
+    ends = cumulative[np.cumsum(np.bincount(codes, minlength=n_groups)) - 1]
+    before = np.concatenate(([0], ends[:-1]))
+    totals = ends - before
+    # The (zero-based) ranks of the middle values among the repeated values
+    lower = sorted_values[np.searchsorted(cumulative, before + (totals - 1) // 2, side='right')]
+    upper = sorted_values[np.searchsorted(cumulative, before + totals // 2, side='right')]
+    return (lower + upper) / 2
@@ -3,7 +3,9 @@
 
 import numpy as np
 
-from ._metrics_engine import metric_by_group
+from ._confusion_counts import BinaryConfusionCounts
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _counts_as_weights
 
 
 def selection_rate(y_true, y_pred, *, pos_label=1, sample_weight=None):
@@ -12,23 +14,30 @@ def selection_rate(y_true, y_pred, *, pos_label=1, sample_weight=None):
     match the 'good' outcome (as specified by `pos_label`)
     """
     selected = (np.squeeze(np.asarray(y_pred)) == pos_label)
-    s_w = np.ones(len(selected))
-    if sample_weight is not None:
-        s_w = np.squeeze(np.asarray(sample_weight))
+    if sample_weight is None:
+        return np.count_nonzero(selected) / selected.size
 
+    s_w = np.squeeze(np.asarray(sample_weight))
     return np.dot(selected, s_w) / s_w.sum()
 
 
 def group_selection_rate(y_true, y_pred, group_membership,
-                         *, pos_label=1, sample_weight=None):
+                         *, pos_label=1, sample_weight=None, counts=None):
     """This is the grouped version of :func:`selection_rate`.
     The arguments are the same, with the addition of the
     `group_membership` array.
-    """
-
-    def internal_sel_wrapper(y_true, y_pred, sample_weight=None):
-        return selection_rate(y_true, y_pred, pos_label=pos_label, sample_weight=sample_weight)
 
-    return metric_by_group(internal_sel_wrapper,
-                           y_true, y_pred, group_membership,
-                           sample_weight=sample_weight)
+    The selection rate of every group is computed from a single
+    pass over the data. If ``counts`` is given, each row is taken
+    to occur that many times.
+    """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    _, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                 sample_weight)
+
+    # Only the predictions matter, so they are supplied in place of y_true
+    confusion_counts = BinaryConfusionCounts(y_p, y_p, GroupPartition(g_d),
+                                             pos_label=pos_label, sample_weight=s_w)
+    return confusion_counts.selection_rate()
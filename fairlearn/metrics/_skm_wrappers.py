@@ -3,54 +3,123 @@
 
 import sklearn.metrics as skm
 
-from ._metrics_engine import metric_by_group
+from ._confusion_counts import _binary_confusion_counts
+from ._confusion_matrix import _confusion_matrix_tensor
+from ._metrics_engine import metric_by_group, _convert_and_check_inputs
+from ._metrics_engine import _counts_as_weights, _make_group_metric_result
+from ._roc_auc import _roc_auc_by_group
 
 
 def group_accuracy_score(y_true, y_pred, group_membership, *,
                          normalize=True,
-                         sample_weight=None):
+                         sample_weight=None,
+                         counts=None):
     """A wrapper around the :any:`sklearn.metrics.accuracy_score` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    For binary classifiers, the metric is computed for every group
+    from a single pass over the data.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    confusion_counts = _binary_confusion_counts(y_a, y_p, g_d, s_w)
+    if confusion_counts is not None:
+        return confusion_counts.accuracy_score(normalize)
 
     def internal_acc_wrapper(y_true, y_pred, sample_weight=None):
         return skm.accuracy_score(y_true, y_pred,
-                                  normalize,
-                                  sample_weight)
+                                  normalize=normalize,
+                                  sample_weight=sample_weight)
 
     return metric_by_group(internal_acc_wrapper, y_true, y_pred, group_membership, sample_weight)
 
 
 def group_confusion_matrix(y_true, y_pred, group_membership, *,
                            labels=None,
-                           sample_weight=None):
+                           sample_weight=None,
+                           n_jobs=None,
+                           dense=False,
+                           counts=None):
     """A wrapper around the :any:`sklearn.metrics.confusion_matrix` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    The confusion matrices of all the groups are counted with a single
+    :func:`numpy.bincount` over the combined group, true label and predicted
+    label codes, so long as each group's matrix has the same labels as the
+    others. This is the case when ``labels`` is given (and every group has some
+    of them in its ``y_true``), or when every group contains every label.
+    Otherwise, sklearn computes each group's matrix from the labels it contains.
+
+    With ``dense=True``, every group's matrix is always indexed by the labels
+    given, or else all the (sorted) labels which occur in the data, even if
+    a group does not contain some of them. The result's
+    :meth:`GroupMetricResult.to_numpy` is then the dense
+    ``(n_groups, n_labels, n_labels)`` tensor of (weighted) counts, which is
+    compact enough for auditing classifiers with hundreds of classes.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    if y_a.ndim == 1:
+        # This also checks the inputs
+        overall = skm.confusion_matrix(y_a, y_p, labels=labels, sample_weight=s_w)
+        tensor = _confusion_matrix_tensor(y_a, y_p, g_d, labels=labels, sample_weight=s_w,
+                                          require_all_labels=not dense)
+        if tensor is not None:
+            partition, values = tensor
+            return _make_group_metric_result(overall, partition.groups, values)
 
     def internal_cm_wrapper(y_true, y_pred, sample_weight=None):
         return skm.confusion_matrix(y_true, y_pred,
-                                    labels,
-                                    sample_weight)
+                                    labels=labels,
+                                    sample_weight=sample_weight)
 
-    return metric_by_group(internal_cm_wrapper, y_true, y_pred, group_membership, sample_weight)
+    return metric_by_group(internal_cm_wrapper, y_true, y_pred, group_membership, sample_weight,
+                           n_jobs=n_jobs)
 
 
 def group_precision_score(y_true, y_pred, group_membership, *,
                           labels=None, pos_label=1, average='binary',
-                          sample_weight=None):
+                          sample_weight=None,
+                          counts=None):
     """A wrapper around the :any:`sklearn.metrics.precision_score` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    With the default ``labels`` and ``average`` arguments, the metric is
+    computed for every group from a single pass over the data.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    if labels is None and average == 'binary':
+        y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                       sample_weight)
+        confusion_counts = _binary_confusion_counts(y_a, y_p, g_d, s_w, pos_label=pos_label)
+        if confusion_counts is not None:
+            return confusion_counts.precision_score()
 
     def internal_prec_wrapper(y_true, y_pred, sample_weight=None):
         return skm.precision_score(y_true, y_pred,
@@ -62,13 +131,29 @@ def group_precision_score(y_true, y_pred, group_membership, *,
 
 def group_recall_score(y_true, y_pred, group_membership, *,
                        labels=None, pos_label=1, average='binary',
-                       sample_weight=None):
+                       sample_weight=None,
+                       counts=None):
     """A wrapper around the :any:`sklearn.metrics.recall_score` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    With the default ``labels`` and ``average`` arguments, the metric is
+    computed for every group from a single pass over the data.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    if labels is None and average == 'binary':
+        y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                       sample_weight)
+        confusion_counts = _binary_confusion_counts(y_a, y_p, g_d, s_w, pos_label=pos_label)
+        if confusion_counts is not None:
+            return confusion_counts.recall_score()
 
     def internal_recall_wrapper(y_true, y_pred, sample_weight=None):
         return skm.recall_score(y_true, y_pred,
@@ -81,13 +166,30 @@ def group_recall_score(y_true, y_pred, group_membership, *,
 
 def group_roc_auc_score(y_true, y_pred, group_membership, *,
                         average='macro', max_fpr=None,
-                        sample_weight=None):
+                        sample_weight=None,
+                        n_jobs=None,
+                        counts=None):
     """A wrapper around the :any:`sklearn.metrics.roc_auc_score` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    For binary classifiers (when ``max_fpr`` is not given), the AUC of every
+    group is computed from a single sort of the scores, rather than by
+    sorting each group separately.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    result = _roc_auc_by_group(y_a, y_p, g_d, s_w, average=average, max_fpr=max_fpr)
+    if result is not None:
+        return result
 
     def internal_ras_wrapper(y_true, y_pred, sample_weight=None):
         return skm.roc_auc_score(y_true, y_pred,
@@ -95,18 +197,34 @@ def group_roc_auc_score(y_true, y_pred, group_membership, *,
                                  sample_weight=sample_weight)
 
     return metric_by_group(internal_ras_wrapper,
-                           y_true, y_pred, group_membership, sample_weight)
+                           y_true, y_pred, group_membership, sample_weight,
+                           n_jobs=n_jobs)
 
 
 def group_zero_one_loss(y_true, y_pred, group_membership, *,
                         normalize=True,
-                        sample_weight=None):
+                        sample_weight=None,
+                        counts=None):
     """A wrapper around the :any:`sklearn.metrics.zero_one_loss` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    For binary classifiers, the metric is computed for every group
+    from a single pass over the data.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
+    y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                   sample_weight)
+    confusion_counts = _binary_confusion_counts(y_a, y_p, g_d, s_w)
+    if confusion_counts is not None:
+        return confusion_counts.zero_one_loss(normalize)
 
     def internal_zol_wrapper(y_true, y_pred, sample_weight=None):
         return skm.zero_one_loss(y_true, y_pred,
@@ -120,13 +238,21 @@ def group_zero_one_loss(y_true, y_pred, group_membership, *,
 
 def group_mean_squared_error(y_true, y_pred, group_membership, *,
                              multioutput='uniform_average',
-                             sample_weight=None):
+                             sample_weight=None,
+                             n_jobs=None,
+                             counts=None):
     """A wrapper around the :any:`sklearn.metrics.mean_squared_error` routine.
     The arguments remain the same, with `group_membership` added.
     However, the only positional arguments supported are `y_true`,
     `y_pred` and `group_membership`.
     All others must be specified by name.
+
+    If ``counts`` is given, each row is taken to occur that many times,
+    and the counts are used as sample weights.
     """
+    if counts is not None:
+        y_true, y_pred, group_membership, sample_weight = _counts_as_weights(
+            y_true, y_pred, group_membership, sample_weight, counts)
 
     def internal_mse_wrapper(y_true, y_pred, sample_weight=None):
         return skm.mean_squared_error(y_true, y_pred,
@@ -134,4 +260,5 @@ def group_mean_squared_error(y_true, y_pred, group_membership, *,
                                       sample_weight=sample_weight)
 
     return metric_by_group(internal_mse_wrapper,
-                           y_true, y_pred, group_membership, sample_weight=sample_weight)
+                           y_true, y_pred, group_membership, sample_weight=sample_weight,
+                           n_jobs=n_jobs)
@@ -0,0 +1,246 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+"""Descriptions of the metrics which can be computed from (weighted) sums of
+per-sample statistics.
+
+Since sums can be accumulated in any order, and combined by adding them,
+these metrics can be computed for data which arrive in batches, or which
+are split between several processes.
+"""
+
+import numpy as np
+import sklearn.metrics as skm
+
+from ._balanced_root_mean_squared_error import _Y_TRUE_NOT_0_1
+from ._confusion_counts import _counts_pos_label, _divide, _fallout_rate, _miss_rate
+from ._confusion_counts import _precision_score, _recall_score, _specificity_score
+from ._extra_metrics import balanced_root_mean_squared_error, fallout_rate, miss_rate
+from ._extra_metrics import mean_overprediction, mean_prediction, mean_underprediction
+from ._extra_metrics import selection_rate, specificity_score
+from ._mean_predictions import _overprediction, _prediction, _underprediction
+
+_MESSAGE_UNSUPPORTED_METRIC = "Metric {0} cannot be computed from sums of statistics"
+_MESSAGE_NOT_BINARY = "Metric {0} requires binary labels, but found {1}"
+_MESSAGE_NOT_ZERO_ONE = "Metric {0} requires labels taken from {{0, 1}}, but found {1}"
+
+# The data for which a metric function, called with its default arguments,
+# gives the same results as its statistics: any data, numeric data, the labels
+# of a binary classifier, or binary labels taken from {0, 1}
+_ANY_DATA = "any"
+_NUMERIC_DATA = "numeric"
+_BINARY_LABELS = "binary"
+_ZERO_ONE_LABELS = "zero_one"
+
+
+class _MetricStatistics:
+    """Describes how to compute a metric from sums of per-sample statistics.
+
+    :param statistics: Function with signature ``(y_true, y_pred, pos_label)``
+        which returns a list of arrays, each holding one statistic for
+        every sample
+    :param evaluate: Function which computes the metric from an array whose
+        final axis holds the sums of the statistics, followed by the sum
+        of the weights
+    :param binary: Whether the metric is only defined for binary classifiers
+    :param validate: Optional function which raises an exception if the metric
+        is not defined for the given sums (where ``evaluate`` returns NaN)
+    :param applies_to: The data for which the metric function itself gives the
+        same results as the statistics, such as ``_NUMERIC_DATA``
+    """
+
+    def __init__(self, statistics, evaluate, binary=False, validate=None,
+                 applies_to=_ANY_DATA):
+        self.statistics = statistics
+        self.evaluate = evaluate
+        self.binary = binary
+        self.validate = validate
+        self.applies_to = applies_to
+
+
+def _get_metric_statistics(metric_function):
+    """Returns the :class:`_MetricStatistics` for a metric, raising a ValueError
+    if it is not one which can be computed from sums of statistics
+    """
+    try:
+        return _METRIC_STATISTICS[metric_function]
+    except (KeyError, TypeError):
+        name = getattr(metric_function, '__name__', metric_function)
+        raise ValueError(_MESSAGE_UNSUPPORTED_METRIC.format(name))
+
+
+def _check_binary_labels(metric_function, labels, pos_label):
+    """Raises a ValueError if the metric is only defined for binary classifiers,
+    but the given set of labels contains more than one label besides ``pos_label``,
+    or if the metric only supports labels taken from {0, 1} and others are present
+    """
+    metric_statistics = _METRIC_STATISTICS[metric_function]
+    if metric_statistics.binary and len(labels - {pos_label}) > 1:
+        raise ValueError(_MESSAGE_NOT_BINARY.format(metric_function.__name__,
+                                                    sorted(labels, key=str)))
+    if metric_statistics.applies_to == _ZERO_ONE_LABELS and not labels.issubset({0, 1}):
+        raise ValueError(_MESSAGE_NOT_ZERO_ONE.format(metric_function.__name__,
+                                                      sorted(labels, key=str)))
+
+
+def _statistic_sums(metric_statistics, y_true, y_pred, codes, n_groups,
+                    pos_label=1, sample_weight=None):
+    """Computes the ``(n_groups, n_statistics + 1)`` array of the (weighted)
+    sums of the statistics for each group, with one :func:`numpy.bincount`
+    per statistic. The final column is the sum of the weights
+    """
+    statistics = metric_statistics.statistics(y_true, y_pred, pos_label)
+
+    sums = np.empty((n_groups, len(statistics) + 1))
+    for i, statistic in enumerate(statistics):
+        if sample_weight is not None:
+            statistic = statistic * sample_weight
+        sums[:, i] = np.bincount(codes, weights=statistic, minlength=n_groups)
+    sums[:, -1] = np.bincount(codes, weights=sample_weight, minlength=n_groups)
+    return sums
+
+
+def _evaluate_sums(metric_statistics, sums):
+    """Evaluates a metric for all the data and for each group, from the array
+    whose second to last axis is the groups, and whose last axis holds the sums
+    of the statistics (followed by the sum of the weights) for each group
+
+    :return: The overall value and the values for each group
+    """
+    if metric_statistics.validate is not None:
+        metric_statistics.validate(sums)
+    return metric_statistics.evaluate(sums.sum(axis=-2)), metric_statistics.evaluate(sums)
+
+
+def _vectorizable_statistics(metric_function, y_true, y_pred, get_labels):
+    """Returns the :class:`_MetricStatistics` for a metric if the metric function
+    itself, called with its default arguments, gives the same results as the
+    statistics for the given data. Returns ``None`` if it does not (or may not),
+    in which case the caller should evaluate the metric function directly.
+
+    ``get_labels`` is called (at most once) to find the labels in the data,
+    as given by ``_binary_labels``, so that callers can share them between metrics
+    """
+    try:
+        metric_statistics = _METRIC_STATISTICS[metric_function]
+    except (KeyError, TypeError):
+        # Not a metric we know about (or not hashable)
+        return None
+    if y_true.ndim != 1 or y_pred.ndim != 1 or len(y_true) == 0:
+        return None
+
+    applies_to = metric_statistics.applies_to
+    if applies_to == _NUMERIC_DATA:
+        if y_true.dtype.kind in 'biuf' and y_pred.dtype.kind in 'biuf':
+            return metric_statistics
+        return None
+    if applies_to == _ANY_DATA:
+        return metric_statistics
+
+    # The binary metrics take the label 1 to be positive by default
+    pos_label = 1 if metric_statistics.binary else None
+    allowed_labels = {0, 1} if applies_to == _ZERO_ONE_LABELS else None
+    if _counts_pos_label(get_labels(), pos_label, allowed_labels) is None:
+        return None
+    return metric_statistics
+
+
+def _correct(y_t, y_p, pos_label):
+    return [y_t == y_p]
+
+
+def _selected(y_t, y_p, pos_label):
+    return [y_p == pos_label]
+
+
+def _mean(sums):
+    return _divide(sums[..., 0], sums[..., -1], np.nan)
+
+
+def _one_minus_mean(sums):
+    return 1 - _mean(sums)
+
+
+def _confusion_cells(y_t, y_p, pos_label):
+    # One indicator for each cell of the confusion matrix, in the order
+    # of the flattened counts of BinaryConfusionCounts
+    actual_pos = (y_t == pos_label)
+    predicted_pos = (y_p == pos_label)
+    return [~actual_pos & ~predicted_pos, ~actual_pos & predicted_pos,
+            actual_pos & ~predicted_pos, actual_pos & predicted_pos]
+
+
+def _from_counts(count_metric):
+    """Returns the function which evaluates a metric of the confusion counts,
+    as used by :class:`BinaryConfusionCounts`, from the sums of the
+    statistics given by :func:`_confusion_cells`
+    """
+    def evaluate(sums):
+        return count_metric(sums[..., :4].reshape(sums.shape[:-1] + (2, 2)))
+    return evaluate
+
+
+def _squared_error(y_t, y_p):
+    return np.square(y_p - y_t)
+
+
+def _absolute_error(y_t, y_p):
+    return np.abs(y_p - y_t)
+
+
+def _mean_of(statistic):
+    """Describes the metric which is the (weighted) mean of the given function
+    of ``(y_true, y_pred)`` for each sample
+    """
+    def statistics(y_t, y_p, pos_label):
+        return [statistic(y_t, y_p)]
+    return _MetricStatistics(statistics, _mean, applies_to=_NUMERIC_DATA)
+
+
+def _label_squared_errors(y_t, y_p, pos_label):
+    if not set(np.unique(y_t)).issubset({0, 1}):
+        raise ValueError(_Y_TRUE_NOT_0_1)
+    squared_error = np.square(y_p - y_t)
+    is_one = (y_t == 1)
+    return [np.where(is_one, 0, squared_error), ~is_one,
+            np.where(is_one, squared_error, 0), is_one]
+
+
+def _balanced_root_mean_squared_error(sums):
+    root_mean_squared_errors = np.sqrt(_divide(sums[..., 0], sums[..., 1], np.nan)) + \
+        np.sqrt(_divide(sums[..., 2], sums[..., 3], np.nan))
+    return root_mean_squared_errors / 2
+
+
+def _check_both_labels(sums):
+    if np.any(sums[..., 1] == 0) or np.any(sums[..., 3] == 0):
+        raise ValueError(_Y_TRUE_NOT_0_1)
+
+
+# The metrics which can be computed from sums of per-sample statistics
+# when called with their default arguments (apart from ``pos_label``)
+_METRIC_STATISTICS = {
+    skm.accuracy_score: _MetricStatistics(_correct, _mean, applies_to=_BINARY_LABELS),
+    skm.zero_one_loss: _MetricStatistics(_correct, _one_minus_mean,
+                                         applies_to=_BINARY_LABELS),
+    skm.precision_score: _MetricStatistics(_confusion_cells, _from_counts(_precision_score),
+                                           binary=True, applies_to=_BINARY_LABELS),
+    skm.recall_score: _MetricStatistics(_confusion_cells, _from_counts(_recall_score),
+                                        binary=True, applies_to=_BINARY_LABELS),
+    specificity_score: _MetricStatistics(_confusion_cells, _from_counts(_specificity_score),
+                                         binary=True, applies_to=_ZERO_ONE_LABELS),
+    miss_rate: _MetricStatistics(_confusion_cells, _from_counts(_miss_rate),
+                                 binary=True, applies_to=_ZERO_ONE_LABELS),
+    fallout_rate: _MetricStatistics(_confusion_cells, _from_counts(_fallout_rate),
+                                    binary=True, applies_to=_ZERO_ONE_LABELS),
+    selection_rate: _MetricStatistics(_selected, _mean),
+    mean_prediction: _mean_of(_prediction),
+    mean_overprediction: _mean_of(_overprediction),
+    mean_underprediction: _mean_of(_underprediction),
+    skm.mean_squared_error: _mean_of(_squared_error),
+    skm.mean_absolute_error: _mean_of(_absolute_error),
+    balanced_root_mean_squared_error: _MetricStatistics(_label_squared_errors,
+                                                        _balanced_root_mean_squared_error,
+                                                        validate=_check_both_labels,
+                                                        applies_to=_NUMERIC_DATA)
+}
@@ -0,0 +1,207 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+
+from ._confusion_counts import _fallout_rate, _precision_score, _recall_score
+from ._confusion_counts import _selection_rate
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs, _make_group_metric_result
+from ._roc_auc import _tied_score_blocks
+
+_MESSAGE_BAD_SCORES = "y_score must be a non-empty one-dimensional array of numbers"
+_MESSAGE_BAD_Y_TRUE = "y_true must be a one-dimensional array"
+
+# The metrics computed at each threshold, and the functions which compute
+# them from the binary confusion counts
+_CURVE_METRICS = {
+    "selection_rate": _selection_rate,
+    "true_positive_rate": _recall_score,
+    "false_positive_rate": _fallout_rate,
+    "precision": _precision_score
+}
+
+
+def group_threshold_curves(y_true, y_score, group_membership, sample_weight=None, *,
+                           thresholds=None, pos_label=1):
+    """Computes the selection rate, true positive rate, false positive rate and
+    precision of each subgroup of a set of data, for the predictions obtained
+    by thresholding continuous scores at many thresholds.
+
+    A sample is predicted to be positive at a threshold if its score is
+    at least the threshold, so the values at threshold ``t`` are those which
+    :func:`group_selection_rate`, :func:`group_recall_score`,
+    :func:`group_fallout_rate` and :func:`group_precision_score` would give for
+    the predictions ``y_score >= t``. However, the data are only grouped once,
+    after which the metrics at every threshold follow from cumulative sums.
+
+    If ``thresholds`` is given, then each sample's score is located among the
+    sorted thresholds, and the (weighted) numbers of samples and of positive
+    samples falling between each pair of thresholds are counted for every
+    group with :func:`numpy.bincount`. Otherwise, the data are sorted once
+    by score, and the curves of each group are given at each of its distinct
+    scores, in decreasing order (as for :any:`sklearn.metrics.roc_curve`).
+
+    :param y_true: Array of ground-truth values
+
+    :param y_score: Array of continuous scores, such as predicted probabilities
+        of the positive class
+
+    :param group_membership: Array Indicating the group to which each input value belongs
+
+    :param sample_weight: Optional weights to apply to each input value
+
+    :param thresholds: The thresholds at which the metrics are wanted. By default,
+        every distinct score is used
+    :type thresholds: array
+
+    :param pos_label: The label of the positive class in ``y_true``
+
+    :return: Dictionary with the keys ``"thresholds"``, ``"selection_rate"``,
+        ``"true_positive_rate"``, ``"false_positive_rate"`` and ``"precision"``.
+        Each value is a :class:`GroupMetricResult` whose ``overall`` value and
+        ``by_group`` values are arrays, holding the thresholds or the metric at
+        each threshold. If ``thresholds`` is given, then every array is in the
+        same order as ``thresholds``
+    :rtype: dict of :class:`GroupMetricResult`
+    """
+    y_a, y_s, g_d, s_w = _convert_and_check_inputs(y_true, y_score, group_membership,
+                                                   sample_weight)
+    if y_s.ndim != 1 or y_s.dtype.kind not in 'biuf' or len(y_s) == 0:
+        raise ValueError(_MESSAGE_BAD_SCORES)
+    if y_a.ndim != 1:
+        raise ValueError(_MESSAGE_BAD_Y_TRUE)
+
+    partition = GroupPartition(g_d)
+    positive = (y_a == pos_label)
+    if thresholds is None:
+        return _curves_at_scores(y_s, positive, partition, s_w)
+
+    thresholds = np.asarray(thresholds, dtype=float).reshape(-1)
+    return _curves_at_thresholds(y_s, positive, partition, s_w, thresholds)
+
+
+def _curves_at_thresholds(y_s, positive, partition, s_w, thresholds):
+    n_groups = partition.n_groups
+    n_bins = len(thresholds) + 1
+    threshold_order = np.argsort(thresholds, kind='stable')
+
+    # The number of thresholds at or below each score, which is the
+    # number of (sorted) thresholds at which the sample is selected
+    bins = np.searchsorted(thresholds[threshold_order], y_s, side='right')
+    cells = partition.codes * n_bins + bins
+    total = _cell_sums(cells, s_w, n_groups * n_bins).reshape(n_groups, n_bins)
+    total_pos = _cell_sums(cells[positive], None if s_w is None else s_w[positive],
+                           n_groups * n_bins).reshape(n_groups, n_bins)
+
+    # Those selected at the j-th threshold are in bins j+1 onwards
+    selected = np.cumsum(total[:, ::-1], axis=1)[:, ::-1]
+    selected_pos = np.cumsum(total_pos[:, ::-1], axis=1)[:, ::-1]
+
+    # Put the thresholds back in the order in which they were given
+    inverse = np.empty_like(threshold_order)
+    inverse[threshold_order] = np.arange(len(threshold_order))
+    counts = _confusion_counts(selected[:, 1:][:, inverse], selected_pos[:, 1:][:, inverse],
+                               selected[:, :1], selected_pos[:, :1])
+
+    threshold_values = np.broadcast_to(thresholds, (n_groups, len(thresholds)))
+    results = {"thresholds": _make_group_metric_result(thresholds, partition.groups,
+                                                       threshold_values)}
+    for name, count_metric in _CURVE_METRICS.items():
+        results[name] = _make_group_metric_result(count_metric(counts.sum(axis=0)),
+                                                  partition.groups, count_metric(counts))
+    return results
+
+
+def _curves_at_scores(y_s, positive, partition, s_w):
+    # A stable sort of the group codes keeps each group sorted by score
+    score_order = np.argsort(y_s, kind='stable')
+    group_order = score_order[np.argsort(partition.codes[score_order], kind='stable')]
+    weights = None if s_w is None else s_w[score_order]
+    overall_scores, overall_counts, _ = _counts_at_scores(
+        y_s[score_order], positive[score_order], weights,
+        np.zeros(len(y_s), dtype=np.intp), 1)
+
+    weights = None if s_w is None else s_w[group_order]
+    scores, counts, offsets = _counts_at_scores(y_s[group_order], positive[group_order],
+                                                weights, partition.codes[group_order],
+                                                partition.n_groups)
+
+    def by_group(values):
+        return [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+
+    results = {"thresholds": _make_group_metric_result(overall_scores, partition.groups,
+                                                       by_group(scores))}
+    for name, count_metric in _CURVE_METRICS.items():
+        results[name] = _make_group_metric_result(count_metric(overall_counts),
+                                                  partition.groups,
+                                                  by_group(count_metric(counts)))
+    return results
+
+
+def _counts_at_scores(scores, positive, weights, codes, n_groups):
+    """Computes the confusion counts of each group at each of its distinct scores,
+    for data sorted by group and then by score. Returns the thresholds, the
+    counts and the bounds of each group's thresholds, with the thresholds of
+    each group in decreasing order
+    """
+    starts = _tied_score_blocks(scores, codes)
+
+    if weights is None:
+        block_total = np.diff(np.append(starts, len(scores)))
+        block_pos = np.add.reduceat(positive, starts, dtype=np.intp)
+    else:
+        block_total = np.add.reduceat(weights, starts)
+        block_pos = np.add.reduceat(np.where(positive, weights, 0), starts)
+    block_codes = codes[starts]
+    offsets = np.zeros(n_groups + 1, dtype=np.intp)
+    np.cumsum(np.bincount(block_codes, minlength=n_groups), out=offsets[1:])
+
+    # Reverse the blocks within each group, so that the scores decrease
+    # and the samples selected at each threshold are those in the blocks
+    # up to and including its own
+    reverse = offsets[block_codes] + offsets[block_codes + 1] - 1 - np.arange(len(starts))
+    block_total = block_total[reverse]
+    block_pos = block_pos[reverse]
+    thresholds = scores[starts][reverse]
+
+    selected = _segment_cumsum(block_total, block_codes, offsets)
+    selected_pos = _segment_cumsum(block_pos, block_codes, offsets)
+    total = np.bincount(block_codes, weights=block_total, minlength=n_groups)
+    total_pos = np.bincount(block_codes, weights=block_pos, minlength=n_groups)
+    if weights is None:
+        # Keep the counts as integers
+        total = total.astype(np.intp)
+        total_pos = total_pos.astype(np.intp)
+    counts = _confusion_counts(selected, selected_pos, total[block_codes],
+                               total_pos[block_codes])
+    return thresholds, counts, offsets
+
+
+def _segment_cumsum(values, codes, offsets):
+    """Computes the cumulative sums of the values within each segment
+    bounded by ``offsets``, where ``codes`` gives the segment of each value
+    """
+    cumulative = np.cumsum(values)
+    before = np.concatenate((np.zeros(1, dtype=cumulative.dtype), cumulative))
+    return cumulative - before[offsets[:-1]][codes]
+
+
+def _cell_sums(cells, weights, n_cells):
+    if weights is None:
+        return np.bincount(cells, minlength=n_cells)
+    return np.bincount(cells, weights=weights, minlength=n_cells)
+
+
+def _confusion_counts(selected, selected_pos, total, total_pos):
+    """Builds the binary confusion counts, laid out as for :class:`BinaryConfusionCounts`,
+    from the (weighted) numbers of selected samples and of selected positive samples,
+    and the totals of all samples and of positive samples (which broadcast
+    against them)
+    """
+    counts = np.empty(np.shape(selected) + (2, 2), dtype=np.result_type(selected, total))
+    counts[..., 1, 1] = selected_pos
+    counts[..., 0, 1] = selected - selected_pos
+    counts[..., 1, 0] = total_pos - selected_pos
+    counts[..., 0, 0] = total - total_pos - (selected - selected_pos)
+    return counts
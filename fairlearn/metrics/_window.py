@@ -0,0 +1,189 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+from collections import OrderedDict
+
+import numpy as np
+
+from ._accumulators import _GroupIndex, _sums_result
+from ._group_partition import GroupPartition
+from ._metrics_engine import _convert_and_check_inputs
+from ._sufficient_statistics import _get_metric_statistics, _statistic_sums
+
+_MESSAGE_BAD_N_BUCKETS = "n_buckets must be a positive integer"
+_MESSAGE_EXPIRED_BUCKET = "Bucket {0} is no longer in the window, which starts after {1}"
+_MESSAGE_EMPTY_WINDOW = "There are no data in the window"
+
+
+class GroupMetricWindow:
+    """Class which computes a grouped metric over a sliding window of recent
+    data, such as the last hour of live traffic, without recomputing it from
+    all the data in the window whenever new data arrive.
+
+    The data are added in time buckets (for example, one per minute), identified
+    by increasing numbers. The window holds the latest ``n_buckets`` buckets:
+    when a bucket ``b`` is added, every bucket up to ``b - n_buckets`` expires.
+    As for :class:`GroupMetricAccumulator`, only the (weighted) sums of a few
+    per-sample statistics are kept for each group in each bucket. Adding data to
+    a bucket therefore takes time proportional to the number of groups in the
+    data, and expiring a bucket just drops its sums. :meth:`result` adds up the
+    sums of the buckets in the window with a single :func:`numpy.bincount`,
+    over the rows which every group shares between the buckets. Since
+    expired sums are never subtracted from running totals, no rounding errors
+    build up as the window slides.
+
+    The supported metrics are those supported by :class:`GroupMetricAccumulator`.
+    The results are the same as :func:`metric_by_group` would give for the data
+    in the window (up to floating point rounding).
+
+    :param metric_function: The metric to be computed
+    :type metric_function: func
+
+    :param n_buckets: The number of buckets in the window
+    :type n_buckets: int
+
+    :param pos_label: The label of the positive class, for the
+        classification metrics
+    """
+
+    def __init__(self, metric_function, n_buckets, *, pos_label=1):
+        # Check that the metric is supported
+        _get_metric_statistics(metric_function)
+        if not isinstance(n_buckets, (int, np.integer)) or n_buckets < 1:
+            raise ValueError(_MESSAGE_BAD_N_BUCKETS)
+
+        self._metric_function = metric_function
+        self._n_buckets = int(n_buckets)
+        self._pos_label = pos_label
+        # The rows of all the groups seen, shared by the buckets
+        self._index = _GroupIndex()
+        # For each bucket in the window, the list of the (rows, sums) arrays
+        # of the groups in each batch added to it, and the labels seen
+        self._buckets = OrderedDict()
+        self._latest_bucket = None
+
+    @property
+    def metric_function(self):
+        """Gets the metric being computed
+        """
+        return self._metric_function
+
+    @property
+    def n_buckets(self):
+        """Gets the number of buckets in the window
+        """
+        return self._n_buckets
+
+    @property
+    def latest_bucket(self):
+        """Gets the latest bucket to which data have been added, or to which
+        the window has been advanced
+        """
+        return self._latest_bucket
+
+    @property
+    def buckets(self):
+        """Gets the list of the buckets in the window which hold data,
+        in the order in which they were first added
+        """
+        return list(self._buckets.keys())
+
+    def update(self, bucket, y_true, y_pred, group_membership, sample_weight=None):
+        """Adds a batch of data to a bucket. If the bucket is later than any
+        seen so far, then the window is first advanced to it.
+
+        :param bucket: The bucket (such as the number of minutes since some
+            starting time) to which the data belong
+        :type bucket: int
+
+        :param y_true: Array of ground-truth values
+
+        :param y_pred: Array of predicted values
+
+        :param group_membership: Array Indicating the group to which each input value belongs
+
+        :param sample_weight: Optional weights to apply to each input value
+
+        :return: This window
+        :rtype: :class:`GroupMetricWindow`
+        """
+        if self._latest_bucket is not None and bucket <= self._window_start():
+            raise ValueError(_MESSAGE_EXPIRED_BUCKET.format(bucket, self._window_start()))
+        self.advance(bucket)
+
+        y_a, y_p, g_d, s_w = _convert_and_check_inputs(y_true, y_pred, group_membership,
+                                                       sample_weight)
+        metric_statistics = _get_metric_statistics(self._metric_function)
+        labels = set()
+        if metric_statistics.binary:
+            labels.update(np.unique(y_a).tolist())
+            labels.update(np.unique(y_p).tolist())
+
+        partition = GroupPartition(g_d)
+        sums = _statistic_sums(metric_statistics, y_a, y_p,
+                               partition.codes, partition.n_groups,
+                               pos_label=self._pos_label, sample_weight=s_w)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = ([], set())
+        bucket_batches, bucket_labels = self._buckets[bucket]
+        bucket_batches.append((self._index.rows(partition.groups), sums))
+        bucket_labels |= labels
+        return self
+
+    def advance(self, bucket):
+        """Moves the window forward so that its latest bucket is ``bucket``,
+        expiring the buckets which fall out of it. Nothing happens if
+        ``bucket`` is not later than the latest bucket
+
+        :param bucket: The new latest bucket
+        :type bucket: int
+
+        :return: This window
+        :rtype: :class:`GroupMetricWindow`
+        """
+        if self._latest_bucket is not None and bucket <= self._latest_bucket:
+            return self
+        self._latest_bucket = bucket
+
+        window_start = self._window_start()
+        for expired in [b for b in self._buckets if b <= window_start]:
+            del self._buckets[expired]
+        if not self._buckets:
+            # Forget the groups which have left the window
+            self._index = _GroupIndex()
+        return self
+
+    def result(self):
+        """Computes the metric for the data in the window
+
+        :return: Object containing the result of applying the metric to all the
+            data in the window, and to each group which has data in the window
+        :rtype: :class:`GroupMetricResult`
+        """
+        # Add up the buckets afresh, rather than keeping running totals
+        # from which expired buckets are subtracted
+        batches = []
+        labels = set()
+        for bucket_batches, bucket_labels in self._buckets.values():
+            batches.extend(bucket_batches)
+            labels |= bucket_labels
+        if not batches:
+            raise ValueError(_MESSAGE_EMPTY_WINDOW)
+        rows = np.concatenate([batch_rows for batch_rows, _ in batches])
+        sums = np.concatenate([batch_sums for _, batch_sums in batches])
+
+        # A single bincount over the (row, statistic) cells
+        n_rows, n_columns = len(self._index.groups), sums.shape[1]
+        cells = (rows[:, np.newaxis] * n_columns + np.arange(n_columns)).reshape(-1)
+        totals = np.bincount(cells, weights=sums.reshape(-1),
+                             minlength=n_rows * n_columns).reshape(n_rows, n_columns)
+        # Only the groups with data in the window are included
+        live = np.flatnonzero(np.bincount(rows, minlength=n_rows))
+        if len(live) == 0:
+            raise ValueError(_MESSAGE_EMPTY_WINDOW)
+        return _sums_result(self._metric_function, labels, self._pos_label,
+                            [self._index.groups[row] for row in live], totals[live])
+
+    def _window_start(self):
+        # The buckets up to and including this one have expired
+        return self._latest_bucket - self._n_buckets
@@ -33,7 +33,8 @@ class Moment:
             "data can be loaded only once"
         self.X = X
         self.n = self.X.shape[0]
-        self.tags = pd.DataFrame({_LABEL: y})
+        # Share the data of y (which may be memory-mapped) rather than copying it
+        self.tags = pd.DataFrame({_LABEL: y}, copy=False)
         if _KW_SENSITIVE_FEATURES in kwargs:
             self.tags[_GROUP_ID] = kwargs[_KW_SENSITIVE_FEATURES]
         self.data_loaded = True
@@ -0,0 +1,177 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import pickle
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+
+from .test_utilities import assert_results_equal, n_samples
+from .test_utilities import Y_true, Y_pred, Y_pred_reg, groups, weight
+
+# ===========================================================
+
+classification_metrics = [skm.accuracy_score,
+                          skm.zero_one_loss,
+                          skm.precision_score,
+                          skm.recall_score,
+                          metrics.specificity_score,
+                          metrics.miss_rate,
+                          metrics.fallout_rate,
+                          metrics.selection_rate]
+
+regression_metrics = [skm.mean_squared_error,
+                      skm.mean_absolute_error,
+                      metrics.mean_prediction,
+                      metrics.mean_overprediction,
+                      metrics.mean_underprediction,
+                      metrics.balanced_root_mean_squared_error]
+
+# ===========================================================
+
+
+def _batches(n_batches):
+    return np.array_split(np.arange(n_samples), n_batches)
+
+
+@pytest.mark.parametrize("metric_function", classification_metrics)
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_classification_batches(metric_function, s_w):
+    accumulator = metrics.GroupMetricAccumulator(metric_function)
+    for batch in _batches(7):
+        batch_weight = None if s_w is None else s_w[batch]
+        accumulator.update(Y_true[batch], Y_pred[batch], groups[batch],
+                           sample_weight=batch_weight)
+
+    expected = metrics.metric_by_group(metric_function, Y_true, Y_pred, groups,
+                                       sample_weight=s_w)
+    assert_results_equal(accumulator.result(), expected)
+
+
+@pytest.mark.parametrize("metric_function", regression_metrics)
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_regression_batches(metric_function, s_w):
+    accumulator = metrics.GroupMetricAccumulator(metric_function)
+    for batch in _batches(5):
+        batch_weight = None if s_w is None else s_w[batch]
+        accumulator.update(Y_true[batch], Y_pred_reg[batch], groups[batch],
+                           sample_weight=batch_weight)
+
+    expected = metrics.metric_by_group(metric_function, Y_true, Y_pred_reg, groups,
+                                       sample_weight=s_w)
+    assert_results_equal(accumulator.result(), expected)
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_one_row_batches(s_w):
+    # A stream may end with (or consist of) batches of a single row
+    accumulator = metrics.GroupMetricAccumulator(skm.precision_score)
+    for batch in _batches(397):
+        batch_weight = None if s_w is None else s_w[batch]
+        accumulator.update(Y_true[batch], Y_pred[batch], groups[batch],
+                           sample_weight=batch_weight)
+    accumulator.update([Y_true[0]], [Y_pred[0]], [groups[0]],
+                       sample_weight=None if s_w is None else [s_w[0]])
+
+    y_true = np.append(Y_true, Y_true[0])
+    y_pred = np.append(Y_pred, Y_pred[0])
+    expected = metrics.metric_by_group(skm.precision_score, y_true, y_pred,
+                                       np.append(groups, groups[0]),
+                                       sample_weight=None if s_w is None else
+                                       np.append(s_w, s_w[0]))
+    assert_results_equal(accumulator.result(), expected)
+
+
+def test_merge_across_pickling():
+    # Each 'worker' only sees some of the groups in its batches
+    first = metrics.GroupMetricAccumulator(skm.recall_score)
+    second = metrics.GroupMetricAccumulator(skm.recall_score)
+    mask = np.isin(groups, ["a", "b"])
+    first.update(Y_true[mask], Y_pred[mask], groups[mask])
+    second.update(Y_true[~mask], Y_pred[~mask], groups[~mask])
+
+    merged = pickle.loads(pickle.dumps(first)).merge(pickle.loads(pickle.dumps(second)))
+
+    expected = metrics.group_recall_score(Y_true, Y_pred, groups)
+    assert_results_equal(merged.result(), expected)
+    assert set(merged.groups) == {"a", "b", "c", "d"}
+
+
+def test_selection_rate_pos_label():
+    accumulator = metrics.GroupMetricAccumulator(metrics.selection_rate, pos_label=0)
+    accumulator.update(Y_true, Y_pred, groups, sample_weight=weight)
+
+    expected = metrics.group_selection_rate(Y_true, Y_pred, groups,
+                                            pos_label=0, sample_weight=weight)
+    assert_results_equal(accumulator.result(), expected)
+
+
+@pytest.mark.parametrize("metric_function", [skm.accuracy_score,
+                                             skm.precision_score,
+                                             skm.recall_score])
+def test_labels_one_and_two(metric_function):
+    accumulator = metrics.GroupMetricAccumulator(metric_function)
+    accumulator.update(Y_true + 1, Y_pred + 1, groups, sample_weight=weight)
+
+    expected = metrics.metric_by_group(metric_function, Y_true + 1, Y_pred + 1, groups,
+                                       sample_weight=weight)
+    assert_results_equal(accumulator.result(), expected)
+
+
+@pytest.mark.parametrize("metric_function", [metrics.specificity_score,
+                                             metrics.miss_rate,
+                                             metrics.fallout_rate])
+def test_labels_not_zero_one(metric_function):
+    # These metrics take the greater label to be positive, unlike the
+    # pos_label of the accumulator, so only labels from {0, 1} are allowed
+    accumulator = metrics.GroupMetricAccumulator(metric_function)
+    accumulator.update(Y_true + 1, Y_pred + 1, groups)
+
+    with pytest.raises(ValueError) as exception_context:
+        _ = accumulator.result()
+
+    expected = "Metric {0} requires labels taken from {{0, 1}}, but found [1, 2]".format(
+        metric_function.__name__)
+    assert exception_context.value.args[0] == expected
+
+
+def test_unsupported_metric():
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.GroupMetricAccumulator(skm.median_absolute_error)
+
+    expected = "Metric median_absolute_error cannot be computed from sums of statistics"
+    assert exception_context.value.args[0] == expected
+
+
+def test_merge_different_metrics():
+    first = metrics.GroupMetricAccumulator(skm.recall_score)
+    second = metrics.GroupMetricAccumulator(skm.precision_score)
+
+    with pytest.raises(ValueError) as exception_context:
+        first.merge(second)
+
+    expected = "Cannot merge accumulators for different metrics"
+    assert exception_context.value.args[0] == expected
+
+
+def test_not_binary():
+    accumulator = metrics.GroupMetricAccumulator(skm.recall_score)
+    accumulator.update([0, 1, 2], [0, 1, 1], ["a", "a", "b"])
+
+    with pytest.raises(ValueError) as exception_context:
+        _ = accumulator.result()
+
+    expected = "Metric recall_score requires binary labels, but found [0, 1, 2]"
+    assert exception_context.value.args[0] == expected
+
+
+def test_no_data():
+    accumulator = metrics.GroupMetricAccumulator(skm.accuracy_score)
+
+    with pytest.raises(ValueError) as exception_context:
+        _ = accumulator.result()
+
+    assert exception_context.value.args[0] == "No data have been accumulated"
@@ -0,0 +1,171 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._arrow import _MESSAGE_PYARROW_REQUIRED
+from fairlearn.metrics._arrow import _arrow_to_numpy, _is_arrow
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+requires_pyarrow = pytest.mark.skipif(pa is None, reason="pyarrow is not installed")
+
+# ===========================================================
+
+rng = np.random.RandomState(5)
+n_samples = 1000
+y_t = rng.randint(2, size=n_samples)
+y_p = rng.randint(2, size=n_samples)
+y_score = rng.rand(n_samples)
+gid = rng.choice(['p', 'q', 'r'], size=n_samples)
+gid_2 = rng.randint(3, size=n_samples)
+weight = rng.rand(n_samples)
+
+
+def _assert_same_result(result, expected):
+    assert result.overall == pytest.approx(expected.overall)
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+
+
+def test_is_arrow():
+    assert not _is_arrow(y_t)
+    assert not _is_arrow(list(y_t))
+    assert not _is_arrow(pd.Series(y_t))
+
+
+@pytest.mark.skipif(pa is not None, reason="pyarrow is installed")
+def test_parquet_requires_pyarrow():
+    with pytest.raises(ImportError) as exception_context:
+        metrics.metric_by_group_from_parquet(skm.accuracy_score, "data.parquet",
+                                             "y_true", "y_pred", "group")
+    assert exception_context.value.args[0] == _MESSAGE_PYARROW_REQUIRED
+
+# ===========================================================
+
+
+@requires_pyarrow
+def test_zero_copy_conversion():
+    array = pa.array(y_score)
+
+    converted = _arrow_to_numpy(array)
+    assert np.array_equal(converted, y_score)
+    assert np.shares_memory(converted, np.frombuffer(array.buffers()[1], dtype=float))
+
+
+@requires_pyarrow
+def test_conversion_with_copies():
+    assert np.array_equal(_arrow_to_numpy(pa.array([True, False, True])), [True, False, True])
+    assert np.array_equal(_arrow_to_numpy(pa.chunked_array([[1, 2], [3]])), [1, 2, 3])
+    assert len(_arrow_to_numpy(pa.chunked_array([], type=pa.int64()))) == 0
+    with_null = _arrow_to_numpy(pa.array([1.0, None]))
+    assert with_null[0] == 1 and np.isnan(with_null[1])
+
+
+@requires_pyarrow
+def test_dictionary_conversion():
+    converted = _arrow_to_numpy(pa.array(gid).dictionary_encode())
+
+    assert isinstance(converted, pd.Categorical)
+    assert np.array_equal(np.asarray(converted), gid)
+
+
+@requires_pyarrow
+@pytest.mark.parametrize("encode", [False, True])
+def test_arrow_inputs(encode):
+    groups = pa.array(gid)
+    if encode:
+        groups = groups.dictionary_encode()
+
+    result = metrics.group_accuracy_score(pa.array(y_t), pa.array(y_p), groups,
+                                          sample_weight=pa.array(weight))
+    expected = metrics.group_accuracy_score(y_t, y_p, gid, sample_weight=weight)
+    _assert_same_result(result, expected)
+
+
+@requires_pyarrow
+def test_arrow_table_groups():
+    table = pa.table({'g1': gid, 'g2': gid_2})
+
+    result = metrics.metric_by_group(skm.recall_score, pa.chunked_array([y_t]),
+                                     pa.chunked_array([y_p]), table)
+    expected = metrics.metric_by_group(skm.recall_score, y_t, y_p,
+                                       pd.DataFrame({'g1': gid, 'g2': gid_2}))
+    _assert_same_result(result, expected)
+
+# ===========================================================
+
+
+@pytest.fixture
+def parquet_path(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    table = pa.table({'label': y_t, 'prediction': y_p, 'score': y_score,
+                      'group': pa.array(gid).dictionary_encode(), 'group_2': gid_2,
+                      'weight': weight, 'unused': np.zeros(n_samples)})
+    pq.write_table(table, path, row_group_size=128)
+    return path
+
+
+@requires_pyarrow
+def test_parquet_streamed(parquet_path):
+    assert pq.ParquetFile(parquet_path).num_row_groups > 1
+
+    result = metrics.metric_by_group_from_parquet(skm.accuracy_score, parquet_path,
+                                                  'label', 'prediction', 'group',
+                                                  sample_weight='weight')
+    expected = metrics.metric_by_group(skm.accuracy_score, y_t, y_p, gid,
+                                       sample_weight=weight)
+    _assert_same_result(result, expected)
+
+
+@requires_pyarrow
+def test_parquet_intersectional(parquet_path):
+    result = metrics.metric_by_group_from_parquet(skm.precision_score, parquet_path,
+                                                  'label', 'prediction', ['group', 'group_2'])
+    expected = metrics.metric_by_group(skm.precision_score, y_t, y_p,
+                                       pd.DataFrame({'group': gid, 'group_2': gid_2}))
+    _assert_same_result(result, expected)
+
+
+@requires_pyarrow
+def test_parquet_not_streamed(parquet_path):
+    result = metrics.metric_by_group_from_parquet(skm.roc_auc_score, parquet_path,
+                                                  'label', 'score', 'group')
+    expected = metrics.metric_by_group(skm.roc_auc_score, y_t, y_score, gid)
+    _assert_same_result(result, expected)
+
+
+class _UnhashableMetric:
+    __hash__ = None
+
+    def __call__(self, y_true, y_pred, sample_weight=None):
+        return skm.accuracy_score(y_true, y_pred, sample_weight=sample_weight)
+
+
+@requires_pyarrow
+def test_parquet_unhashable_metric(parquet_path):
+    result = metrics.metric_by_group_from_parquet(_UnhashableMetric(), parquet_path,
+                                                  'label', 'prediction', 'group')
+    expected = metrics.metric_by_group(skm.accuracy_score, y_t, y_p, gid)
+    _assert_same_result(result, expected)
+
+
+@requires_pyarrow
+def test_parquet_one_row_groups(tmp_path):
+    path = str(tmp_path / "small.parquet")
+    pq.write_table(pa.table({'label': y_t[:5], 'prediction': y_p[:5], 'group': gid[:5]}),
+                   path, row_group_size=1)
+
+    result = metrics.metric_by_group_from_parquet(skm.accuracy_score, path,
+                                                  'label', 'prediction', 'group')
+    expected = metrics.metric_by_group(skm.accuracy_score, y_t[:5], y_p[:5], gid[:5])
+    _assert_same_result(result, expected)
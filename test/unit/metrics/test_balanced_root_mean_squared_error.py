@@ -2,6 +2,7 @@
 # Licensed under the MIT License.
 
 import math
+import numpy as np
 import pytest
 
 import fairlearn.metrics as metrics
@@ -58,3 +59,60 @@ def test_y_true_not_0_1(y_true):
     with pytest.raises(ValueError) as execInfo:
         _ = metrics.balanced_root_mean_squared_error(y_true, y_pred)
     assert message == execInfo.value.args[0]
+
+
+def test_class_zero_weight():
+    y_true = [0, 0, 1, 1]
+    y_pred = [0.5, 0.5, 0.5, 0.5]
+    weight = [1, 2, 0, 0]
+
+    message = "The total weight of each class in y_true must be positive"
+    with pytest.raises(ValueError) as execInfo:
+        _ = metrics.balanced_root_mean_squared_error(y_true, y_pred, weight)
+    assert message == execInfo.value.args[0]
+
+
+# ======================================================================
+
+
+@pytest.mark.parametrize("use_weights", [False, True])
+def test_group_matches_metric_by_group(use_weights):
+    rng = np.random.RandomState(29)
+    y_true = rng.randint(0, 2, size=800)
+    y_pred = rng.rand(800)
+    groups = rng.choice(["a", "b", "c", "d"], size=800)
+    weight = rng.rand(800) if use_weights else None
+
+    result = metrics.group_balanced_root_mean_squared_error(y_true, y_pred, groups,
+                                                            sample_weight=weight)
+    expected = metrics.metric_by_group(metrics.balanced_root_mean_squared_error,
+                                       y_true, y_pred, groups, sample_weight=weight)
+
+    assert result.overall == pytest.approx(expected.overall)
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+
+
+def test_group_missing_label():
+    y_true = [0, 1, 0, 0, 1, 1]
+    y_pred = [0.5, 0.5, 0.5, 0.5, 0.5, 0.5]
+    groups = [0, 0, 1, 1, 2, 2]
+
+    message = "Only 0 and 1 are allowed in y_true and both must be present"
+    with pytest.raises(ValueError) as execInfo:
+        _ = metrics.group_balanced_root_mean_squared_error(y_true, y_pred, groups)
+    assert message == execInfo.value.args[0]
+
+
+def test_group_class_zero_weight():
+    y_true = [0, 1, 0, 1, 0, 1]
+    y_pred = [0.5, 0.5, 0.5, 0.5, 0.5, 0.5]
+    groups = [0, 0, 1, 1, 2, 2]
+    weight = [1, 1, 1, 0, 1, 1]
+
+    message = "The total weight of each class in y_true must be positive"
+    with pytest.raises(ValueError) as execInfo:
+        _ = metrics.group_balanced_root_mean_squared_error(y_true, y_pred, groups,
+                                                           sample_weight=weight)
+    assert message == execInfo.value.args[0]
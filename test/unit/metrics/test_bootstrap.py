@@ -0,0 +1,103 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._bootstrap import _bootstrap_statistic_sums
+from fairlearn.metrics._group_partition import GroupPartition
+from fairlearn.metrics._sufficient_statistics import _METRIC_STATISTICS
+
+# ===========================================================
+
+rng = np.random.RandomState(41)
+n_samples = 600
+
+Y_true = rng.randint(0, 2, size=n_samples)
+Y_pred = rng.randint(0, 2, size=n_samples)
+Y_pred_reg = rng.rand(n_samples)
+groups = rng.choice(["a", "b", "c"], size=n_samples)
+weight = rng.rand(n_samples)
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_point_estimates(s_w):
+    bootstrap = metrics.bootstrap_metric_by_group(skm.recall_score, Y_true, Y_pred, groups,
+                                                  sample_weight=s_w,
+                                                  n_bootstrap=50, random_state=0)
+
+    expected = metrics.group_recall_score(Y_true, Y_pred, groups, sample_weight=s_w)
+    assert bootstrap.result.overall == pytest.approx(expected.overall)
+    for group in expected.by_group:
+        assert bootstrap.result.by_group[group] == pytest.approx(expected.by_group[group])
+    assert bootstrap.result.range == pytest.approx(expected.range)
+
+
+@pytest.mark.parametrize("method", ["poisson", "multinomial"])
+def test_intervals_contain_estimates(method):
+    bootstrap = metrics.bootstrap_metric_by_group(metrics.mean_prediction,
+                                                  Y_true, Y_pred_reg, groups,
+                                                  n_bootstrap=500, method=method,
+                                                  random_state=1)
+
+    assert bootstrap.confidence_level == 0.95
+    assert bootstrap.overall[0] < bootstrap.result.overall < bootstrap.overall[1]
+    for group, (lower, upper) in bootstrap.by_group.items():
+        assert lower < bootstrap.result.by_group[group] < upper
+    assert bootstrap.range[0] < bootstrap.range[1]
+    assert 0 <= bootstrap.range_ratio[0] < bootstrap.range_ratio[1] <= 1
+
+
+def test_random_state_reproducible():
+    first = metrics.bootstrap_metric_by_group(skm.accuracy_score, Y_true, Y_pred, groups,
+                                              n_bootstrap=100, random_state=7)
+    second = metrics.bootstrap_metric_by_group(skm.accuracy_score, Y_true, Y_pred, groups,
+                                               n_bootstrap=100, random_state=7)
+
+    assert first.overall == second.overall
+    assert first.by_group == second.by_group
+    assert first.range == second.range
+
+
+def test_replicates_match_resampled_data():
+    n_bootstrap = 5
+    partition = GroupPartition(groups)
+    sums = _bootstrap_statistic_sums(_METRIC_STATISTICS[skm.mean_squared_error],
+                                     Y_true, Y_pred_reg, partition, None, 1,
+                                     n_bootstrap, "multinomial", np.random.RandomState(3))
+
+    # Regenerate the resampling counts, which are drawn for the data sorted by group
+    counts = np.random.RandomState(3).multinomial(n_samples, np.full(n_samples, 1 / n_samples),
+                                                  size=n_bootstrap)
+    y_t_sorted = Y_true[partition.order]
+    y_p_sorted = Y_pred_reg[partition.order]
+    g_sorted = groups[partition.order]
+    for replicate in range(n_bootstrap):
+        indices = np.repeat(np.arange(n_samples), counts[replicate])
+        expected = metrics.group_mean_squared_error(y_t_sorted[indices],
+                                                    y_p_sorted[indices],
+                                                    g_sorted[indices])
+        actual = sums[replicate, :, 0] / sums[replicate, :, 1]
+        for i, group in enumerate(partition.groups):
+            assert actual[i] == pytest.approx(expected.by_group[group])
+
+
+def test_bad_method():
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.bootstrap_metric_by_group(skm.accuracy_score, Y_true, Y_pred, groups,
+                                              method="jackknife")
+
+    expected = "Bootstrap method must be one of ['poisson', 'multinomial']"
+    assert exception_context.value.args[0] == expected
+
+
+def test_unsupported_metric():
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.bootstrap_metric_by_group(skm.roc_auc_score, Y_true, Y_pred, groups)
+
+    expected = "Metric roc_auc_score cannot be computed from sums of statistics"
+    assert exception_context.value.args[0] == expected
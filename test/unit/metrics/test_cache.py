@@ -0,0 +1,178 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+
+# ===========================================================
+
+rng = np.random.RandomState(31)
+n_samples = 500
+
+Y_true = rng.randint(0, 2, size=n_samples)
+Y_pred = rng.randint(0, 2, size=n_samples)
+groups = rng.choice(["a", "b", "c"], size=n_samples)
+weight = rng.rand(n_samples)
+
+
+class CountingMetric:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, y_true, y_pred, sample_weight=None):
+        self.calls += 1
+        return skm.accuracy_score(y_true, y_pred, sample_weight=sample_weight)
+
+
+# ===========================================================
+
+
+def test_repeated_call_is_a_hit():
+    cache = metrics.GroupMetricCache()
+    metric = CountingMetric()
+
+    first = cache.metric_by_group(metric, Y_true, Y_pred, groups)
+    n_calls = metric.calls
+    second = cache.metric_by_group(metric, Y_true.copy(), list(Y_pred), groups.copy())
+
+    assert second is first
+    assert metric.calls == n_calls
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert len(cache) == 1
+
+
+def test_changed_contents_are_a_miss():
+    cache = metrics.GroupMetricCache()
+    y_pred = Y_pred.copy()
+
+    first = cache.evaluate(metrics.group_recall_score, Y_true, y_pred, groups)
+    y_pred[0] = 1 - y_pred[0]
+    second = cache.evaluate(metrics.group_recall_score, Y_true, y_pred, groups)
+
+    assert second is not first
+    assert second.overall == metrics.group_recall_score(Y_true, y_pred, groups).overall
+    assert cache.misses == 2
+
+
+def test_dtype_is_part_of_fingerprint():
+    cache = metrics.GroupMetricCache()
+
+    _ = cache.evaluate(metrics.group_mean_prediction, Y_true, Y_pred, groups)
+    _ = cache.evaluate(metrics.group_mean_prediction, Y_true, Y_pred.astype(np.int32), groups)
+
+    assert cache.misses == 2
+
+
+def test_arguments_are_part_of_key():
+    cache = metrics.GroupMetricCache()
+
+    unweighted = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, groups)
+    weighted = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, groups,
+                              sample_weight=weight)
+    unnormalized = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, groups,
+                                  normalize=False)
+    recall = cache.evaluate(metrics.group_recall_score, Y_true, Y_pred, groups)
+
+    assert len({id(unweighted), id(weighted), id(unnormalized), id(recall)}) == 4
+    assert cache.misses == 4
+    assert weighted.overall == pytest.approx(skm.accuracy_score(Y_true, Y_pred,
+                                                                sample_weight=weight))
+
+
+def test_lru_eviction():
+    cache = metrics.GroupMetricCache(maxsize=2)
+    group_metrics = [metrics.group_accuracy_score, metrics.group_recall_score,
+                     metrics.group_precision_score]
+
+    _ = cache.evaluate(group_metrics[0], Y_true, Y_pred, groups)
+    _ = cache.evaluate(group_metrics[1], Y_true, Y_pred, groups)
+    # Use the first, so that the second is the least recently used
+    _ = cache.evaluate(group_metrics[0], Y_true, Y_pred, groups)
+    _ = cache.evaluate(group_metrics[2], Y_true, Y_pred, groups)
+    assert len(cache) == 2
+    assert cache.hits == 1
+
+    _ = cache.evaluate(group_metrics[0], Y_true, Y_pred, groups)
+    assert cache.hits == 2
+    _ = cache.evaluate(group_metrics[1], Y_true, Y_pred, groups)
+    assert cache.hits == 2
+    assert cache.misses == 4
+
+
+def test_wrap():
+    cache = metrics.GroupMetricCache()
+    cached_recall = cache.wrap(metrics.group_recall_score)
+
+    first = cached_recall(Y_true, Y_pred, groups, sample_weight=weight)
+    second = cached_recall(Y_true, Y_pred, groups, sample_weight=weight)
+
+    assert cached_recall.__name__ == "group_recall_score"
+    assert second is first
+    assert cache.hits == 1
+
+
+def test_dataframe_and_categorical_groups():
+    cache = metrics.GroupMetricCache()
+    df = pd.DataFrame({"g": pd.Categorical(groups), "h": Y_true})
+
+    first = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, df)
+    second = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, df.copy())
+    df_changed = df.copy()
+    df_changed.loc[0, "h"] = 1 - df_changed.loc[0, "h"]
+    third = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, df_changed)
+
+    assert second is first
+    assert third is not first
+
+
+def test_object_arrays_compare_contents():
+    cache = metrics.GroupMetricCache()
+    mixed = np.asarray([1, "1"] * (n_samples // 2), dtype=object)
+    as_strings = np.asarray(["1", "1"] * (n_samples // 2), dtype=object)
+
+    _ = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred,
+                       np.where(mixed == 1, "x", "y"))
+    _ = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, groups.astype(object))
+    _ = cache.evaluate(metrics.group_accuracy_score, Y_true, Y_pred, groups.astype(object))
+
+    assert cache.hits == 1
+    assert not np.array_equal(mixed, as_strings)
+
+
+def test_unhashable_arguments_are_not_cached():
+    def group_metric_with_options(y_true, y_pred, group_membership, options):
+        return metrics.group_accuracy_score(y_true, y_pred, group_membership, **options)
+
+    cache = metrics.GroupMetricCache()
+
+    result = cache.evaluate(group_metric_with_options, Y_true, Y_pred, groups,
+                            options={"normalize": False})
+
+    assert result.overall == np.sum(Y_true == Y_pred)
+
+    assert len(cache) == 0
+    assert cache.misses == 1
+
+
+def test_clear():
+    cache = metrics.GroupMetricCache()
+
+    _ = cache.evaluate(metrics.group_recall_score, Y_true, Y_pred, groups)
+    cache.clear()
+    _ = cache.evaluate(metrics.group_recall_score, Y_true, Y_pred, groups)
+
+    assert cache.hits == 0
+    assert cache.misses == 2
+
+
+@pytest.mark.parametrize("maxsize", [0, -1, 1.5])
+def test_bad_maxsize(maxsize):
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.GroupMetricCache(maxsize=maxsize)
+
+    assert exception_context.value.args[0] == "maxsize must be a positive integer"
@@ -0,0 +1,158 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+from sklearn.calibration import calibration_curve
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._calibration import _MESSAGE_BAD_N_BINS, _MESSAGE_BAD_NORM
+from fairlearn.metrics._calibration import _MESSAGE_BAD_PROBABILITIES, _MESSAGE_BAD_STRATEGY
+
+# ===========================================================
+
+rng = np.random.RandomState(41)
+n_samples = 2000
+
+Y_prob = rng.rand(n_samples)
+Y_true = (rng.rand(n_samples) < Y_prob ** 2).astype(int)
+groups = rng.choice(["a", "b", "c", "d"], size=n_samples)
+weight = rng.rand(n_samples)
+
+
+def _reference_error(y_true, y_prob, s_w, edges, norm):
+    """Computes the calibration error one bin at a time"""
+    if s_w is None:
+        s_w = np.ones(len(y_true))
+    bins = np.searchsorted(edges[1:-1], y_prob)
+    differences = []
+    bin_weights = []
+    for b in range(len(edges) - 1):
+        in_bin = bins == b
+        if s_w[in_bin].sum() > 0:
+            fraction = np.average(y_true[in_bin], weights=s_w[in_bin])
+            mean_prob = np.average(y_prob[in_bin], weights=s_w[in_bin])
+            differences.append(abs(fraction - mean_prob))
+            bin_weights.append(s_w[in_bin].sum())
+    differences = np.array(differences)
+    if norm == "l1":
+        return np.average(differences, weights=bin_weights)
+    if norm == "l2":
+        return np.sqrt(np.average(differences ** 2, weights=bin_weights))
+    return differences.max()
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("strategy", ["uniform", "quantile"])
+@pytest.mark.parametrize("n_bins", [1, 5, 10])
+def test_curve_matches_sklearn(strategy, n_bins):
+    curves = metrics.group_calibration_curve(Y_true, Y_prob, groups, n_bins=n_bins,
+                                             strategy=strategy)
+
+    prob_true, prob_pred = calibration_curve(Y_true, Y_prob, n_bins=n_bins, strategy=strategy)
+    overall_true = curves["prob_true"].overall
+    assert np.allclose(overall_true[~np.isnan(overall_true)], prob_true)
+    overall_pred = curves["prob_pred"].overall
+    assert np.allclose(overall_pred[~np.isnan(overall_pred)], prob_pred)
+    assert curves["bin_weight"].overall.sum() == n_samples
+
+    if strategy == "uniform":
+        # The bins of the groups are the same as for all the data only
+        # when they do not depend on the data
+        for group in ["a", "b", "c", "d"]:
+            mask = groups == group
+            prob_true, prob_pred = calibration_curve(Y_true[mask], Y_prob[mask],
+                                                     n_bins=n_bins)
+            group_true = curves["prob_true"].by_group[group]
+            assert np.allclose(group_true[~np.isnan(group_true)], prob_true)
+            group_pred = curves["prob_pred"].by_group[group]
+            assert np.allclose(group_pred[~np.isnan(group_pred)], prob_pred)
+
+
+def test_curve_empty_bins():
+    y_prob = np.array([0.05, 0.1, 0.95, 0.9, 0.5])
+    curves = metrics.group_calibration_curve([0, 1, 1, 1, 0], y_prob,
+                                             ['x', 'x', 'y', 'y', 'y'], n_bins=2)
+
+    assert np.array_equal(curves["bin_weight"].by_group['x'], [2, 0])
+    assert np.array_equal(curves["bin_weight"].by_group['y'], [1, 2])
+    assert curves["prob_true"].by_group['x'][0] == 0.5
+    assert np.isnan(curves["prob_true"].by_group['x'][1])
+    assert curves["prob_pred"].by_group['y'] == pytest.approx([0.5, 0.925])
+
+
+@pytest.mark.parametrize("norm", ["l1", "l2", "max"])
+@pytest.mark.parametrize("strategy", ["uniform", "quantile"])
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_calibration_error(norm, strategy, s_w):
+    result = metrics.group_calibration_error(Y_true, Y_prob, groups, s_w, n_bins=8,
+                                             strategy=strategy, norm=norm)
+
+    if strategy == "uniform":
+        edges = np.linspace(0, 1, 9)
+    else:
+        edges = np.percentile(Y_prob, np.linspace(0, 100, 9))
+    assert result.overall == pytest.approx(_reference_error(Y_true, Y_prob, s_w, edges, norm))
+    for group in ["a", "b", "c", "d"]:
+        mask = groups == group
+        expected = _reference_error(Y_true[mask], Y_prob[mask],
+                                    None if s_w is None else s_w[mask], edges, norm)
+        assert result.by_group[group] == pytest.approx(expected)
+
+
+def test_calibrated_groups():
+    # Every group predicts its own fraction of positives
+    result = metrics.group_calibration_error([1, 0, 0, 0, 1, 1], [0.25] * 4 + [1, 1],
+                                             [0, 0, 0, 0, 1, 1])
+    assert result.by_group[0] == 0
+    assert result.by_group[1] == 0
+    assert result.overall == 0
+
+
+def test_many_groups():
+    many_groups = rng.randint(0, 20000, size=n_samples)
+    result = metrics.group_calibration_error(Y_true, Y_prob, many_groups, n_bins=5)
+
+    assert len(result.by_group) == len(np.unique(many_groups))
+    group = many_groups[0]
+    mask = many_groups == group
+    expected = _reference_error(Y_true[mask], Y_prob[mask], None, np.linspace(0, 1, 6), "l1")
+    assert result.by_group[group] == pytest.approx(expected)
+
+
+def test_pos_label():
+    labels = np.where(Y_true == 1, "yes", "no")
+    result = metrics.group_calibration_error(labels, Y_prob, groups, pos_label="yes")
+    expected = metrics.group_calibration_error(Y_true, Y_prob, groups)
+
+    assert result.overall == pytest.approx(expected.overall)
+    assert result.by_group == pytest.approx(expected.by_group)
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("y_prob", [[0.2, 1.5], [-0.1, 0.5], ["a", "b"]])
+def test_bad_probabilities(y_prob):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_calibration_curve([0, 1], y_prob, [0, 0])
+    assert exception_context.value.args[0] == _MESSAGE_BAD_PROBABILITIES
+
+
+@pytest.mark.parametrize("n_bins", [0, 2.5])
+def test_bad_n_bins(n_bins):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_calibration_curve(Y_true, Y_prob, groups, n_bins=n_bins)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_N_BINS
+
+
+def test_bad_strategy():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_calibration_error(Y_true, Y_prob, groups, strategy="kmeans")
+    assert exception_context.value.args[0] == _MESSAGE_BAD_STRATEGY
+
+
+def test_bad_norm():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_calibration_error(Y_true, Y_prob, groups, norm="l3")
+    assert exception_context.value.args[0] == _MESSAGE_BAD_NORM
@@ -0,0 +1,121 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._confusion_counts import BinaryConfusionCounts
+from fairlearn.metrics._group_partition import GroupPartition
+
+# ===========================================================
+
+rng = np.random.RandomState(13)
+n_samples = 500
+
+Y_true = rng.randint(0, 2, size=n_samples)
+Y_pred = rng.randint(0, 2, size=n_samples)
+groups = rng.choice(["p", "q", "r", "s"], size=n_samples)
+weight = rng.rand(n_samples)
+
+# Pairs of grouped metric and the ungrouped metric used to
+# check it on each group
+binary_metrics = [
+    (metrics.group_accuracy_score, skm.accuracy_score),
+    (metrics.group_zero_one_loss, skm.zero_one_loss),
+    (metrics.group_precision_score, skm.precision_score),
+    (metrics.group_recall_score, skm.recall_score),
+    (metrics.group_specificity_score, metrics.specificity_score),
+    (metrics.group_miss_rate, metrics.miss_rate),
+    (metrics.group_fallout_rate, metrics.fallout_rate),
+    (metrics.group_selection_rate, metrics.selection_rate)
+]
+
+# ===========================================================
+
+
+def test_counts_tensor():
+    y_t = [0, 0, 1, 1, 0, 1]
+    y_p = [0, 1, 1, 0, 0, 1]
+    gid = ["b", "b", "a", "a", "a", "b"]
+    s_w = [1, 2, 3, 4, 5, 6]
+
+    counts = BinaryConfusionCounts(np.asarray(y_t), np.asarray(y_p), GroupPartition(gid),
+                                   sample_weight=np.asarray(s_w))
+
+    assert np.array_equal(counts.groups, ["a", "b"])
+    assert np.array_equal(counts.counts[0], [[5, 0], [4, 3]])
+    assert np.array_equal(counts.counts[1], [[1, 2], [0, 6]])
+
+
+@pytest.mark.parametrize("func_tuple", binary_metrics)
+def test_matches_per_group(func_tuple):
+    group_metric_func = func_tuple[0]
+    metric_func = func_tuple[1]
+
+    result = group_metric_func(Y_true, Y_pred, groups)
+
+    assert result.overall == pytest.approx(metric_func(Y_true, Y_pred))
+    for group in np.unique(groups):
+        mask = groups == group
+        expected = metric_func(Y_true[mask], Y_pred[mask])
+        assert result.by_group[group] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("func_tuple", binary_metrics)
+def test_matches_per_group_weighted(func_tuple):
+    group_metric_func = func_tuple[0]
+    metric_func = func_tuple[1]
+
+    result = group_metric_func(Y_true, Y_pred, groups, sample_weight=weight)
+
+    assert result.overall == pytest.approx(metric_func(Y_true, Y_pred, sample_weight=weight))
+    for group in np.unique(groups):
+        mask = groups == group
+        expected = metric_func(Y_true[mask], Y_pred[mask], sample_weight=weight[mask])
+        assert result.by_group[group] == pytest.approx(expected)
+
+
+def test_string_labels_pos_label():
+    y_t = np.where(Y_true == 1, "yes", "no")
+    y_p = np.where(Y_pred == 1, "yes", "no")
+
+    result = metrics.group_recall_score(y_t, y_p, groups, pos_label="no")
+    expected = metrics.group_recall_score(1 - Y_true, 1 - Y_pred, groups)
+
+    assert result.overall == pytest.approx(expected.overall)
+    for group in np.unique(groups):
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+
+
+def test_no_positive_predictions():
+    y_t = [0, 1, 1, 0]
+    y_p = [0, 0, 1, 1]
+    gid = [0, 0, 1, 1]
+
+    result = metrics.group_precision_score(y_t, y_p, gid)
+
+    assert result.by_group[0] == 0
+    assert result.by_group[1] == 0.5
+
+
+def test_unnormalized_accuracy():
+    result = metrics.group_accuracy_score(Y_true, Y_pred, groups, normalize=False)
+
+    assert result.overall == np.sum(Y_true == Y_pred)
+    for group in np.unique(groups):
+        mask = groups == group
+        assert result.by_group[group] == np.sum(Y_true[mask] == Y_pred[mask])
+
+
+def test_multiclass_accuracy_falls_back():
+    y_t = [0, 1, 2, 2, 1, 0]
+    y_p = [0, 2, 2, 2, 1, 1]
+    gid = [0, 0, 0, 1, 1, 1]
+
+    result = metrics.group_accuracy_score(y_t, y_p, gid)
+
+    assert result.overall == pytest.approx(4 / 6)
+    assert result.by_group[0] == pytest.approx(2 / 3)
+    assert result.by_group[1] == pytest.approx(2 / 3)
@@ -0,0 +1,126 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._confusion_matrix import _confusion_matrix_tensor
+
+# ===========================================================
+
+n_samples = 2000
+n_classes = 7
+rng = np.random.RandomState(11)
+y_t = rng.randint(n_classes, size=n_samples)
+y_p = np.where(rng.rand(n_samples) < 0.6, y_t, rng.randint(n_classes, size=n_samples))
+gid = rng.choice(['a', 'b', 'c', 'd'], size=n_samples)
+int_weights = rng.randint(1, 5, size=n_samples)
+float_weights = rng.rand(n_samples)
+
+
+def _expected(y_true, y_pred, groups, sample_weight=None, labels=None):
+    expected = {}
+    for g in np.unique(groups):
+        mask = groups == g
+        expected[g] = skm.confusion_matrix(
+            y_true[mask], y_pred[mask], labels=labels,
+            sample_weight=None if sample_weight is None else sample_weight[mask])
+    return expected
+
+
+@pytest.mark.parametrize("sample_weight", [None, int_weights, float_weights])
+def test_matches_sklearn(sample_weight):
+    result = metrics.group_confusion_matrix(y_t, y_p, gid, sample_weight=sample_weight)
+
+    overall = skm.confusion_matrix(y_t, y_p, sample_weight=sample_weight)
+    assert np.array_equal(result.overall, overall)
+    assert result.overall.dtype == overall.dtype
+    expected = _expected(y_t, y_p, gid, sample_weight)
+    assert result.to_numpy().shape == (4, n_classes, n_classes)
+    for g, matrix in expected.items():
+        assert result.by_group[g].dtype == matrix.dtype
+        assert result.by_group[g] == pytest.approx(matrix)
+
+
+def test_labels_subset_and_order():
+    labels = [5, 0, 3, 42]
+    result = metrics.group_confusion_matrix(y_t, y_p, gid, labels=labels,
+                                            sample_weight=int_weights)
+
+    assert np.array_equal(result.overall,
+                          skm.confusion_matrix(y_t, y_p, labels=labels,
+                                               sample_weight=int_weights))
+    for g, matrix in _expected(y_t, y_p, gid, int_weights, labels).items():
+        assert np.array_equal(result.by_group[g], matrix)
+
+
+def test_string_labels():
+    names = np.array(['cat', 'dog', 'eel', 'fox', 'gnu', 'hen', 'owl'])
+    result = metrics.group_confusion_matrix(names[y_t], names[y_p], gid)
+
+    for g, matrix in _expected(names[y_t], names[y_p], gid).items():
+        assert np.array_equal(result.by_group[g], matrix)
+
+# ===========================================================
+
+
+# Group 'b' never has the label 2
+y_t_missing = np.array([0, 1, 2, 0, 1, 1, 0, 1])
+y_p_missing = np.array([0, 2, 2, 1, 1, 0, 0, 0])
+g_missing = np.array(['a', 'a', 'a', 'a', 'b', 'b', 'b', 'b'])
+
+
+def test_group_missing_label_matches_sklearn():
+    result = metrics.group_confusion_matrix(y_t_missing, y_p_missing, g_missing)
+
+    assert result.overall.shape == (3, 3)
+    assert result.by_group['a'].shape == (3, 3)
+    assert result.by_group['b'].shape == (2, 2)
+    for g, matrix in _expected(y_t_missing, y_p_missing, g_missing).items():
+        assert np.array_equal(result.by_group[g], matrix)
+
+
+def test_group_missing_label_dense():
+    result = metrics.group_confusion_matrix(y_t_missing, y_p_missing, g_missing, dense=True)
+
+    tensor = result.to_numpy()
+    assert tensor.shape == (2, 3, 3)
+    expected = _expected(y_t_missing, y_p_missing, g_missing, labels=[0, 1, 2])
+    assert np.array_equal(tensor[0], expected['a'])
+    assert np.array_equal(tensor[1], expected['b'])
+    assert np.array_equal(tensor[1, 2, :], [0, 0, 0])
+    assert np.array_equal(result.overall, tensor.sum(axis=0))
+
+
+def test_labels_absent_from_group_y_true():
+    # Group 'b' has none of the labels in its y_true, for which sklearn raises
+    with pytest.raises(ValueError):
+        metrics.group_confusion_matrix(y_t_missing, y_p_missing, g_missing, labels=[2])
+
+    result = metrics.group_confusion_matrix(y_t_missing, y_p_missing, g_missing,
+                                            labels=[2], dense=True)
+    assert np.array_equal(result.to_numpy(), [[[1]], [[0]]])
+
+
+def test_categorical_groups():
+    groups = pd.Series(gid, dtype='category')
+    result = metrics.group_confusion_matrix(y_t, y_p, groups, dense=True)
+
+    for g, matrix in _expected(y_t, y_p, gid).items():
+        assert np.array_equal(result.by_group[g], matrix)
+
+
+def test_tensor_sums_to_overall():
+    partition, tensor = _confusion_matrix_tensor(y_t, y_p, gid, sample_weight=float_weights)
+
+    assert tensor.shape == (partition.n_groups, n_classes, n_classes)
+    assert tensor.sum(axis=0) == pytest.approx(
+        skm.confusion_matrix(y_t, y_p, sample_weight=float_weights))
+    assert tensor.sum() == pytest.approx(float_weights.sum())
+
+
+def test_tensor_not_one_dimensional():
+    assert _confusion_matrix_tensor(y_t.reshape(-1, 1), y_p.reshape(-1, 1), gid) is None
@@ -0,0 +1,134 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import itertools
+
+import numpy as np
+import pytest
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._disparities import _largest_disparities
+from fairlearn.metrics._disparities import _MESSAGE_BAD_K, _MESSAGE_BAD_METHOD
+from fairlearn.metrics._disparities import _MESSAGE_NEGATIVE_RATIO, _MESSAGE_NOT_SCALAR
+from fairlearn.metrics._metrics_engine import _make_group_metric_result
+
+
+def _result(values, overall=0.5):
+    return _make_group_metric_result(overall, np.array(['g{0}'.format(i)
+                                                        for i in range(len(values))]),
+                                     np.asarray(values, dtype=float))
+
+
+def _all_disparities(values, method):
+    disparities = []
+    for i, j in itertools.combinations(range(len(values)), 2):
+        if np.isnan(values[i]) or np.isnan(values[j]):
+            continue
+        low, high = sorted((values[i], values[j]))
+        if method == 'difference':
+            disparities.append(high - low)
+        else:
+            disparities.append(1.0 if high == 0 else low / high)
+    return sorted(disparities, reverse=(method == 'difference'))
+
+# ===========================================================
+
+
+def test_pairwise_matrices():
+    result = metrics.group_selection_rate([0] * 8, [1, 0, 1, 1, 0, 0, 1, 1],
+                                          ['a', 'a', 'b', 'b', 'c', 'c', 'd', 'd'])
+
+    assert list(result.groups) == ['a', 'b', 'c', 'd']
+    differences = result.pairwise_disparities()
+    assert differences.shape == (4, 4)
+    assert differences[1, 2] == 1
+    assert differences[0, 1] == -0.5
+    assert np.array_equal(differences, -differences.T)
+
+    ratios = result.pairwise_disparities(method='ratio')
+    assert ratios[0, 1] == 0.5
+    assert ratios[1, 0] == 2
+    assert np.isinf(ratios[0, 2])
+
+    assert result.disparities_to_overall() == pytest.approx([-0.125, 0.375, -0.625, 0.375])
+    assert result.disparities_to_overall('ratio') == pytest.approx([0.8, 1.6, 0, 1.6])
+
+
+def test_largest_disparity_is_range():
+    rng = np.random.RandomState(3)
+    result = metrics.group_accuracy_score(rng.randint(2, size=500), rng.randint(2, size=500),
+                                          rng.randint(12, size=500))
+
+    higher, lower, difference = result.largest_disparities()[0]
+    assert difference == result.range
+    assert higher in result.argmax_set
+    assert lower in result.argmin_set
+    assert result.largest_disparities(method='ratio')[0][2] == result.range_ratio
+
+
+@pytest.mark.parametrize("method", ['difference', 'ratio'])
+@pytest.mark.parametrize("k", [1, 5, 17, 100])
+def test_largest_disparities_match_all_pairs(method, k):
+    rng = np.random.RandomState(k)
+    values = np.round(rng.rand(25), 1)
+    values[[3, 9]] = np.nan
+    values[[4, 5]] = 0
+    result = _result(values)
+
+    pairs = result.largest_disparities(k=k, method=method)
+    expected = _all_disparities(values, method)[:k]
+    assert [d for _, _, d in pairs] == pytest.approx(expected)
+
+    lookup = dict(zip(result.groups, values))
+    seen = set()
+    for higher, lower, disparity in pairs:
+        assert lookup[higher] >= lookup[lower]
+        assert frozenset((higher, lower)) not in seen
+        seen.add(frozenset((higher, lower)))
+
+
+def test_largest_disparities_positions():
+    pairs = _largest_disparities(np.array([0.4, 0.9, 0.1]), 3, 'difference')
+
+    assert [(h, lo) for h, lo, _ in pairs] == [(1, 2), (1, 0), (0, 2)]
+    assert [d for _, _, d in pairs] == pytest.approx([0.8, 0.5, 0.3])
+
+
+def test_largest_disparities_few_groups():
+    assert _result([0.3]).largest_disparities(k=3) == []
+    assert _result([np.nan, 0.2, np.nan]).largest_disparities() == []
+
+# ===========================================================
+
+
+def test_not_scalar():
+    result = metrics.group_confusion_matrix([0, 1, 1, 0], [0, 1, 0, 0], ['a', 'a', 'b', 'b'])
+
+    with pytest.raises(ValueError) as exception_context:
+        result.pairwise_disparities()
+    assert exception_context.value.args[0] == _MESSAGE_NOT_SCALAR
+    with pytest.raises(ValueError) as exception_context:
+        result.largest_disparities()
+    assert exception_context.value.args[0] == _MESSAGE_NOT_SCALAR
+
+
+def test_bad_method():
+    with pytest.raises(ValueError) as exception_context:
+        _result([0.1, 0.2]).pairwise_disparities(method='product')
+    assert exception_context.value.args[0] == _MESSAGE_BAD_METHOD
+    with pytest.raises(ValueError) as exception_context:
+        _result([0.1, 0.2]).largest_disparities(method='product')
+    assert exception_context.value.args[0] == _MESSAGE_BAD_METHOD
+
+
+@pytest.mark.parametrize("k", [0, -1, 1.5, True])
+def test_bad_k(k):
+    with pytest.raises(ValueError) as exception_context:
+        _result([0.1, 0.2]).largest_disparities(k=k)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_K
+
+
+def test_negative_ratio():
+    with pytest.raises(ValueError) as exception_context:
+        _result([-0.1, 0.2]).largest_disparities(method='ratio')
+    assert exception_context.value.args[0] == _MESSAGE_NEGATIVE_RATIO
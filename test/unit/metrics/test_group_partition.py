@@ -0,0 +1,203 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairlearn.metrics import _group_partition
+from fairlearn.metrics._group_partition import GroupPartition
+
+
+def test_partition_integer_groups():
+    gid = [2, 0, 2, 1, 0, 2]
+
+    partition = GroupPartition(gid)
+
+    assert len(partition) == 6
+    assert partition.n_groups == 3
+    assert np.array_equal(partition.groups, [0, 1, 2])
+    assert np.array_equal(partition.codes, [2, 0, 2, 1, 0, 2])
+    assert np.array_equal(partition.counts, [2, 1, 3])
+    assert np.array_equal(partition.offsets, [0, 2, 3, 6])
+    assert np.array_equal(partition.indices(0), [1, 4])
+    assert np.array_equal(partition.indices(1), [3])
+    assert np.array_equal(partition.indices(2), [0, 2, 5])
+
+
+@pytest.mark.parametrize("transform", [list, np.asarray, pd.Series])
+def test_partition_string_groups(transform):
+    gid = transform(["b", "a", "c", "a", "b", "b", "c"])
+
+    partition = GroupPartition(gid)
+
+    assert np.array_equal(partition.groups, ["a", "b", "c"])
+    assert np.array_equal(partition.counts, [2, 3, 2])
+    for i, group in enumerate(partition.groups):
+        expected = np.flatnonzero(np.asarray(gid) == group)
+        assert np.array_equal(partition.indices(i), expected)
+
+
+def test_partition_column_vector():
+    gid = np.asarray([[1], [0], [1], [1]])
+
+    partition = GroupPartition(gid)
+
+    assert np.array_equal(partition.codes, [1, 0, 1, 1])
+    assert np.array_equal(partition.indices(1), [0, 2, 3])
+
+
+def test_partition_matches_masks_many_groups():
+    rng = np.random.RandomState(7)
+    gid = rng.randint(0, 200, size=5000)
+
+    partition = GroupPartition(gid)
+
+    assert partition.offsets[-1] == len(gid)
+    for i, group in enumerate(partition.groups):
+        assert np.array_equal(partition.indices(i), np.flatnonzero(gid == group))
+
+
+# ===========================================================
+
+
+def test_partition_multiple_columns():
+    race = ["x", "y", "x", "y", "x", "z"]
+    sex = [1, 0, 0, 0, 1, 1]
+
+    partition = GroupPartition(np.stack([race, sex], axis=1))
+
+    assert list(partition.groups) == [("x", "0"), ("x", "1"), ("y", "0"), ("z", "1")]
+    assert np.array_equal(partition.codes, [1, 2, 0, 2, 1, 3])
+    assert np.array_equal(partition.counts, [1, 2, 2, 1])
+
+
+def test_partition_dataframe_columns_keep_dtypes():
+    df = pd.DataFrame({"race": ["x", "y", "x", "y", "x", "z"],
+                       "sex": [1, 0, 0, 0, 1, 1]})
+
+    partition = GroupPartition(df)
+
+    assert list(partition.groups) == [("x", 0), ("x", 1), ("y", 0), ("z", 1)]
+    for i, (race, sex) in enumerate(partition.groups):
+        expected = np.flatnonzero((df["race"] == race) & (df["sex"] == sex))
+        assert np.array_equal(partition.indices(i), expected)
+
+
+@pytest.mark.parametrize("max_key", [2 ** 62, 16])
+def test_partition_many_columns_matches_tuples(max_key, monkeypatch):
+    monkeypatch.setattr("fairlearn.metrics._group_partition._MAX_KEY", max_key)
+    rng = np.random.RandomState(11)
+    columns = [rng.randint(0, n, size=2000) for n in [3, 50, 7, 1000]]
+
+    partition = GroupPartition(np.stack(columns, axis=1))
+
+    tuples = list(zip(*[c.tolist() for c in columns]))
+    assert list(partition.groups) == sorted(set(tuples))
+    for i, group in enumerate(tuples):
+        assert partition.groups[partition.codes[i]] == group
+
+
+# ===========================================================
+
+
+def _check_matches_unique(partition, gid):
+    gid = np.asarray(gid)
+    expected_groups, expected_codes = np.unique(gid, return_inverse=True)
+    assert np.array_equal(partition.groups, expected_groups)
+    assert np.array_equal(partition.codes, expected_codes.reshape(-1))
+
+
+@pytest.mark.parametrize("transform", [pd.Categorical, lambda x: pd.Series(x, dtype="category")])
+def test_partition_categorical_uses_codes(transform):
+    values = ["c", "a", "b", "c", "a", "c"]
+    # The categories are in neither sorted order nor all used
+    gid = transform(pd.Categorical(values, categories=["c", "z", "b", "a"]))
+
+    partition = GroupPartition(gid)
+
+    assert list(partition.groups) == ["a", "b", "c"]
+    assert np.array_equal(partition.codes, [2, 0, 1, 2, 0, 2])
+    assert np.array_equal(partition.counts, [2, 1, 2 + 1])
+
+
+def test_partition_categorical_with_missing_values():
+    gid = pd.Categorical([1.0, 2.0, None, 1.0])
+
+    # Falls back to factorizing the values, as for other arrays
+    partition = GroupPartition(gid)
+
+    assert np.array_equal(partition.groups[:2], [1.0, 2.0])
+    assert np.isnan(partition.groups[2])
+    assert np.array_equal(partition.codes, [0, 1, 2, 0])
+
+
+def test_partition_categorical_dataframe_columns():
+    df = pd.DataFrame({"a": pd.Categorical(["x", "y", "x"], categories=["y", "x", "w"]),
+                       "b": [2, 2, 1]})
+
+    partition = GroupPartition(df)
+
+    assert list(partition.groups) == [("x", 1), ("x", 2), ("y", 2)]
+    assert np.array_equal(partition.codes, [1, 2, 0])
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int32, np.uint16, np.int64, np.uint64])
+def test_partition_integer_codes(dtype):
+    rng = np.random.RandomState(5)
+    gid = rng.randint(0, 100, size=1000).astype(dtype)
+
+    partition = GroupPartition(gid)
+
+    _check_matches_unique(partition, gid)
+    assert partition.groups.dtype == gid.dtype
+
+
+def test_partition_integer_negative_and_sparse():
+    gid = np.asarray([-120, 100, 5, -120, 5, 10 ** 12], dtype=np.int64)
+
+    partition = GroupPartition(gid)
+
+    _check_matches_unique(partition, gid)
+
+
+def test_partition_int8_wide_range():
+    gid = np.asarray([-128, 127, 0, 127], dtype=np.int8)
+
+    partition = GroupPartition(gid)
+
+    _check_matches_unique(partition, gid)
+
+
+def test_partition_boolean():
+    gid = np.asarray([True, False, True, True])
+
+    partition = GroupPartition(gid)
+
+    _check_matches_unique(partition, gid)
+    assert partition.groups.dtype == bool
+
+
+@pytest.mark.parametrize("gid", [np.array(['b', 'a', 'c', 'a', 'b', 'd', 'a'] * 5),
+                                 np.array([0.5, np.nan, 2.0, 0.5, -1.0, np.nan, 7.0] * 5),
+                                 np.array([3, 10 ** 12, 3, -5, 10 ** 12, 8, 3] * 5),
+                                 np.array([7, 5, 9, 5, 7, 7, 6] * 5, dtype=np.uint16),
+                                 np.array([True, False, False, True, True, False, True] * 5)])
+def test_partition_in_chunks(gid, monkeypatch):
+    monkeypatch.setattr(_group_partition, '_CHUNK_SIZE', 4)
+
+    partition = GroupPartition(gid)
+
+    expected_groups, expected_codes = np.unique(gid, return_inverse=True)
+    assert np.array_equal(partition.groups, expected_groups, equal_nan=gid.dtype.kind == 'f')
+    assert np.array_equal(partition.codes, expected_codes.reshape(-1))
+
+
+def test_partition_memmap(tmp_path):
+    gid = np.random.RandomState(0).randint(-3, 40, size=5000)
+    path = str(tmp_path / "groups.npy")
+    np.save(path, gid)
+
+    partition = GroupPartition(np.load(path, mmap_mode='r'))
+
+    _check_matches_unique(partition, gid)
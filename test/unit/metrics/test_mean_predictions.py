@@ -1,6 +1,9 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License.
 
+import numpy as np
+import pytest
+
 import fairlearn.metrics as metrics
 
 
@@ -59,3 +62,43 @@ def test_mean_underprediction_weighted():
     result = metrics.mean_underprediction(y_true, y_pred, weight)
 
     assert result == 0.5
+
+
+# ======================================================================
+
+group_mean_metrics = [(metrics.mean_prediction, metrics.group_mean_prediction),
+                      (metrics.mean_overprediction, metrics.group_mean_overprediction),
+                      (metrics.mean_underprediction, metrics.group_mean_underprediction)]
+
+
+@pytest.mark.parametrize("func_tuple", group_mean_metrics)
+@pytest.mark.parametrize("use_weights", [False, True])
+def test_group_means_match_metric_by_group(func_tuple, use_weights):
+    rng = np.random.RandomState(13)
+    y_true = rng.rand(1000)
+    y_pred = rng.randint(0, 3, size=1000)
+    groups = rng.randint(0, 40, size=1000)
+    weight = rng.rand(1000) if use_weights else None
+    metric_func, group_metric_func = func_tuple
+
+    result = group_metric_func(y_true, y_pred, groups, sample_weight=weight)
+    expected = metrics.metric_by_group(metric_func, y_true, y_pred, groups,
+                                       sample_weight=weight)
+
+    assert result.overall == expected.overall
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+    assert result.range == pytest.approx(expected.range)
+
+
+def test_mean_overprediction_does_not_modify_inputs():
+    y_pred = np.asarray([0.0, 1.0, 2.0, 3.0, 4.0])
+    y_true = np.asarray([1.0, 1.0, 5.0, 0.0, 2.0])
+
+    _ = metrics.mean_overprediction(y_true, y_pred)
+    _ = metrics.group_mean_underprediction(y_true, y_pred, [0, 0, 1, 1, 1],
+                                           sample_weight=[1, 2, 3, 4, 5])
+
+    assert list(y_pred) == [0, 1, 2, 3, 4]
+    assert list(y_true) == [1, 1, 5, 0, 2]
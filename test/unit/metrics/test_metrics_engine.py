@@ -4,8 +4,10 @@
 import numpy as np
 import pandas as pd
 import pytest
+import sklearn.metrics as skm
 
 import fairlearn.metrics as metrics
+from fairlearn.metrics._metrics_engine import _is_frequency_weighted
 
 # ===========================================================
 
@@ -276,3 +278,337 @@ class TestMakeGroupMetric:
         assert result.argmax_set == {c}
         assert result.range == 20
         assert result.range_ratio == pytest.approx(1.0/21.0)
+
+
+class TestParallelMetricByGroup:
+    @pytest.mark.parametrize("n_jobs", [1, 2, -1])
+    def test_matches_serial(self, n_jobs):
+        rng = np.random.RandomState(5)
+        y_a = rng.randint(0, 2, size=200)
+        y_p = rng.rand(200)
+        gid = rng.randint(0, 9, size=200)
+        s_w = rng.rand(200)
+
+        expected = metrics.metric_by_group(mock_func_weight, y_a, y_p, gid, s_w)
+        result = metrics.metric_by_group(mock_func_weight, y_a, y_p, gid, s_w, n_jobs=n_jobs)
+
+        assert result.overall == expected.overall
+        assert list(result.by_group.keys()) == list(expected.by_group.keys())
+        for group in expected.by_group:
+            assert result.by_group[group] == expected.by_group[group]
+        assert result.argmin_set == expected.argmin_set
+        assert result.argmax_set == expected.argmax_set
+
+    def test_make_group_metric_n_jobs(self):
+        a = "ABC"
+        b = "DEF"
+        c = "GHI"
+        y_a = [0, 0, 1, 1, 0, 1, 1, 1]
+        y_p = [0, 1, 1, 1, 1, 0, 0, 1]
+        gid = [a, a, a, b, b, c, c, c]
+
+        grouped_metric_func = metrics.make_group_metric(mock_func)
+        result = grouped_metric_func(y_a, y_p, gid, n_jobs=2)
+
+        assert result.overall == 5
+        assert result.by_group[a] == 1
+        assert result.by_group[b] == 1
+        assert result.by_group[c] == 3
+
+
+# ======================================================================
+
+
+class TestIntersectionalGroups:
+    def test_dataframe_groups(self):
+        y_t = [0, 1, 1, 0, 1, 1, 0, 1]
+        y_p = [1, 1, 0, 0, 1, 1, 1, 0]
+        groups = pd.DataFrame({"race": ["a", "b", "a", "a", "b", "c", "c", "a"],
+                               "sex": ["f", "m", "m", "f", "m", "f", "f", "f"]})
+
+        result = metrics.metric_by_group(mock_func, y_t, y_p, groups)
+
+        assert list(result.by_group.keys()) == [("a", "f"), ("a", "m"), ("b", "m"), ("c", "f")]
+        for (race, sex), value in result.by_group.items():
+            mask = ((groups["race"] == race) & (groups["sex"] == sex)).to_numpy()
+            assert value == mock_func(np.asarray(y_t)[mask], np.asarray(y_p)[mask])
+        assert result.overall == mock_func(y_t, y_p)
+
+    def test_matches_concatenated_strings(self):
+        rng = np.random.RandomState(3)
+        y_t = rng.randint(0, 2, size=500)
+        y_p = rng.randint(0, 2, size=500)
+        weight = rng.rand(500)
+        race = rng.choice(["a", "b", "c"], size=500)
+        age = rng.randint(0, 4, size=500)
+
+        result = metrics.group_recall_score(y_t, y_p, np.stack([race, age], axis=1),
+                                            sample_weight=weight)
+        expected = metrics.group_recall_score(y_t, y_p,
+                                              np.char.add(np.char.add(race, "|"),
+                                                          age.astype(str)),
+                                              sample_weight=weight)
+
+        assert len(result.by_group) == len(expected.by_group)
+        for (r, a), value in result.by_group.items():
+            assert value == pytest.approx(expected.by_group["{0}|{1}".format(r, a)])
+        assert result.range == pytest.approx(expected.range)
+
+
+# ======================================================================
+
+
+y_t = [0, 1, 1, 0, 1, 1, 0, 1, 1, 0]
+y_p = [1, 1, 0, 0, 1, 1, 1, 0, 1, 1]
+gid = [2, 0, 1, 1, 2, 0, 0, 1, 2, 2]
+
+
+class TestGroupMetricResultArrays:
+    def test_arrays_match_by_group(self):
+        result = metrics.metric_by_group(mock_func, y_t, y_p, gid)
+
+        assert list(result.groups) == list(result.by_group.keys())
+        assert list(result.to_numpy()) == list(result.by_group.values())
+
+    def test_to_numpy_is_not_a_copy(self):
+        result = metrics.metric_by_group(mock_func, y_t, y_p, gid)
+
+        _ = result.by_group
+        assert result.to_numpy() is result.to_numpy()
+
+    def test_to_frame(self):
+        result = metrics.metric_by_group(mock_func, y_t, y_p, gid)
+
+        frame = result.to_frame(name='mock')
+
+        assert list(frame.columns) == ['mock']
+        assert list(frame.index) == list(result.by_group.keys())
+        assert list(frame['mock']) == list(result.by_group.values())
+
+    def test_to_frame_intersectional(self):
+        groups_2d = pd.DataFrame({'g': gid, 'h': np.arange(len(gid)) % 2})
+
+        result = metrics.metric_by_group(mock_func, y_t, y_p, groups_2d)
+        frame = result.to_frame()
+
+        assert isinstance(frame.index, pd.MultiIndex)
+        assert list(frame.index) == list(result.by_group.keys())
+
+    def test_modifying_by_group_updates_arrays(self):
+        result = metrics.metric_by_group(mock_func, y_t, y_p, gid)
+
+        result.by_group['new'] = 100
+        assert result.groups[-1] == 'new'
+        assert result.to_numpy()[-1] == 100
+
+        result.by_group = {'x': 1, 'y': 2}
+        assert list(result.groups) == ['x', 'y']
+        assert list(result.to_numpy()) == [1, 2]
+
+    def test_empty_result(self):
+        result = metrics.GroupMetricResult()
+
+        assert result.by_group == {}
+        assert len(result.to_numpy()) == 0
+
+        result.by_group[0] = 0.5
+        assert list(result.to_numpy()) == [0.5]
+
+    @pytest.mark.parametrize("nan_group", [0, 2])
+    def test_summaries_with_nan(self, nan_group):
+        def nan_for_one_group(y_true, y_pred, sample_weight=None):
+            if np.all(np.asarray(y_true) == -1):
+                return np.nan
+            return float(np.sum(y_true))
+
+        y_true = [1, 2, 4, 3]
+        y_true[nan_group] = -1
+        result = metrics.metric_by_group(nan_for_one_group, y_true, [0, 0, 0, 0],
+                                         [0, 1, 2, 3])
+
+        # The NaN value is compared as by min and max, so it is only the
+        # minimum and maximum when it is the first group
+        if nan_group == 0:
+            assert np.isnan(result.minimum)
+            assert np.isnan(result.maximum)
+            assert np.isnan(result.range)
+            assert np.isnan(result.range_ratio)
+            assert result.argmin_set == set()
+            assert result.argmax_set == set()
+        else:
+            assert result.minimum == 1
+            assert result.maximum == 3
+            assert result.argmin_set == {0}
+            assert result.argmax_set == {3}
+            assert result.range == 2
+            assert result.range_ratio == pytest.approx(1 / 3)
+
+    def test_array_values(self):
+        def sums(y_true, y_pred):
+            return np.array([np.sum(y_true), np.sum(y_pred)])
+
+        result = metrics.metric_by_group(sums, y_t, y_p, gid)
+
+        assert result.to_numpy().shape == (3, 2)
+        assert np.array_equal(result.by_group[1], [2, 0])
+        assert result.minimum is None
+        assert result.to_frame()['value'][1].tolist() == [2, 0]
+
+    def test_ragged_array_values(self):
+        result = metrics.metric_by_group(mock_func_matrix_return, y_t, y_p, gid)
+
+        assert result.to_numpy().shape == (3,)
+        assert result.by_group[0].shape == (3, 3)
+
+    def test_has_slots(self):
+        result = metrics.GroupMetricResult()
+
+        with pytest.raises(AttributeError):
+            result.unknown_attribute = 1
+
+
+def test_categorical_group_membership():
+    y_true = [0, 1, 1, 0, 1, 1]
+    y_pred = [1, 1, 0, 0, 1, 0]
+    gid = pd.Series(["q", "p", "q", "r", "p", "q"], dtype="category")
+
+    result = metrics.metric_by_group(mock_func, y_true, y_pred, gid)
+    expected = metrics.metric_by_group(mock_func, y_true, y_pred, np.asarray(gid, dtype=object))
+
+    assert result.by_group == expected.by_group
+    assert list(result.by_group.keys()) == ["p", "q", "r"]
+
+# ===========================================================
+
+
+def median_error(y_true, y_pred):
+    return np.median(np.abs(y_true - y_pred))
+
+
+class TestAggregatedCounts:
+    # The unique rows of some data, along with the number of times each occurs
+    y_true = np.array([0, 1, 1, 0, 1, 0, 1, 0, 2])
+    y_pred = np.array([0, 1, 0, 1, 1, 0, 0, 0, 2])
+    gid = np.array(['a', 'a', 'a', 'b', 'b', 'b', 'c', 'c', 'd'])
+    counts = np.array([3, 1, 2, 5, 2, 0, 4, 1, 0])
+
+    def repeated(self, *arrays):
+        return [np.repeat(a, self.counts) for a in arrays]
+
+    @pytest.mark.parametrize("metric_function", [mock_func, median_error])
+    def test_matches_repeated_rows(self, metric_function):
+        result = metrics.metric_by_group(metric_function, self.y_true, self.y_pred, self.gid,
+                                         counts=self.counts)
+        expected = metrics.metric_by_group(metric_function,
+                                           *self.repeated(self.y_true, self.y_pred, self.gid))
+
+        assert result.overall == expected.overall
+        # Group 'd' only has rows which occur zero times
+        assert result.by_group == expected.by_group
+        assert list(result.groups) == ['a', 'b', 'c']
+
+    def test_frequency_weighted_metric(self):
+        weight = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9])
+        result = metrics.metric_by_group(skm.accuracy_score, self.y_true, self.y_pred, self.gid,
+                                         sample_weight=weight, counts=self.counts)
+        expected = metrics.metric_by_group(skm.accuracy_score,
+                                           *self.repeated(self.y_true, self.y_pred, self.gid),
+                                           sample_weight=np.repeat(weight, self.counts))
+
+        assert result.overall == pytest.approx(expected.overall)
+        for g in expected.by_group:
+            assert result.by_group[g] == pytest.approx(expected.by_group[g])
+
+    @pytest.mark.parametrize("metric_function", [skm.roc_auc_score,
+                                                 metrics.specificity_score,
+                                                 metrics.mean_prediction,
+                                                 metrics.balanced_root_mean_squared_error])
+    def test_is_frequency_weighted(self, metric_function):
+        assert _is_frequency_weighted(metric_function)
+
+    @pytest.mark.parametrize("metric_function", [skm.median_absolute_error, mock_func])
+    def test_is_not_frequency_weighted(self, metric_function):
+        assert not _is_frequency_weighted(metric_function)
+
+    def test_make_group_metric(self):
+        group_mae = metrics.make_group_metric(skm.median_absolute_error)
+
+        result = group_mae(self.y_true, self.y_pred, self.gid, counts=self.counts)
+        expected = group_mae(*self.repeated(self.y_true, self.y_pred, self.gid))
+
+        assert result.overall == expected.overall
+        assert result.by_group == expected.by_group
+
+    def test_dataframe_groups(self):
+        gid = pd.DataFrame({'f1': self.gid, 'f2': [0, 1, 0, 0, 1, 1, 0, 0, 1]})
+        result = metrics.metric_by_group(mock_func, self.y_true, self.y_pred, gid,
+                                         counts=self.counts)
+
+        assert result.by_group[('a', 0)] == 2
+        assert ('d', 1) not in result.by_group
+
+    @pytest.mark.parametrize("counts", [[1, 2, -1, 1, 1, 1, 1, 1, 1],
+                                        [1, 2, 0.5, 1, 1, 1, 1, 1, 1],
+                                        ['x'] * 9])
+    def test_bad_counts(self, counts):
+        with pytest.raises(ValueError) as exception_context:
+            metrics.metric_by_group(mock_func, self.y_true, self.y_pred, self.gid,
+                                    counts=counts)
+        assert exception_context.value.args[0] == "counts must be non-negative integers"
+
+    def test_counts_size_mismatch(self):
+        with pytest.raises(ValueError) as exception_context:
+            metrics.metric_by_group(mock_func, self.y_true, self.y_pred, self.gid,
+                                    counts=self.counts[:-1])
+        assert exception_context.value.args[0] == "Array counts is not the same size as y_true"
+
+    @pytest.mark.parametrize("group_metric_function",
+                             [metrics.group_accuracy_score,
+                              metrics.group_zero_one_loss,
+                              metrics.group_confusion_matrix,
+                              metrics.group_precision_score,
+                              metrics.group_recall_score,
+                              metrics.group_roc_auc_score,
+                              metrics.group_specificity_score,
+                              metrics.group_miss_rate,
+                              metrics.group_fallout_rate,
+                              metrics.group_selection_rate,
+                              metrics.group_mean_prediction,
+                              metrics.group_mean_overprediction,
+                              metrics.group_mean_underprediction,
+                              metrics.group_mean_squared_error,
+                              metrics.group_mean_absolute_error,
+                              metrics.group_balanced_root_mean_squared_error,
+                              metrics.group_max_error,
+                              metrics.group_median_absolute_error])
+    def test_built_in_metrics(self, group_metric_function):
+        # Binary data, so that every metric is defined
+        keep = self.y_true < 2
+        y_true, y_pred, gid, counts = (self.y_true[keep], self.y_pred[keep], self.gid[keep],
+                                       self.counts[keep])
+
+        result = group_metric_function(y_true, y_pred, gid, counts=counts)
+        expected = group_metric_function(*[np.repeat(a, counts) for a in (y_true, y_pred, gid)])
+
+        assert np.asarray(result.overall) == pytest.approx(np.asarray(expected.overall))
+        assert list(result.groups) == list(expected.groups)
+        assert result.to_numpy() == pytest.approx(expected.to_numpy())
+
+
+def test_memmap_inputs(tmp_path):
+    rng = np.random.RandomState(9)
+    arrays = {'y_true': rng.randint(2, size=2000), 'y_pred': rng.randint(2, size=2000),
+              'gid': rng.choice(['a', 'b', 'c'], size=2000), 'weight': rng.rand(2000)}
+    mapped = {}
+    for name, array in arrays.items():
+        path = str(tmp_path / (name + ".npy"))
+        np.save(path, array)
+        mapped[name] = np.load(path, mmap_mode='r')
+
+    result = metrics.metric_by_group(skm.recall_score, mapped['y_true'], mapped['y_pred'],
+                                     mapped['gid'], sample_weight=mapped['weight'])
+    expected = metrics.metric_by_group(skm.recall_score, arrays['y_true'], arrays['y_pred'],
+                                       arrays['gid'], sample_weight=arrays['weight'])
+
+    assert result.overall == expected.overall
+    assert result.by_group == expected.by_group
@@ -0,0 +1,101 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+
+from .test_utilities import assert_results_equal
+from .test_utilities import Y_true, Y_pred, Y_pred_reg, groups, weight
+
+# ===========================================================
+
+metric_functions = {
+    "accuracy": skm.accuracy_score,
+    "zero_one": skm.zero_one_loss,
+    "precision": skm.precision_score,
+    "recall": skm.recall_score,
+    "specificity": metrics.specificity_score,
+    "miss": metrics.miss_rate,
+    "fallout": metrics.fallout_rate,
+    "selection": metrics.selection_rate,
+    "mse": skm.mean_squared_error,
+    "mean_prediction": metrics.mean_prediction
+}
+
+# ===========================================================
+
+
+def test_matches_metric_by_group():
+    results = metrics.metrics_by_group(metric_functions, Y_true, Y_pred, groups)
+
+    assert list(results.keys()) == list(metric_functions.keys())
+    for name, metric_function in metric_functions.items():
+        expected = metrics.metric_by_group(metric_function, Y_true, Y_pred, groups)
+        assert_results_equal(results[name], expected)
+
+
+def test_matches_metric_by_group_weighted():
+    results = metrics.metrics_by_group(metric_functions, Y_true, Y_pred, groups,
+                                       sample_weight=weight)
+
+    for name, metric_function in metric_functions.items():
+        expected = metrics.metric_by_group(metric_function, Y_true, Y_pred, groups,
+                                           sample_weight=weight)
+        assert_results_equal(results[name], expected)
+
+
+def test_string_labels():
+    y_t = np.where(Y_true == 1, "b", "a")
+    y_p = np.where(Y_pred == 1, "b", "a")
+
+    def selected_b(y_true, y_pred):
+        return np.mean(y_pred == "b")
+
+    results = metrics.metrics_by_group({"accuracy": skm.accuracy_score,
+                                        "zero_one": skm.zero_one_loss,
+                                        "selected_b": selected_b},
+                                       y_t, y_p, groups)
+
+    for name, metric_function in [("accuracy", skm.accuracy_score),
+                                  ("zero_one", skm.zero_one_loss),
+                                  ("selected_b", selected_b)]:
+        expected = metrics.metric_by_group(metric_function, y_t, y_p, groups)
+        assert_results_equal(results[name], expected)
+
+
+def test_labels_one_and_two():
+    # The positive label is 1 for precision and recall, while specificity
+    # takes the greater label to be positive, so is computed directly
+    label_functions = {"accuracy": skm.accuracy_score,
+                       "precision": skm.precision_score,
+                       "recall": skm.recall_score,
+                       "specificity": metrics.specificity_score}
+    results = metrics.metrics_by_group(label_functions, Y_true + 1, Y_pred + 1, groups)
+
+    for name, metric_function in label_functions.items():
+        expected = metrics.metric_by_group(metric_function, Y_true + 1, Y_pred + 1, groups)
+        assert_results_equal(results[name], expected)
+
+
+def test_non_count_metrics():
+    results = metrics.metrics_by_group({"auc": skm.roc_auc_score,
+                                        "mae": skm.mean_absolute_error,
+                                        "brmse": metrics.balanced_root_mean_squared_error},
+                                       Y_true, Y_pred_reg, groups)
+
+    for name, metric_function in [("auc", skm.roc_auc_score),
+                                  ("mae", skm.mean_absolute_error),
+                                  ("brmse", metrics.balanced_root_mean_squared_error)]:
+        expected = metrics.metric_by_group(metric_function, Y_true, Y_pred_reg, groups)
+        assert_results_equal(results[name], expected)
+
+
+def test_size_mismatch():
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.metrics_by_group(metric_functions, Y_true, Y_pred[:-1], groups)
+
+    expected = "Array y_pred is not the same size as y_true"
+    assert exception_context.value.args[0] == expected
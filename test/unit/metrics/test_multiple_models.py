@@ -0,0 +1,106 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+
+from .test_utilities import assert_results_equal, n_samples
+from .test_utilities import Y_true, Y_pred, Y_pred_reg, groups, weight
+
+# ===========================================================
+
+rng = np.random.RandomState(17)
+n_models = 4
+
+# The shared predictions, followed by those of other models
+Y_preds = np.vstack([Y_pred, rng.randint(0, 2, size=(n_models - 1, n_samples))])
+Y_true_reg = rng.rand(n_samples)
+Y_preds_reg = np.vstack([Y_pred_reg, rng.rand(n_models - 1, n_samples)])
+
+classification_metrics = [skm.accuracy_score,
+                          skm.zero_one_loss,
+                          skm.precision_score,
+                          skm.recall_score,
+                          metrics.specificity_score,
+                          metrics.miss_rate,
+                          metrics.fallout_rate,
+                          metrics.selection_rate]
+
+regression_metrics_weighted = [skm.mean_squared_error,
+                               skm.mean_absolute_error,
+                               metrics.mean_prediction,
+                               metrics.mean_overprediction,
+                               metrics.mean_underprediction]
+
+regression_metrics = regression_metrics_weighted + [skm.median_absolute_error]
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("metric_function", classification_metrics)
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_classification(metric_function, s_w):
+    results = metrics.metric_by_group_for_models(metric_function, Y_true, Y_preds, groups,
+                                                 sample_weight=s_w)
+
+    assert len(results) == n_models
+    for y_pred, result in zip(Y_preds, results):
+        expected = metrics.metric_by_group(metric_function, Y_true, y_pred, groups,
+                                           sample_weight=s_w)
+        assert_results_equal(result, expected)
+
+
+@pytest.mark.parametrize("metric_function", regression_metrics)
+def test_regression(metric_function):
+    results = metrics.metric_by_group_for_models(metric_function,
+                                                 Y_true_reg, Y_preds_reg, groups)
+
+    assert len(results) == n_models
+    for y_pred, result in zip(Y_preds_reg, results):
+        expected = metrics.metric_by_group(metric_function, Y_true_reg, y_pred, groups)
+        assert_results_equal(result, expected)
+
+
+@pytest.mark.parametrize("metric_function", regression_metrics_weighted)
+def test_regression_weighted(metric_function):
+    results = metrics.metric_by_group_for_models(metric_function,
+                                                 Y_true_reg, Y_preds_reg, groups,
+                                                 sample_weight=weight)
+
+    for y_pred, result in zip(Y_preds_reg, results):
+        expected = metrics.metric_by_group(metric_function, Y_true_reg, y_pred, groups,
+                                           sample_weight=weight)
+        assert_results_equal(result, expected)
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_balanced_root_mean_squared_error(s_w):
+    results = metrics.metric_by_group_for_models(metrics.balanced_root_mean_squared_error,
+                                                 Y_true, Y_preds_reg, groups,
+                                                 sample_weight=s_w)
+
+    for y_pred, result in zip(Y_preds_reg, results):
+        expected = metrics.metric_by_group(metrics.balanced_root_mean_squared_error,
+                                           Y_true, y_pred, groups, sample_weight=s_w)
+        assert_results_equal(result, expected)
+
+
+def test_single_model():
+    results = metrics.metric_by_group_for_models(skm.accuracy_score,
+                                                 Y_true, list(Y_preds[0]), groups)
+
+    assert len(results) == 1
+    expected = metrics.group_accuracy_score(Y_true, Y_preds[0], groups)
+    assert_results_equal(results[0], expected)
+
+
+def test_prediction_size_mismatch():
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.metric_by_group_for_models(skm.accuracy_score,
+                                               Y_true, Y_preds[:, :-1], groups)
+
+    expected = "Array y_preds is not the same size as y_true"
+    assert exception_context.value.args[0] == expected
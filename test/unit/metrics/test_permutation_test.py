@@ -0,0 +1,139 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics import _permutation_test
+from fairlearn.metrics._group_partition import GroupPartition
+from fairlearn.metrics._permutation_test import _MESSAGE_BAD_N_PERMUTATIONS
+from fairlearn.metrics._permutation_test import _permuted_sums
+from fairlearn.metrics._sufficient_statistics import _METRIC_STATISTICS, _statistic_sums
+
+# ===========================================================
+
+rng = np.random.RandomState(43)
+n_samples = 600
+
+Y_true = rng.randint(0, 2, size=n_samples)
+Y_pred = rng.randint(0, 2, size=n_samples)
+Y_pred_reg = rng.rand(n_samples)
+groups = rng.choice(["a", "b", "c"], size=n_samples)
+weight = rng.rand(n_samples)
+# Predictions which depend strongly on the group
+Y_pred_biased = np.where(groups == "a", rng.rand(n_samples) < 0.8,
+                         rng.rand(n_samples) < 0.3).astype(int)
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("metric_function", [skm.recall_score, metrics.mean_prediction])
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_permuted_sums_match_statistic_sums(metric_function, s_w):
+    metric_statistics = _METRIC_STATISTICS[metric_function]
+    partition = GroupPartition(groups)
+    statistics = list(metric_statistics.statistics(Y_true, Y_pred_reg, 1))
+    if s_w is not None:
+        statistics = [statistic * s_w for statistic in statistics]
+    statistics.append(np.ones(n_samples) if s_w is None else s_w)
+    permutations = np.array([rng.permutation(n_samples) for _ in range(5)])
+
+    sums = _permuted_sums(statistics, partition.codes, partition.n_groups, permutations)
+
+    assert sums.shape == (5, partition.n_groups, len(statistics))
+    for i, permutation in enumerate(permutations):
+        expected = _statistic_sums(metric_statistics, Y_true, Y_pred_reg,
+                                   partition.codes[permutation], partition.n_groups,
+                                   sample_weight=s_w)
+        assert sums[i] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_point_estimates(s_w):
+    permutation_test = metrics.permutation_test_metric_by_group(
+        skm.precision_score, Y_true, Y_pred, groups, sample_weight=s_w,
+        n_permutations=50, random_state=0)
+
+    expected = metrics.group_precision_score(Y_true, Y_pred, groups, sample_weight=s_w)
+    assert permutation_test.result.overall == pytest.approx(expected.overall)
+    for group in expected.by_group:
+        assert permutation_test.result.by_group[group] == \
+            pytest.approx(expected.by_group[group])
+    assert permutation_test.n_permutations == 50
+
+
+def test_significant_disparity():
+    permutation_test = metrics.permutation_test_metric_by_group(
+        metrics.selection_rate, Y_true, Y_pred_biased, groups,
+        n_permutations=200, random_state=1)
+
+    # No permutation comes close to the real disparity
+    assert permutation_test.range_p_value == 1 / 201
+    assert permutation_test.range_ratio_p_value == 1 / 201
+
+
+def test_no_disparity():
+    # The groups are assigned at random, so the p-values are uniformly distributed
+    p_values = []
+    for seed in range(20):
+        random_groups = np.random.RandomState(seed).choice(["a", "b"], size=n_samples)
+        permutation_test = metrics.permutation_test_metric_by_group(
+            metrics.mean_prediction, Y_true, Y_pred_reg, random_groups,
+            n_permutations=100, random_state=seed)
+        assert 0 < permutation_test.range_p_value <= 1
+        p_values.append(permutation_test.range_p_value)
+    assert 0.2 < np.mean(p_values) < 0.8
+
+
+def test_identical_groups():
+    # No permutation can give a smaller disparity than the original data
+    permutation_test = metrics.permutation_test_metric_by_group(
+        skm.accuracy_score, [1, 1, 1, 1], [1, 0, 1, 0], ['x', 'x', 'y', 'y'],
+        n_permutations=10, random_state=2)
+
+    assert permutation_test.range_p_value == 1
+
+
+def test_blocks(monkeypatch):
+    expected = metrics.permutation_test_metric_by_group(
+        skm.recall_score, Y_true, Y_pred, groups, n_permutations=30, random_state=3)
+    # Force several permutations per block, and several blocks
+    monkeypatch.setattr(_permutation_test, '_MAX_BLOCK_ELEMENTS', 4 * n_samples)
+    result = metrics.permutation_test_metric_by_group(
+        skm.recall_score, Y_true, Y_pred, groups, n_permutations=30, random_state=3)
+
+    assert result.range_p_value == expected.range_p_value
+    assert result.range_ratio_p_value == expected.range_ratio_p_value
+
+
+def test_random_state_reproducible():
+    first = metrics.permutation_test_metric_by_group(
+        skm.accuracy_score, Y_true, Y_pred, groups, n_permutations=100, random_state=7)
+    second = metrics.permutation_test_metric_by_group(
+        skm.accuracy_score, Y_true, Y_pred, groups, n_permutations=100, random_state=7)
+
+    assert first.range_p_value == second.range_p_value
+    assert first.range_ratio_p_value == second.range_ratio_p_value
+
+# ===========================================================
+
+
+def test_unsupported_metric():
+    with pytest.raises(ValueError):
+        metrics.permutation_test_metric_by_group(skm.roc_auc_score, Y_true, Y_pred_reg, groups)
+
+
+@pytest.mark.parametrize("n_permutations", [0, 2.5])
+def test_bad_n_permutations(n_permutations):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.permutation_test_metric_by_group(skm.accuracy_score, Y_true, Y_pred, groups,
+                                                 n_permutations=n_permutations)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_N_PERMUTATIONS
+
+
+def test_not_binary():
+    with pytest.raises(ValueError):
+        metrics.permutation_test_metric_by_group(skm.precision_score, [0, 1, 2], [0, 1, 1],
+                                                 [0, 0, 1])
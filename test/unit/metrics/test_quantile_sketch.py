@@ -0,0 +1,165 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import pickle
+
+import numpy as np
+import pytest
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._quantile_sketch import _MESSAGE_BAD_QUANTILE, _MESSAGE_BAD_SKETCH_SIZE
+from fairlearn.metrics._quantile_sketch import _MESSAGE_MERGE_MISMATCH, _MESSAGE_NO_DATA
+from fairlearn.metrics._quantile_sketch import _MESSAGE_NOT_NUMERIC
+from fairlearn.metrics._segmented_metrics import _MESSAGE_SKETCH_WEIGHTS
+
+# ===========================================================
+
+rng = np.random.RandomState(29)
+n_samples = 30000
+sketch_size = 100
+
+Y_true = rng.rand(n_samples)
+Y_pred = rng.exponential(size=n_samples)
+groups = rng.choice(["a", "b", "c"], size=n_samples, p=[0.6, 0.3, 0.1])
+errors = np.abs(Y_true - Y_pred)
+
+quantiles = [0, 0.1, 0.5, 0.9, 0.99, 1]
+
+
+def _assert_within_bound(result, quantile):
+    """Checks that the ranks of the estimates are within the documented
+    bound of ``6 * n / k`` of the ranks of the requested quantiles
+    """
+    for group, estimate in [(None, result.overall)] + list(result.by_group.items()):
+        group_errors = np.sort(errors if group is None else errors[groups == group])
+        n = len(group_errors)
+        rank = np.searchsorted(group_errors, estimate)
+        assert abs(rank - quantile * (n - 1)) <= 6 * n / sketch_size + 1
+
+
+def _n_items(sketch):
+    return sum(len(items) for items in sketch._levels)
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("quantile", quantiles)
+def test_exact_quantiles(quantile):
+    result = metrics.group_quantile_absolute_error(Y_true, Y_pred, groups, quantile)
+
+    assert result.overall == pytest.approx(np.quantile(errors, quantile))
+    assert list(result.by_group.keys()) == ["a", "b", "c"]
+    for group in result.by_group:
+        expected = np.quantile(errors[groups == group], quantile)
+        assert result.by_group[group] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("quantile", quantiles)
+def test_small_groups_exact(quantile):
+    # Every group fits in its sketch, so nothing is compacted
+    small_groups = rng.randint(0, 200, size=n_samples)
+
+    result = metrics.group_quantile_absolute_error(Y_true, Y_pred, small_groups, quantile,
+                                                   sketch_size=1000)
+    expected = metrics.group_quantile_absolute_error(Y_true, Y_pred, small_groups, quantile)
+    for group in expected.by_group:
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+
+
+@pytest.mark.parametrize("quantile", quantiles)
+def test_error_bound(quantile):
+    sketch = metrics.GroupQuantileSketch(sketch_size, random_state=3)
+    for batch in np.array_split(np.arange(n_samples), 13):
+        sketch.update(Y_true[batch], Y_pred[batch], groups[batch])
+
+    _assert_within_bound(sketch.result(quantile), quantile)
+
+
+def test_memory_bound():
+    sketch = metrics.GroupQuantileSketch(sketch_size, random_state=5)
+    for batch in np.array_split(np.arange(n_samples), 50):
+        sketch.update(Y_true[batch], Y_pred[batch], groups[batch])
+
+    assert _n_items(sketch._overall) < sketch_size * (np.log2(n_samples / sketch_size) + 2)
+    for group, group_sketch in zip(sketch._groups, sketch._sketches):
+        n = np.count_nonzero(groups == group)
+        assert _n_items(group_sketch) < sketch_size * (np.log2(n / sketch_size) + 2)
+
+
+@pytest.mark.parametrize("quantile", [0.5, 0.9])
+def test_merge_shards(quantile):
+    shards = []
+    for i, batch in enumerate(np.array_split(np.arange(n_samples), 4)):
+        shard = metrics.GroupQuantileSketch(sketch_size, random_state=i)
+        shard.update(Y_true[batch], Y_pred[batch], groups[batch])
+        # As if the shard were sent from another process
+        shards.append(pickle.loads(pickle.dumps(shard)))
+
+    merged = metrics.GroupQuantileSketch(sketch_size, random_state=7)
+    for shard in shards:
+        merged.merge(shard)
+
+    assert merged.groups == ["a", "b", "c"]
+    _assert_within_bound(merged.result(quantile), quantile)
+
+
+def test_one_row_batches():
+    sketch = metrics.GroupQuantileSketch(sketch_size)
+    for i in range(5):
+        sketch.update([Y_true[i]], [Y_pred[i]], [groups[i]])
+
+    expected = metrics.group_quantile_absolute_error(Y_true[:5], Y_pred[:5], groups[:5])
+    assert sketch.result().overall == pytest.approx(expected.overall)
+    assert sketch.result().by_group == pytest.approx(expected.by_group)
+
+
+def test_seed_reproducible():
+    first = metrics.group_median_absolute_error(Y_true, Y_pred, groups,
+                                                sketch_size=sketch_size, random_state=11)
+    second = metrics.group_median_absolute_error(Y_true, Y_pred, groups,
+                                                 sketch_size=sketch_size, random_state=11)
+
+    assert first.overall == second.overall
+    assert first.by_group == second.by_group
+    _assert_within_bound(first, 0.5)
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("bad_size", [1, 0, 2.5])
+def test_bad_sketch_size(bad_size):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.GroupQuantileSketch(bad_size)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_SKETCH_SIZE
+
+
+@pytest.mark.parametrize("bad_quantile", [-0.1, 1.5])
+def test_bad_quantile(bad_quantile):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_quantile_absolute_error(Y_true, Y_pred, groups, bad_quantile)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_QUANTILE
+
+
+def test_merge_mismatch():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.GroupQuantileSketch(100).merge(metrics.GroupQuantileSketch(200))
+    assert exception_context.value.args[0] == _MESSAGE_MERGE_MISMATCH
+
+
+def test_no_data():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.GroupQuantileSketch().result()
+    assert exception_context.value.args[0] == _MESSAGE_NO_DATA
+
+
+def test_not_numeric():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.GroupQuantileSketch().update(["a", "b"], ["a", "c"], [0, 1])
+    assert exception_context.value.args[0] == _MESSAGE_NOT_NUMERIC
+
+
+def test_sketch_rejects_weights():
+    with pytest.raises(ValueError) as exception_context:
+        metrics.group_median_absolute_error(Y_true, Y_pred, groups, np.ones(n_samples),
+                                            sketch_size=sketch_size)
+    assert exception_context.value.args[0] == _MESSAGE_SKETCH_WEIGHTS
@@ -0,0 +1,88 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._roc_auc import _roc_auc_by_group
+
+# ===========================================================
+
+rng = np.random.RandomState(17)
+n_samples = 2000
+
+Y_true = rng.randint(0, 2, size=n_samples)
+# Rounding the scores gives many ties
+Y_score = np.round(rng.rand(n_samples) + 0.3 * Y_true, 1)
+groups = rng.choice(["p", "q", "r", "s"], size=n_samples)
+weight = rng.rand(n_samples)
+
+
+def _check_against_sklearn(result, y_true, y_score, groups, sample_weight=None):
+    expected = metrics.metric_by_group(skm.roc_auc_score, y_true, y_score, groups,
+                                       sample_weight=sample_weight)
+    assert result.overall == pytest.approx(expected.overall)
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == pytest.approx(expected.by_group[group])
+    assert result.range == pytest.approx(expected.range)
+
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_matches_sklearn_with_ties(s_w):
+    result = _roc_auc_by_group(Y_true, Y_score, groups, s_w)
+
+    assert result is not None
+    _check_against_sklearn(result, Y_true, Y_score, groups, s_w)
+
+
+def test_unweighted_is_exact():
+    result = _roc_auc_by_group(Y_true, Y_score, groups, None)
+
+    for group in result.by_group:
+        mask = (groups == group)
+        assert result.by_group[group] == skm.roc_auc_score(Y_true[mask], Y_score[mask])
+
+
+def test_string_labels_positive_is_greatest():
+    y_true = np.where(Y_true == 1, "yes", "no")
+
+    result = metrics.group_roc_auc_score(y_true, Y_score, groups)
+
+    _check_against_sklearn(result, y_true, Y_score, groups)
+
+
+def test_wrapper_uses_kernel_and_matches():
+    result = metrics.group_roc_auc_score(Y_true, Y_score, groups, sample_weight=weight)
+
+    _check_against_sklearn(result, Y_true, Y_score, groups, weight)
+
+
+@pytest.mark.parametrize("kwargs", [{"max_fpr": 0.5}, {"average": "bad"}])
+def test_unsupported_arguments_not_handled(kwargs):
+    assert _roc_auc_by_group(Y_true, Y_score, groups, None, **kwargs) is None
+
+
+def test_single_class_group_not_handled():
+    y_true = Y_true.copy()
+    y_true[groups == "q"] = 1
+
+    assert _roc_auc_by_group(y_true, Y_score, groups, None) is None
+
+
+def test_zero_weight_class_not_handled():
+    s_w = weight.copy()
+    s_w[(groups == "r") & (Y_true == 0)] = 0
+
+    assert _roc_auc_by_group(Y_true, Y_score, groups, s_w) is None
+
+
+def test_multiclass_not_handled():
+    y_true = rng.randint(0, 3, size=n_samples)
+
+    assert _roc_auc_by_group(y_true, Y_score, groups, None) is None
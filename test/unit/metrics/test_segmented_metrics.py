@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+
+# ===========================================================
+
+rng = np.random.RandomState(23)
+n_samples = 3001
+
+Y_true = rng.rand(n_samples)
+Y_pred = rng.rand(n_samples)
+Y_true_int = rng.randint(0, 10, size=n_samples)
+Y_pred_int = rng.randint(0, 10, size=n_samples)
+# Many groups, of both odd and even sizes, including single samples
+groups = rng.randint(0, 500, size=n_samples)
+
+segmented_metrics = [(skm.max_error, metrics.group_max_error),
+                     (skm.median_absolute_error, metrics.group_median_absolute_error)]
+
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("func_tuple", segmented_metrics)
+@pytest.mark.parametrize("y_t, y_p", [(Y_true, Y_pred), (Y_true_int, Y_pred_int)])
+def test_matches_metric_by_group(func_tuple, y_t, y_p):
+    metric_func, group_metric_func = func_tuple
+
+    result = group_metric_func(y_t, y_p, groups)
+    expected = metrics.metric_by_group(metric_func, y_t, y_p, groups)
+
+    assert result.overall == expected.overall
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == expected.by_group[group]
+    assert result.range == expected.range
+    assert result.argmax_set == expected.argmax_set
+
+
+def test_median_absolute_error_weighted_falls_back():
+    weight = rng.rand(n_samples)
+
+    result = metrics.group_median_absolute_error(Y_true, Y_pred, groups, sample_weight=weight)
+    expected = metrics.metric_by_group(skm.median_absolute_error, Y_true, Y_pred, groups,
+                                       sample_weight=weight)
+
+    assert result.overall == expected.overall
+    assert result.by_group == expected.by_group
+
+
+def test_max_error_rejects_multioutput():
+    y_t = np.stack([Y_true, Y_pred], axis=1)
+
+    with pytest.raises(ValueError):
+        metrics.group_max_error(y_t, y_t, groups)
+
+
+@pytest.mark.parametrize("y_t, y_p", [(Y_true, Y_pred), (Y_true_int, Y_pred_int)])
+def test_median_absolute_error_counts(y_t, y_p):
+    counts = rng.randint(0, 4, size=n_samples)
+
+    result = metrics.group_median_absolute_error(y_t, y_p, groups, counts=counts)
+    repeated = [np.repeat(a, counts) for a in (y_t, y_p, groups)]
+    expected = metrics.metric_by_group(skm.median_absolute_error, *repeated)
+
+    assert result.overall == expected.overall
+    assert list(result.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert result.by_group[group] == expected.by_group[group]
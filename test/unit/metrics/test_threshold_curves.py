@@ -0,0 +1,99 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+
+import fairlearn.metrics as metrics
+
+# ===========================================================
+
+rng = np.random.RandomState(37)
+n_samples = 1000
+
+Y_true = rng.randint(0, 2, size=n_samples)
+# Rounding gives tied scores
+Y_score = np.round(rng.rand(n_samples) + 0.2 * Y_true, 2)
+groups = rng.choice(["a", "b", "c", "d"], size=n_samples)
+weight = rng.rand(n_samples)
+
+thresholded_metrics = {"selection_rate": metrics.group_selection_rate,
+                       "true_positive_rate": metrics.group_recall_score,
+                       "false_positive_rate": metrics.group_fallout_rate,
+                       "precision": metrics.group_precision_score}
+
+
+def _check_at_threshold(curves, index, threshold, group_index, s_w):
+    y_pred = (Y_score >= threshold).astype(int)
+    for name, group_metric in thresholded_metrics.items():
+        expected = group_metric(Y_true, y_pred, groups, sample_weight=s_w)
+        if group_index is None:
+            assert curves[name].overall[index] == pytest.approx(expected.overall)
+        else:
+            group = curves[name].groups[group_index]
+            assert curves[name].by_group[group][index] == \
+                pytest.approx(expected.by_group[group])
+
+
+# ===========================================================
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_requested_thresholds(s_w):
+    thresholds = [0.9, 0.1, 0.5, 0.55, 1.5, -1]
+
+    curves = metrics.group_threshold_curves(Y_true, Y_score, groups, sample_weight=s_w,
+                                            thresholds=thresholds)
+
+    assert list(curves["thresholds"].overall) == thresholds
+    for name in thresholded_metrics:
+        assert curves[name].to_numpy().shape == (4, len(thresholds))
+    for index, threshold in enumerate(thresholds):
+        _check_at_threshold(curves, index, threshold, None, s_w)
+        for group_index in range(4):
+            _check_at_threshold(curves, index, threshold, group_index, s_w)
+
+
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_all_thresholds(s_w):
+    curves = metrics.group_threshold_curves(Y_true, Y_score, groups, sample_weight=s_w)
+
+    overall_thresholds = curves["thresholds"].overall
+    assert np.array_equal(overall_thresholds, np.unique(Y_score)[::-1])
+    for index in [0, 10, len(overall_thresholds) - 1]:
+        _check_at_threshold(curves, index, overall_thresholds[index], None, s_w)
+
+    for group_index, group in enumerate(curves["thresholds"].groups):
+        group_thresholds = curves["thresholds"].by_group[group]
+        assert np.array_equal(group_thresholds, np.unique(Y_score[groups == group])[::-1])
+        for index in [0, 7, len(group_thresholds) - 1]:
+            _check_at_threshold(curves, index, group_thresholds[index], group_index, s_w)
+
+
+def test_true_positive_rate_ends_at_one():
+    curves = metrics.group_threshold_curves(Y_true, Y_score, groups)
+
+    for name in ["selection_rate", "true_positive_rate", "false_positive_rate"]:
+        for values in curves[name].by_group.values():
+            assert values[-1] == 1
+            assert np.all(np.diff(values) >= 0)
+
+
+def test_pos_label():
+    y_true = np.where(Y_true == 1, "yes", "no")
+
+    curves = metrics.group_threshold_curves(y_true, Y_score, groups, thresholds=[0.5],
+                                            pos_label="yes")
+    expected = metrics.group_threshold_curves(Y_true, Y_score, groups, thresholds=[0.5])
+
+    assert np.array_equal(curves["precision"].to_numpy(), expected["precision"].to_numpy())
+
+
+@pytest.mark.parametrize("y_score", [np.asarray(["a"] * n_samples),
+                                     np.ones((n_samples, 2))])
+def test_bad_scores(y_score):
+    with pytest.raises(ValueError) as exception_context:
+        _ = metrics.group_threshold_curves(Y_true, y_score, groups)
+
+    expected = "y_score must be a non-empty one-dimensional array of numbers"
+    assert exception_context.value.args[0] == expected
@@ -0,0 +1,30 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+
+# Binary and continuous predictions for a few groups, shared by the tests
+# which compare other ways of computing grouped metrics with metric_by_group
+_rng = np.random.RandomState(23)
+n_samples = 400
+
+Y_true = _rng.randint(0, 2, size=n_samples)
+Y_pred = _rng.randint(0, 2, size=n_samples)
+Y_pred_reg = _rng.rand(n_samples)
+groups = _rng.choice(["a", "b", "c", "d"], size=n_samples)
+weight = _rng.rand(n_samples)
+
+
+def assert_results_equal(actual, expected):
+    """Checks that two :class:`GroupMetricResult` objects hold the same values
+    (up to floating point rounding), with the groups in the same order
+    """
+    assert actual.overall == pytest.approx(expected.overall)
+    assert list(actual.by_group.keys()) == list(expected.by_group.keys())
+    for group in expected.by_group:
+        assert actual.by_group[group] == pytest.approx(expected.by_group[group])
+    assert actual.minimum == pytest.approx(expected.minimum)
+    assert actual.maximum == pytest.approx(expected.maximum)
+    assert actual.argmin_set == expected.argmin_set
+    assert actual.argmax_set == expected.argmax_set
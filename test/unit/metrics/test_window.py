@@ -0,0 +1,179 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+import sklearn.metrics as skm
+
+import fairlearn.metrics as metrics
+from fairlearn.metrics._window import _MESSAGE_BAD_N_BUCKETS, _MESSAGE_EMPTY_WINDOW
+
+from .test_utilities import assert_results_equal, n_samples
+from .test_utilities import Y_true, Y_pred, Y_pred_reg, groups, weight
+
+# ===========================================================
+
+# Each sample falls in one of 12 buckets, in increasing order
+bucket_of = np.sort(np.random.RandomState(31).randint(0, 12, size=n_samples))
+
+classification_metrics = [skm.accuracy_score,
+                          skm.precision_score,
+                          skm.recall_score,
+                          metrics.selection_rate]
+
+regression_metrics = [skm.mean_squared_error,
+                      skm.mean_absolute_error,
+                      metrics.mean_overprediction]
+
+# ===========================================================
+
+
+def _slide(metric_function, y_pred, n_buckets, s_w):
+    """Adds the data one bucket at a time, checking the result after each
+    against metric_by_group applied to the data in the window
+    """
+    window = metrics.GroupMetricWindow(metric_function, n_buckets)
+    for bucket in np.unique(bucket_of):
+        in_bucket = bucket_of == bucket
+        # Split each bucket into two updates
+        for part in np.array_split(np.flatnonzero(in_bucket), 2):
+            window.update(bucket, Y_true[part], y_pred[part], groups[part],
+                          None if s_w is None else s_w[part])
+
+        in_window = (bucket_of > bucket - n_buckets) & (bucket_of <= bucket)
+        expected = metrics.metric_by_group(metric_function, Y_true[in_window],
+                                           y_pred[in_window], groups[in_window],
+                                           None if s_w is None else s_w[in_window])
+        assert_results_equal(window.result(), expected)
+    return window
+
+
+@pytest.mark.parametrize("metric_function", classification_metrics)
+@pytest.mark.parametrize("s_w", [None, weight])
+@pytest.mark.parametrize("n_buckets", [1, 3, 20])
+def test_classification_window(metric_function, s_w, n_buckets):
+    _slide(metric_function, Y_pred, n_buckets, s_w)
+
+
+@pytest.mark.parametrize("metric_function", regression_metrics)
+@pytest.mark.parametrize("s_w", [None, weight])
+def test_regression_window(metric_function, s_w):
+    _slide(metric_function, Y_pred_reg, 4, s_w)
+
+
+@pytest.mark.parametrize("metric_function", [skm.precision_score, metrics.mean_overprediction])
+def test_statistics_return_to_zero(metric_function):
+    # The buckets with positive predictions (or overpredictions) expire, so
+    # some sums in the window are exactly zero again, which must not be lost
+    # to rounding errors
+    bucket_rng = np.random.RandomState(5)
+    window = metrics.GroupMetricWindow(metric_function, 2)
+    data = []
+    for bucket in range(5):
+        y_true = bucket_rng.randint(0, 2, size=7)
+        y_pred = np.full(7, 1 if bucket < 2 else 0)
+        s_w = bucket_rng.rand(7)
+        window.update(bucket, y_true, y_pred, ['a'] * 7, s_w)
+        data.append((y_true, y_pred, s_w))
+
+    y_true, y_pred, s_w = [np.concatenate(values) for values in zip(*data[-2:])]
+    expected = metrics.metric_by_group(metric_function, y_true, y_pred, ['a'] * 14,
+                                       sample_weight=s_w)
+    assert window.result().by_group == expected.by_group
+    assert window.result().overall == expected.overall
+
+
+def test_buckets_expire():
+    window = _slide(skm.accuracy_score, Y_pred, 3, None)
+
+    assert window.latest_bucket == 11
+    assert window.buckets == [9, 10, 11]
+
+    window.advance(13)
+    assert window.buckets == [11]
+    with pytest.raises(ValueError) as exception_context:
+        window.advance(20).result()
+    assert exception_context.value.args[0] == _MESSAGE_EMPTY_WINDOW
+
+
+def test_groups_leave_window():
+    window = metrics.GroupMetricWindow(skm.accuracy_score, 2)
+    window.update(0, [1, 1, 0], [1, 0, 0], ['x', 'y', 'y'])
+    window.update(1, [1, 0], [1, 1], ['y', 'z'])
+
+    result = window.result()
+    assert list(result.by_group.keys()) == ['x', 'y', 'z']
+    assert result.overall == pytest.approx(0.6)
+
+    window.update(2, [0, 1], [0, 1], ['z', 'z'])
+    result = window.result()
+    assert list(result.by_group.keys()) == ['y', 'z']
+    assert result.by_group['y'] == 1
+    assert result.by_group['z'] == pytest.approx(2 / 3)
+
+
+def test_one_row_batches():
+    window = metrics.GroupMetricWindow(skm.accuracy_score, 2)
+    window.update(0, [1], [1], ['x'])
+    window.update(1, [1], [0], ['y'])
+    window.update(1, [0], [0], ['y'])
+
+    result = window.result()
+    assert result.by_group == {'x': 1, 'y': 0.5}
+    assert result.overall == pytest.approx(2 / 3)
+
+
+def test_earlier_bucket_in_window():
+    window = metrics.GroupMetricWindow(skm.accuracy_score, 3)
+    window.update(5, [1, 1], [1, 0], ['x', 'x'])
+    window.update(4, [0, 0], [0, 1], ['x', 'y'])
+
+    assert window.latest_bucket == 5
+    assert window.result().overall == pytest.approx(0.5)
+    assert list(window.result().by_group.keys()) == ['x', 'y']
+
+    window.advance(7)
+    assert list(window.result().by_group.keys()) == ['x']
+    assert window.result().overall == pytest.approx(0.5)
+
+# ===========================================================
+
+
+def test_unsupported_metric():
+    with pytest.raises(ValueError):
+        metrics.GroupMetricWindow(skm.roc_auc_score, 5)
+
+
+@pytest.mark.parametrize("n_buckets", [0, -1, 2.5])
+def test_bad_n_buckets(n_buckets):
+    with pytest.raises(ValueError) as exception_context:
+        metrics.GroupMetricWindow(skm.accuracy_score, n_buckets)
+    assert exception_context.value.args[0] == _MESSAGE_BAD_N_BUCKETS
+
+
+def test_expired_bucket():
+    window = metrics.GroupMetricWindow(skm.accuracy_score, 3)
+    window.update(10, [1, 0], [1, 0], ['x', 'x'])
+
+    with pytest.raises(ValueError) as exception_context:
+        window.update(7, [1, 0], [1, 0], ['x', 'x'])
+    assert exception_context.value.args[0] == \
+        "Bucket 7 is no longer in the window, which starts after 7"
+
+
+def test_no_data():
+    window = metrics.GroupMetricWindow(skm.accuracy_score, 3)
+    with pytest.raises(ValueError) as exception_context:
+        window.result()
+    assert exception_context.value.args[0] == _MESSAGE_EMPTY_WINDOW
+
+
+def test_labels_checked_in_window():
+    window = metrics.GroupMetricWindow(skm.precision_score, 2)
+    window.update(0, [0, 2], [0, 1], ['x', 'y'])
+    with pytest.raises(ValueError):
+        window.result()
+
+    # The sample with a label of 2 expires
+    window.update(2, [0, 1], [1, 1], ['x', 'y'])
+    assert window.result().overall == pytest.approx(0.5)
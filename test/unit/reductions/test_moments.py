@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License.
+
+import numpy as np
+import pytest
+
+from fairlearn import _input_validation
+from fairlearn._input_validation import _validate_and_reformat_reductions_input
+from fairlearn.reductions import DemographicParity
+from fairlearn.reductions._moments.moment import _GROUP_ID, _LABEL
+
+
+@pytest.fixture
+def memmapped_data(tmp_path):
+    rng = np.random.RandomState(4)
+    X = rng.rand(300, 3)
+    y = rng.randint(2, size=300).astype(float)
+    sensitive_features = rng.randint(2, size=300)
+    mapped = []
+    for name, array in [("X", X), ("y", y), ("A", sensitive_features)]:
+        path = str(tmp_path / (name + ".npy"))
+        np.save(path, array)
+        mapped.append(np.load(path, mmap_mode='r'))
+    return mapped
+
+
+def test_validation_does_not_copy_memmap(memmapped_data):
+    X, y, sensitive_features = memmapped_data
+
+    X_out, y_out, sf_out = _validate_and_reformat_reductions_input(
+        X, y, sensitive_features, enforce_binary_sensitive_feature=True)
+
+    assert X_out is X
+    assert np.shares_memory(y_out.values, y)
+    assert np.shares_memory(sf_out.values, sensitive_features)
+
+
+def test_binary_sensitive_feature_checked_in_chunks(monkeypatch):
+    monkeypatch.setattr(_input_validation, '_CHUNK_SIZE', 4)
+    X = np.zeros((10, 2))
+    y = np.zeros(10)
+
+    _validate_and_reformat_reductions_input(X, y, np.array([0, 1] * 5),
+                                            enforce_binary_sensitive_feature=True)
+    with pytest.raises(RuntimeError):
+        _validate_and_reformat_reductions_input(X, y, np.array([0, 1] * 4 + [1, 2]),
+                                                enforce_binary_sensitive_feature=True)
+
+
+def test_load_data_does_not_copy_labels(memmapped_data):
+    X, y, sensitive_features = memmapped_data
+
+    moment = DemographicParity()
+    moment.load_data(X, y, sensitive_features=sensitive_features)
+
+    assert moment.X is X
+    assert np.shares_memory(moment.tags[_LABEL].values, y)
+    assert np.array_equal(moment.tags[_GROUP_ID], sensitive_features)